@@ -0,0 +1,8 @@
+# Запуск консольного режима из каталога исходников: python cli.py ...
+# (то же, что python -m greenberg ...)
+import sys
+
+from greenberg.cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""Проверка графов на негамильтоновость по теореме Гринберга.
+
+Ядро (GraphNX, обход граней, решатель) импортируется без tkinter, numpy и
+networkx: networkx подгружается при первой проверке планарности, numpy —
+при первой силовой укладке, GUI — только командой gui.
+"""
+
+from .graph import GraphNX
+from .planarity import trace_faces
+from .solver import (GreenbergPartition, SolverControl, SolverInterrupted, face_size_counts,
+                     greenberg_partition_counts, iter_partition_counts, split_faces)
+
+__all__ = [
+    'GraphNX',
+    'GreenbergPartition',
+    'SolverControl',
+    'SolverInterrupted',
+    'face_size_counts',
+    'greenberg_partition_counts',
+    'iter_partition_counts',
+    'split_faces',
+    'trace_faces',
+]
@@ -0,0 +1,283 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from .generators import random_cubic_planar, random_triangulation
+from .graph import GraphNX
+from .prefilter import prefilter
+from .solver import face_size_counts, greenberg_partition_counts
+
+# Кубический 3-связный планарный граф с набором граней графа Гринберга:
+# 21 пятиугольник, 3 восьмиугольника и 1 девятиугольник. Все грани, кроме
+# одной, имеют порядок 2 mod 3, поэтому граф негамильтонов по теореме Гринберга.
+GRINBERG46_EDGES = [
+    (0, 12), (0, 13), (0, 28), (1, 10), (1, 22), (1, 33), (2, 11), (2, 32), (2, 43),
+    (3, 5), (3, 6), (3, 35), (4, 5), (4, 34), (4, 42), (5, 7), (6, 8), (6, 22),
+    (7, 8), (7, 26), (8, 23), (9, 10), (9, 16), (9, 24), (10, 18), (11, 30),
+    (11, 45), (12, 14), (12, 25), (13, 15), (13, 29), (14, 15), (14, 24), (15, 16),
+    (16, 17), (17, 18), (17, 38), (18, 36), (19, 20), (19, 34), (19, 43), (20, 21),
+    (20, 33), (21, 22), (21, 35), (23, 24), (23, 25), (25, 26), (26, 28), (27, 28),
+    (27, 29), (27, 44), (29, 40), (30, 31), (30, 41), (31, 32), (31, 39), (32, 37),
+    (33, 36), (34, 35), (36, 37), (37, 38), (38, 39), (39, 40), (40, 41), (41, 44),
+    (42, 43), (42, 45), (44, 45),
+]
+
+
+def grinberg46(size, rng):
+    return 46, GRINBERG46_EDGES
+
+
+def tutte(size, rng):
+    import networkx as nx
+    return 46, list(nx.tutte_graph().edges())
+
+
+def prism(size, rng):
+    """Призма над k-угольником (2k вершин, гамильтонова)"""
+    k = max(3, size // 2)
+    edges = []
+    for i in range(k):
+        edges += [(i, (i + 1) % k), (k + i, k + (i + 1) % k), (i, k + i)]
+    return 2 * k, edges
+
+
+def antiprism(size, rng):
+    """Антипризма над k-угольником (2k вершин, гамильтонова)"""
+    k = max(3, size // 2)
+    edges = []
+    for i in range(k):
+        edges += [(i, (i + 1) % k), (k + i, k + (i + 1) % k),
+                  (i, k + i), (i, k + (i + 1) % k)]
+    return 2 * k, edges
+
+
+def wheel(size, rng):
+    """Колесо: центр 0 и обод из size - 1 вершин (гамильтоново)"""
+    k = max(3, size - 1)
+    edges = [(0, i) for i in range(1, k + 1)]
+    edges += [(i, i % k + 1) for i in range(1, k + 1)]
+    return k + 1, edges
+
+
+def triangulation(size, rng):
+    return random_triangulation(max(4, size), rng)
+
+
+def cubic(size, rng):
+    return random_cubic_planar(max(4, size - size % 2), rng)
+
+
+# семейство -> (построитель, размеры по умолчанию; None — граф фиксированного размера)
+FAMILIES = {
+    'grinberg46': (grinberg46, None),
+    'tutte': (tutte, None),
+    'prism': (prism, [16, 64, 256]),
+    'antiprism': (antiprism, [16, 64, 256]),
+    'wheel': (wheel, [16, 64, 256]),
+    'triangulation': (triangulation, [16, 64, 256]),
+    'cubic': (cubic, [16, 64, 256]),
+}
+
+
+def build(n, edges):
+    graph = GraphNX()
+    for v in range(n):
+        graph.add_vertex(str(v))
+    graph.add_edges_from((str(u), str(v)) for u, v in edges)
+    return graph
+
+
+# этапы одного прохода проверки: ключи замеров run_pipeline
+STAGES = ('planarity_s', 'faces_s', 'prefilter_s', 'solver_s')
+
+
+def run_pipeline(graph, timings):
+    """Один проход проверки с замером этапов; кэш сигнатур не используется.
+
+    Возвращает True, если понадобился полный поиск (предфильтр не сработал).
+    """
+    solved = False
+    t0 = time.perf_counter()
+    analysis = graph.analysis()
+    t1 = time.perf_counter()
+    faces = analysis.faces if analysis.is_planar and analysis.is_biconnected else []
+    t2 = time.perf_counter()
+    f_k = face_size_counts(faces) if faces else None
+    decided = f_k is None or prefilter(f_k) is not None
+    t3 = time.perf_counter()
+    if not decided:
+        greenberg_partition_counts(f_k)
+        solved = True
+    t4 = time.perf_counter()
+    timings['planarity_s'] += t1 - t0
+    timings['faces_s'] += t2 - t1
+    timings['prefilter_s'] += t3 - t2
+    timings['solver_s'] += t4 - t3
+    return solved
+
+
+def bench_case(family, size, count, seed):
+    builder, _ = FAMILIES[family]
+    rng = random.Random(seed)
+    inputs = [builder(size, rng) for _ in range(count)]
+
+    # прогрев: первый проход платит за ленивые импорты (networkx и др.)
+    # и заполнение внутренних кэшей, в замер он не входит
+    n, edges = inputs[0]
+    run_pipeline(build(n, edges), dict.fromkeys(STAGES, 0.0))
+
+    timings = dict.fromkeys(STAGES, 0.0)
+    solver_calls = 0
+    for n, edges in inputs:
+        solver_calls += run_pipeline(build(n, edges), timings)
+    total = sum(timings.values())
+
+    # пиковая память — отдельным проходом, чтобы tracemalloc не искажал время
+    tracemalloc.start()
+    n, edges = inputs[0]
+    run_pipeline(build(n, edges), dict.fromkeys(STAGES, 0.0))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'family': family,
+        'size': inputs[0][0],
+        'graphs': count,
+        **{name: round(value, 6) for name, value in timings.items()},
+        'total_s': round(total, 6),
+        'per_graph_s': total / count,
+        'graphs_per_s': round(count / total, 2) if total else None,
+        'peak_kib': round(peak / 1024, 1),
+        'solver_calls': solver_calls,  # сколько графов не решил предфильтр
+    }
+
+
+def run_benchmarks(families, sizes, count, seed):
+    results = []
+    for family in families:
+        _, default_sizes = FAMILIES[family]
+        for size in (sizes or default_sizes) if default_sizes else [None]:
+            results.append(bench_case(family, size, count, seed))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Сравнение с базовым прогоном: список (семейство, размер, замедление)"""
+    base = {(row['family'], row['size']): row for row in baseline['results']}
+    regressions = []
+    for row in results:
+        old = base.get((row['family'], row['size']))
+        if old and old['per_graph_s'] > 0:
+            slowdown = row['per_graph_s'] / old['per_graph_s'] - 1
+            if slowdown > threshold:
+                regressions.append((row['family'], row['size'], slowdown))
+    return regressions
+
+
+def add_arguments(parser):
+    parser.add_argument('--family', action='append', choices=sorted(FAMILIES),
+                        help="семейство графов (можно несколько раз; по умолчанию все)")
+    parser.add_argument('--size', type=int, action='append',
+                        help="размер графов (можно несколько раз)")
+    parser.add_argument('--count', type=int, default=20,
+                        help="сколько графов на каждый размер")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help="файл JSON с результатами")
+    parser.add_argument('--baseline', help="JSON базового прогона для сравнения")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="допустимое замедление относительно базового прогона (0.25 = 25%%)")
+
+
+def run(args):
+    results = run_benchmarks(args.family or list(FAMILIES), args.size, args.count, args.seed)
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'count': args.count,
+        'seed': args.seed,
+        'results': results,
+    }
+
+    print(f"{'семейство':<14}{'n':>6}{'планарн., с':>13}{'грани, с':>11}"
+          f"{'предфильтр, с':>15}{'решатель, с':>13}{'графов/с':>11}{'память, КиБ':>13}")
+    for row in results:
+        print(f"{row['family']:<14}{row['size']:>6}{row['planarity_s']:>13.4f}"
+              f"{row['faces_s']:>11.4f}{row['prefilter_s']:>15.4f}"
+              f"{row['solver_s']:>13.4f}"
+              f"{row['graphs_per_s'] or 0:>11.1f}{row['peak_kib']:>13.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for family, size, slowdown in regressions:
+            print(f"Замедление {family} n={size}: {slowdown:+.0%}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+# модули, которых не должно быть после import greenberg (грузятся по требованию)
+LAZY_MODULES = ('networkx', 'numpy', 'tkinter', 'asyncio', 'multiprocessing', 'sqlite3')
+
+
+def _cold_run(code, stdin=None):
+    # новый интерпретатор с каталогом пакета в пути; время от запуска до выхода
+    import os
+    import subprocess
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+    start = time.perf_counter()
+    done = subprocess.run([sys.executable, *code], input=stdin, capture_output=True, text=True,
+                          env=env, check=True)
+    return time.perf_counter() - start, done.stdout
+
+
+def run_startup(args):
+    """Холодный старт: import greenberg и проверка одного графа из командной строки.
+
+    Лучшее из repeat измерений сравнивается с budget_ms; код возврата 1,
+    если бюджет превышен или import greenberg тянет модули из LAZY_MODULES.
+    """
+    probe = ("import json, sys, greenberg; print(json.dumps(sorted(m for m in %r"
+             " if m in sys.modules)))" % (LAZY_MODULES,))
+    imports, checks, eager = [], [], []
+    for _ in range(args.repeat):
+        elapsed, out = _cold_run(['-c', probe])
+        imports.append(elapsed)
+        eager = json.loads(out)
+        # K4 в graph6: весь путь check — разбор, планарность, грани, решатель
+        elapsed, _ = _cold_run(['-m', 'greenberg', 'check', '-j', '1', '-f', 'graph6', '-'],
+                               stdin='C~\n')
+        checks.append(elapsed)
+    report = {
+        'import_ms': round(min(imports) * 1000, 1),
+        'check_ms': round(min(checks) * 1000, 1),
+        'budget_ms': args.budget_ms,
+        'eager_modules': eager,
+    }
+    report['ok'] = report['check_ms'] <= args.budget_ms and not eager
+    print(json.dumps(report, ensure_ascii=False))
+    if not report['ok']:
+        print("Холодный старт превышает бюджет или import greenberg грузит лишнее",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры скорости проверки по теореме Гринберга")
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import threading
+import warnings
+from collections import OrderedDict
+
+# networkx нужен только кэшу на диске (WL-хеш и изоморфизм) и
+# импортируется при первом обращении к нему.
+
+# Версия смысла записей ResultCache: увеличивается, когда у тех же графов
+# может измениться вердикт или разбиение (новые правила опровержения,
+# разложение на трисвязные части). Записи другой версии не выдаются и
+# перезаписываются при следующей проверке графа.
+RESULT_CACHE_VERSION = 2
+
+
+class SignatureCache:
+    """LRU в памяти: сигнатура f_k -> найденное f'_k (или None, если разбиения нет).
+
+    Поиск разбиения зависит только от f_k, поэтому результат общий для всех
+    графов с одинаковым набором порядков граней.
+    """
+
+    _missing = object()
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def signature(f_k):
+        return tuple(sorted(f_k.items()))
+
+    def __contains__(self, f_k):
+        # проверка без учёта в статистике попаданий
+        with self._lock:
+            return self.signature(f_k) in self._data
+
+    def get(self, f_k):
+        """Возвращает (найдено, f'_k)"""
+        key = self.signature(f_k)
+        with self._lock:
+            value = self._data.get(key, self._missing)
+            if value is self._missing:
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def put(self, f_k, prime_counts):
+        key = self.signature(f_k)
+        with self._lock:
+            self._data[key] = prime_counts
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self):
+        return {'size': len(self._data), 'hits': self.hits, 'misses': self.misses}
+
+
+# общий для процесса кэш сигнатур: используется GraphNX.greenberg_condition
+signature_cache = SignatureCache()
+
+
+def edge_digest(graph):
+    """Точный ключ графа с учётом меток вершин"""
+    vertices = sorted(graph.get_vertices())
+    edges = sorted(sorted((u, v)) for u, v, _ in graph.get_edges())
+    data = json.dumps([vertices, edges], ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def default_cache_path():
+    return os.path.join(os.path.expanduser('~'), '.cache', 'greenberg', 'results.sqlite')
+
+
+class ResultCache:
+    """Кэш результатов проверки на диске (SQLite).
+
+    Точный ключ — хеш помеченного списка рёбер: повторная проверка того же
+    графа не требует даже анализа планарности. Для изоморфных копий ключом
+    служит хеш Вейсфейлера-Лемана; так как он не различает все графы,
+    совпадение подтверждается проверкой изоморфизма, а грани сохранённого
+    разбиения переводятся в метки текущего графа. Старые записи вытесняются
+    по времени последнего обращения, когда их больше max_entries; записи
+    другой RESULT_CACHE_VERSION не выдаются.
+    """
+
+    def __init__(self, path=None, max_entries=100000):
+        self.path = path or default_cache_path()
+        self.max_entries = max_entries
+        self.exact_hits = 0
+        self.isomorphic_hits = 0
+        self.misses = 0
+        self._clock = 0
+        self._puts = 0
+        self._touched = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        import sqlite3
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                ' key TEXT PRIMARY KEY, wl TEXT, vertices INTEGER, edges INTEGER,'
+                ' edge_list TEXT, verdict TEXT, partition TEXT, used INTEGER,'
+                ' version INTEGER DEFAULT 0)')
+            columns = [row[1] for row in self._conn.execute('PRAGMA table_info(results)')]
+            if 'version' not in columns:
+                # файл от версии без столбца: его записи считаются версией 0
+                self._conn.execute('ALTER TABLE results ADD COLUMN version INTEGER DEFAULT 0')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS results_wl ON results (wl)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS results_used ON results (used)')
+        row = self._conn.execute('SELECT MAX(used) FROM results').fetchone()
+        self._clock = row[0] or 0
+
+    def close(self):
+        with self._lock, self._conn:
+            self._flush_touched()
+        self._conn.close()
+
+    @staticmethod
+    def _wl_hash(graph):
+        import networkx as nx
+        # networkx >= 3.5 предупреждает о смене WL-хешей при каждом вызове;
+        # ключи кэша всё равно подтверждаются проверкой изоморфизма
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message='The hashes produced', category=UserWarning)
+            return nx.weisfeiler_lehman_graph_hash(graph.core.to_networkx(), iterations=3)
+
+    def _touch(self, key):
+        # время обращения записывается пачкой при следующей записи,
+        # чтобы попадание в кэш не требовало транзакции на диске
+        self._clock += 1
+        self._touched[key] = self._clock
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany('UPDATE results SET used = ? WHERE key = ?',
+                                   [(used, key) for key, used in self._touched.items()])
+            self._touched = {}
+
+    def get(self, graph):
+        """Возвращает (вердикт, [f', f'']) или None, если графа нет в кэше"""
+        key = edge_digest(graph)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT verdict, partition FROM results WHERE key = ? AND version = ?',
+                (key, RESULT_CACHE_VERSION)).fetchone()
+            if row is not None:
+                self.exact_hits += 1
+                self._touch(key)
+                return json.loads(row[0]), json.loads(row[1])
+
+            candidates = self._conn.execute(
+                'SELECT key, edge_list, verdict, partition FROM results'
+                ' WHERE wl = ? AND vertices = ? AND edges = ? AND version = ?',
+                (self._wl_hash(graph), graph.number_of_vertices(),
+                 graph.number_of_edges(), RESULT_CACHE_VERSION)).fetchall()
+            if candidates:
+                import networkx as nx
+                from networkx.algorithms.isomorphism import GraphMatcher
+                current = nx.Graph()
+                current.add_nodes_from(graph.get_vertices())
+                current.add_edges_from((u, v) for u, v, _ in graph.get_edges())
+                for other_key, edge_list, verdict, partition in candidates:
+                    vertices, edges = json.loads(edge_list)
+                    stored = nx.Graph()
+                    stored.add_nodes_from(vertices)
+                    stored.add_edges_from(edges)
+                    matcher = GraphMatcher(stored, current)
+                    if matcher.is_isomorphic():
+                        self.isomorphic_hits += 1
+                        self._touch(other_key)
+                        mapping = matcher.mapping
+                        partition = [[[mapping[v] for v in face] for face in part]
+                                     for part in json.loads(partition)]
+                        return json.loads(verdict), partition
+
+            self.misses += 1
+            return None
+
+    def put(self, graph, verdict, mutable_params):
+        if verdict not in (True, False, 'nonplanar', 'nonbiconnected'):
+            return  # незавершённые проверки не кэшируются
+        vertices = graph.get_vertices()
+        edges = [(u, v) for u, v, _ in graph.get_edges()]
+        with self._lock, self._conn:
+            self._flush_touched()
+            self._clock += 1
+            self._conn.execute(
+                'INSERT OR REPLACE INTO results (key, wl, vertices, edges, edge_list, verdict,'
+                ' partition, used, version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (edge_digest(graph), self._wl_hash(graph), len(vertices), len(edges),
+                 json.dumps([vertices, edges], ensure_ascii=False), json.dumps(verdict),
+                 json.dumps(mutable_params[:2], ensure_ascii=False), self._clock,
+                 RESULT_CACHE_VERSION))
+            # размер проверяется не на каждой записи: файл может
+            # одновременно пополняться несколькими процессами
+            self._puts += 1
+            if self._puts % max(1, min(256, self.max_entries // 16)) == 0:
+                self._evict()
+
+    def _evict(self):
+        excess = self._conn.execute('SELECT COUNT(*) FROM results').fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                'DELETE FROM results WHERE key IN'
+                ' (SELECT key FROM results ORDER BY used LIMIT ?)', (excess,))
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        return {'size': size, 'exact_hits': self.exact_hits,
+                'isomorphic_hits': self.isomorphic_hits, 'misses': self.misses}
@@ -0,0 +1,498 @@
+from collections import deque
+from math import gcd
+
+from .prefilter import RESIDUE_MODULI, prefilter
+from .solver import face_size_counts
+
+# Сертификат результата проверки — словарь для JSON. Вершины задаются списком
+# меток, всё остальное — номерами в этом списке:
+#   vertices, edges                  — граф;
+#   rotation                         — соседи каждой вершины против часовой
+#                                      стрелки (для планарного графа);
+#   faces, f_k                       — грани укладки и их число по порядкам;
+#   partition                        — номера граней f' (разбиение найдено);
+#   proof                            — опровержение: правило и его свидетель,
+#                                      подграф Куратовского, точка сочленения
+#                                      (too_small — меньше трёх вершин)
+#                                      или часть разложения графа.
+# verify_certificate проверяет его без networkx за O(V + E), кроме правил
+# 'dp' и 'dual_search': они повторяют битовую динамику по f_k за
+# O(число порядков * S / 64). Опровержение перебором деревьев граней
+# (dual_search) так не проверить, и если f_k делится пополам,
+# certificate_status отмечает его как непроверяемое, а не неверное.
+
+CERTIFICATE_VERSION = 1
+
+VERDICTS = {
+    True: 'may_be_hamiltonian',
+    False: 'not_hamiltonian',
+    'nonplanar': 'nonplanar',
+    'nonbiconnected': 'nonbiconnected',
+}
+
+
+def _refutation(f_k):
+    # правило, которым f_k опровергается, и его свидетель; иначе — динамика по f_k
+    decided = prefilter(f_k)
+    if decided is None or decided.verdict:
+        return {'rule': 'dp'}
+    rule = decided.rule
+    weights = {k: k - 2 for k in f_k}
+    target = sum(f_k[k] * w for k, w in weights.items()) // 2
+    if rule == 'dominant_face':
+        return {'rule': rule, 'k': max(weights)}
+    if rule == 'gcd':
+        d = 0
+        for w in weights.values():
+            d = gcd(d, w)
+        return {'rule': rule, 'd': d}
+    if rule == 'single_face_residue':
+        for k in weights:
+            if f_k[k] != 1:
+                continue
+            g = 0
+            for other, w in weights.items():
+                if other != k:
+                    g = gcd(g, w)
+            if g > 1 and weights[k] % g:
+                return {'rule': rule, 'k': k, 'g': g}
+    if rule.startswith('residue_mod_'):
+        return {'rule': 'residue', 'm': int(rule[len('residue_mod_'):])}
+    return {'rule': rule}
+
+
+def make_certificate(graph, result, mutable_params=(), mode='counts'):
+    """Сертификат для результата greenberg_condition (None для 'inconclusive' и 'cancelled').
+
+    mutable_params — найденное разбиение (f', f''); в режиме 'counts' важны
+    только порядки граней, поэтому номера граней f' подбираются по f'_k.
+    """
+    if result not in VERDICTS:
+        return None
+    core = graph.core
+    ids = core.vertices()
+    index = {v: i for i, v in enumerate(ids)}
+    certificate = {
+        'version': CERTIFICATE_VERSION,
+        'verdict': 'hamiltonian' if result is True and mode == 'dual' else VERDICTS[result],
+        'vertices': [core.labels[v] for v in ids],
+        'edges': [[index[u], index[v]] for u, v in core.edges()],
+    }
+    analysis = graph.analysis()
+
+    if result == 'nonplanar':
+        _, counterexample = _kuratowski(core)
+        labels = certificate['vertices']
+        position = {label: i for i, label in enumerate(labels)}
+        certificate['proof'] = {
+            'rule': 'kuratowski',
+            'edges': [[position[core.labels[u]], position[core.labels[v]]]
+                      for u, v in counterexample.edges()],
+        }
+        return certificate
+
+    rotation = analysis.rotation
+    certificate['rotation'] = [[index[u] for u in _ccw_order(rotation[v])] for v in ids]
+    faces = analysis.face_ids
+    certificate['faces'] = [[index[v] for v in face] for face in faces]
+    f_k = face_size_counts(faces)
+    certificate['f_k'] = {str(k): f_k[k] for k in sorted(f_k)}
+
+    if result == 'nonbiconnected' and len(ids) < 3:
+        # у K1 и K2 нет точки сочленения: двусвязным граф не бывает и так
+        certificate['proof'] = {'rule': 'too_small'}
+    elif result == 'nonbiconnected':
+        certificate['proof'] = {'rule': 'cut_vertex', 'vertex': _cut_vertex(graph, index)}
+    elif result is True:
+        certificate['partition'] = _partition_indices(analysis, mutable_params[0], mode)
+    else:
+        proof = _refutation(f_k)
+        if proof['rule'] == 'dp' and _dp_reachable(f_k):
+            # f_k делится пополам: опровергает разложение графа, а если его
+            # нет — перебор деревьев граней, у которого короткого свидетеля нет
+            obstruction = graph.obstruction()
+            if obstruction is not None:
+                proof = _obstruction_proof(obstruction, index)
+            else:
+                proof = {'rule': 'dual_search'}
+        certificate['proof'] = proof
+    return certificate
+
+
+def _obstruction_proof(obstruction, index):
+    # вершины skeleton в сертификате части идут в порядке separator,
+    # затем по вершине на каждую пару attachments
+    proof = {'rule': obstruction.rule, 'vertices': [index[v] for v in obstruction.separator]}
+    if obstruction.rule == 'component':
+        proof['attachments'] = [[index[a], index[b]] for a, b in obstruction.attachments]
+        proof['certificate'] = make_certificate(obstruction.skeleton, False)
+    return proof
+
+
+def _ccw_order(turn):
+    # turn[u] — следующий против часовой стрелки сосед после u
+    if not turn:
+        return []
+    first = next(iter(turn))
+    order, u = [], first
+    while True:
+        order.append(u)
+        u = turn[u]
+        if u == first:
+            return order
+
+
+def _kuratowski(core):
+    import networkx as nx
+    return nx.check_planarity(core.to_networkx(), counterexample=True)
+
+
+def _cut_vertex(graph, index):
+    if not graph.core.is_connected():
+        return None  # несвязность проверяется обходом
+    return index[min(graph.decomposition().cut_vertices)]
+
+
+def _partition_indices(analysis, f_prime, mode):
+    faces = analysis.faces
+    if mode == 'dual':
+        # грани заданы точно: ищем их среди граней укладки
+        where = {}
+        for i, face in enumerate(faces):
+            where.setdefault(tuple(face), []).append(i)
+        return sorted(where[tuple(face)].pop() for face in f_prime)
+    remaining = face_size_counts(f_prime)
+    chosen = []
+    for i, face in enumerate(faces):
+        if remaining.get(len(face), 0) > 0:
+            remaining[len(face)] -= 1
+            chosen.append(i)
+    return chosen
+
+
+def _dp_reachable(f_k):
+    # достижима ли сумма S / 2 гранями (битовая динамика по f_k)
+    total = sum(count * (k - 2) for k, count in f_k.items())
+    if total == 0 or total % 2:
+        return False
+    target = total // 2
+    mask = (1 << (target + 1)) - 1
+    reach = 1
+    for k, count in f_k.items():
+        weight, chunk = k - 2, 1
+        while count > 0:
+            take = min(chunk, count)
+            reach = (reach | (reach << (take * weight))) & mask
+            count -= take
+            chunk *= 2
+    return bool((reach >> target) & 1)
+
+
+# Проверка
+
+class _Unverifiable(Exception):
+    """Опровержение без свидетеля, проверяемого за линейное время"""
+
+
+def certificate_status(certificate):
+    """Проверка сертификата: ('valid' | 'invalid' | 'unverifiable', сообщения).
+
+    Любая ошибка разбора (сертификат от чужой или испорченной программы)
+    делает сертификат неверным, а не прерывает проверку архива.
+    """
+    try:
+        errors = _verify(certificate)
+    except _Unverifiable as e:
+        return 'unverifiable', [str(e)]
+    except Exception as e:
+        return 'invalid', [f"некорректный сертификат: {type(e).__name__}: {e}"]
+    return ('invalid', errors) if errors else ('valid', [])
+
+
+def verify_certificate(certificate):
+    """Проверка сертификата: список ошибок (пустой — сертификат верен).
+
+    Планарность подтверждается формулой Эйлера для граней, обойдённых по
+    системе вращений, двусвязность — простотой граней, f_k — длинами
+    граней; всё это за O(V + E). Опровержение проверяется по f_k правилом
+    из сертификата; правило 'dp' повторяет битовую динамику по f_k.
+    Опровержение по разложению проверяется обходом графа без указанных
+    вершин и, для правила 'component', сертификатом части. Непроверяемый
+    сертификат (см. certificate_status) тоже даёт сообщение.
+    """
+    return certificate_status(certificate)[1]
+
+
+def _verify(certificate):
+    if certificate.get('version') != CERTIFICATE_VERSION:
+        return [f"неизвестная версия сертификата: {certificate.get('version')}"]
+    n = len(certificate['vertices'])
+    neighbors = [set() for _ in range(n)]
+    for u, v in certificate['edges']:
+        if u == v or v in neighbors[u]:
+            return [f"петля или кратное ребро {u}-{v}"]
+        neighbors[u].add(v)
+        neighbors[v].add(u)
+    edge_count = len(certificate['edges'])
+    verdict = certificate['verdict']
+    proof = certificate.get('proof') or {}
+
+    if verdict == 'nonplanar':
+        return _verify_kuratowski(neighbors, proof.get('edges', []))
+
+    errors = []
+    rotation = certificate['rotation']
+    if len(rotation) != n:
+        return ["система вращений задана не для всех вершин"]
+    turn = []
+    for v, order in enumerate(rotation):
+        if len(order) != len(neighbors[v]) or set(order) != neighbors[v]:
+            return [f"вращение вершины {v} не совпадает с её соседями"]
+        turn.append({u: order[(i + 1) % len(order)] for i, u in enumerate(order)})
+
+    # грани: каждое полуребро ровно в одной грани, переходы — по вращению
+    faces = certificate['faces']
+    used = set()
+    for i, face in enumerate(faces):
+        for j, v in enumerate(face):
+            u, w = face[j - 1], face[(j + 1) % len(face)]
+            if (u, v) in used:
+                return [f"полуребро {u}-{v} встречается в гранях дважды"]
+            used.add((u, v))
+            if turn[v].get(u) != w:
+                return [f"грань {i} не следует системе вращений в вершине {v}"]
+    if len(used) != 2 * edge_count:
+        return ["грани покрывают не все рёбра"]
+
+    components = _components(neighbors, n)
+    # без рёбер обходить нечего: единственная внешняя грань в faces не попадает
+    if components == 1 and edge_count and n - edge_count + len(faces) != 2:
+        errors.append("формула Эйлера не выполняется: укладка не плоская")
+    f_k = face_size_counts(faces)
+    if {str(k): c for k, c in f_k.items()} != certificate['f_k']:
+        errors.append("f_k не совпадает с длинами граней")
+    simple = all(len(set(face)) == len(face) for face in faces)
+
+    if verdict == 'nonbiconnected':
+        rule = proof.get('rule', 'cut_vertex')
+        if rule == 'too_small':
+            if n >= 3:
+                errors.append(f"вершин в графе: {n}, правило too_small неприменимо")
+            return errors
+        if rule != 'cut_vertex':
+            return errors + [f"неизвестное правило: {rule}"]
+        vertex = proof.get('vertex')
+        if vertex is None:
+            if components <= 1:
+                errors.append("граф связен, а точка сочленения не указана")
+        else:
+            if _components(neighbors, n, skip={vertex}) < 2:
+                errors.append(f"вершина {vertex} не является точкой сочленения")
+        return errors
+
+    if components != 1:
+        errors.append("граф несвязен")
+    if not simple:
+        errors.append("есть грань с повторной вершиной: граф не двусвязный")
+    if errors:
+        return errors
+
+    if verdict in ('may_be_hamiltonian', 'hamiltonian'):
+        return _verify_partition(faces, certificate['partition'], verdict == 'hamiltonian', n)
+    if verdict == 'not_hamiltonian':
+        if proof.get('rule') in ('separation_pair', 'component'):
+            return _verify_obstruction(neighbors, n, proof)
+        return _verify_refutation({int(k): c for k, c in certificate['f_k'].items()}, proof)
+    return [f"неизвестный вердикт: {verdict}"]
+
+
+def _components(neighbors, n, skip=()):
+    return len(_parts(neighbors, n, skip))
+
+
+def _parts(neighbors, n, skip=()):
+    # связные части графа без вершин skip: для каждой — множество вершин
+    # skip, к которым она примыкает
+    seen = [False] * n
+    parts = []
+    for start in range(n):
+        if seen[start] or start in skip:
+            continue
+        seen[start] = True
+        touched = set()
+        queue = deque([start])
+        while queue:
+            v = queue.popleft()
+            for u in neighbors[v]:
+                if u in skip:
+                    touched.add(u)
+                elif not seen[u]:
+                    seen[u] = True
+                    queue.append(u)
+        parts.append(touched)
+    return parts
+
+
+def _verify_obstruction(neighbors, n, proof):
+    separator = proof['vertices']
+    inside = set(separator)
+    if len(inside) != len(separator) or not all(0 <= v < n for v in inside):
+        return ["вершины разложения повторяются или выходят за список вершин"]
+    parts = _parts(neighbors, n, inside)
+    if proof['rule'] == 'separation_pair':
+        if len(separator) != 2 or len(parts) < 3:
+            return ["без пары вершин граф распадается меньше чем на три части"]
+        return []
+
+    # каждая часть примыкает ровно к двум вершинам separator
+    if len(separator) < 3:
+        return ["в separator меньше трёх вершин"]
+    if any(len(touched) != 2 for touched in parts):
+        return ["часть графа без separator примыкает не к двум его вершинам"]
+    attachments = proof['attachments']
+    if sorted(sorted(pair) for pair in attachments) != sorted(sorted(t) for t in parts):
+        return ["пары attachments не совпадают с частями графа без separator"]
+    # граф части: подграф на separator и по вершине на каждую пару
+    local = {v: i for i, v in enumerate(separator)}
+    expected = {frozenset((local[u], local[v])) for u in separator for v in neighbors[u]
+                if v in inside}
+    for j, (a, b) in enumerate(attachments):
+        middle = len(separator) + j
+        expected.add(frozenset((middle, local[a])))
+        expected.add(frozenset((middle, local[b])))
+    sub = proof['certificate']
+    if len(sub['vertices']) != len(separator) + len(attachments):
+        return ["число вершин части не совпадает с separator и attachments"]
+    if {frozenset(edge) for edge in sub['edges']} != expected:
+        return ["рёбра части не совпадают с подграфом на separator и парами attachments"]
+    if sub.get('verdict') != 'not_hamiltonian':
+        return ["часть не опровергнута"]
+    return [f"часть: {error}" for error in _verify(sub)]
+
+
+def _verify_partition(faces, partition, hamiltonian, n):
+    chosen = set(partition)
+    if len(chosen) != len(partition) or not all(0 <= i < len(faces) for i in chosen):
+        return ["номера граней f' повторяются или выходят за список граней"]
+    total = sum(len(face) - 2 for face in faces)
+    inside = sum(len(faces[i]) - 2 for i in chosen)
+    if 2 * inside != total:
+        return [f"сумма (k - 2) по f' равна {inside}, а не половине от {total}"]
+    if not hamiltonian:
+        return []
+    # граница f' — рёбра, лежащие ровно на одной грани f', — гамильтонов цикл
+    count = {}
+    for i in chosen:
+        face = faces[i]
+        for a, b in zip(face, face[1:] + face[:1]):
+            key = (a, b) if a <= b else (b, a)
+            count[key] = count.get(key, 0) + 1
+    boundary = [[] for _ in range(n)]
+    for (a, b), c in count.items():
+        if c == 1:
+            boundary[a].append(b)
+            boundary[b].append(a)
+    if any(len(around) != 2 for around in boundary):
+        return ["граница f' проходит не через все вершины по одному разу"]
+    if _components([set(around) for around in boundary], n) != 1:
+        return ["граница f' распадается на несколько циклов"]
+    return []
+
+
+def _verify_refutation(f_k, proof):
+    rule = proof.get('rule')
+    weights = {k: k - 2 for k, c in f_k.items() if k >= 3 and c > 0}
+    total = sum(f_k[k] * w for k, w in weights.items())
+    target = total // 2
+    if rule == 'parity':
+        return [] if total % 2 else ["сумма S чётная"]
+    if total % 2 or total == 0:
+        return []  # разбиения нет при любом правиле
+    if rule == 'dominant_face':
+        k = proof['k']
+        return [] if k in weights and weights[k] > target else [f"грань порядка {k} не тяжелее S/2"]
+    if rule == 'gcd':
+        d = proof['d']
+        if d > 1 and all(w % d == 0 for w in weights.values()) and target % d:
+            return []
+        return [f"{d} не опровергает разбиение"]
+    if rule == 'single_face_residue':
+        k, g = proof['k'], proof['g']
+        if (f_k.get(k) == 1 and g > 1 and weights[k] % g
+                and all(w % g == 0 for other, w in weights.items() if other != k)):
+            return []
+        return [f"грань порядка {k} не единственная с ненулевым остатком по модулю {g}"]
+    if rule == 'residue':
+        m = proof['m']
+        if m not in RESIDUE_MODULI:
+            return [f"модуль {m} не поддерживается"]
+        reach = {0}
+        for k, w in weights.items():
+            for _ in range(min(f_k[k], m - 1)):
+                reach |= {(r + w) % m for r in reach}
+        return [] if target % m not in reach else [f"S/2 достижима по модулю {m}"]
+    if rule == 'dp':
+        return [] if not _dp_reachable(f_k) else ["сумма S/2 достижима: разбиение есть"]
+    if rule == 'dual_search':
+        if not _dp_reachable(f_k):
+            return []  # опровергает и сама теорема
+        raise _Unverifiable("опровержение перебором деревьев граней не проверяется "
+                            "за линейное время")
+    return [f"неизвестное правило: {rule}"]
+
+
+def _verify_kuratowski(neighbors, edges):
+    # подграф — подразбиение K5 или K3,3: вершины степени 2 лежат на путях
+    # между вершинами ветвления, пути попарно соединяют разные вершины
+    sub = {}
+    for u, v in edges:
+        if v not in neighbors[u]:
+            return [f"ребра {u}-{v} нет в графе"]
+        sub.setdefault(u, set()).add(v)
+        sub.setdefault(v, set()).add(u)
+    if len(edges) != sum(len(around) for around in sub.values()) // 2:
+        return ["ребро подграфа указано дважды"]
+    branch = [v for v, around in sub.items() if len(around) > 2]
+    if any(len(around) < 2 for around in sub.values()):
+        return ["у подграфа есть висячая вершина"]
+
+    pairs = set()
+    walked = set()  # пройденные рёбра подграфа
+    for a in branch:
+        for first in sub[a]:
+            if frozenset((a, first)) in walked:
+                continue
+            previous, current = a, first
+            walked.add(frozenset((a, first)))
+            while len(sub[current]) == 2:
+                step = next(u for u in sub[current] if u != previous)
+                walked.add(frozenset((current, step)))
+                previous, current = current, step
+            if current == a:
+                return ["путь подграфа возвращается в свою вершину"]
+            pairs.add((a, current) if a < current else (current, a))
+    if len(walked) != len(edges):
+        return ["в подграфе есть цикл без вершин ветвления"]
+    # кратный путь между двумя вершинами ветвления схлопывается в pairs
+    degrees = [len(sub[v]) for v in branch]
+    if len(branch) == 5 and all(d == 4 for d in degrees) and len(pairs) == 10:
+        return []
+    if len(branch) == 6 and all(d == 3 for d in degrees) and len(pairs) == 9:
+        # двудольность с долями по 3 вершины
+        side = {branch[0]: 0}
+        adjacency = {v: set() for v in branch}
+        for a, b in pairs:
+            adjacency[a].add(b)
+            adjacency[b].add(a)
+        queue = deque([branch[0]])
+        while queue:
+            v = queue.popleft()
+            for u in adjacency[v]:
+                if u not in side:
+                    side[u] = 1 - side[v]
+                    queue.append(u)
+                elif side[u] == side[v]:
+                    return ["подграф не является подразбиением K3,3"]
+        if len(side) == 6 and sum(side.values()) == 3:
+            return []
+    return ["подграф не является подразбиением K5 или K3,3"]
@@ -0,0 +1,533 @@
+import argparse
+import importlib
+import json
+import os
+import sys
+from collections import deque
+from itertools import islice
+
+from . import benchmark
+from .cache import ResultCache
+from .certificate import certificate_status, make_certificate
+from .enumeration import enumeration_options, graph_edges, iter_level, iter_planar_graphs
+from .graph import solve_batch
+from .graph_io import READERS, build_graph, encode_graph6, read_graphs
+from .profiler import Profiler, profiling
+from .solver import SolverControl, face_size_counts
+
+# Консольный режим без GUI: tkinter здесь не импортируется
+
+# бюджет холодного старта команды check на один граф (интерпретатор, импорт
+# networkx и сама проверка), мс — см. команду startup
+STARTUP_BUDGET_MS = 1000
+
+VERDICTS = {
+    True: 'may_be_hamiltonian',
+    False: 'not_hamiltonian',
+}
+
+
+# кэш результатов открывается в каждом процессе один раз
+_result_caches = {}
+
+
+def open_cache(path):
+    if path is None:
+        return None
+    if path not in _result_caches:
+        _result_caches[path] = ResultCache(path)
+    return _result_caches[path]
+
+
+def check_record(record, time_budget=None, with_faces=False, cache_path=None, exact=False,
+                 memory_budget=256, mode='counts', solver_jobs=1, certificate=False,
+                 profile=False):
+    """Проверка одного графа; результат — словарь для одной строки JSON Lines.
+
+    При profile замеры этапов возвращаются в row['profile'].
+    """
+    name, graph = _build(record)
+    return _check_built(name, graph, time_budget, with_faces, cache_path, exact, memory_budget,
+                        mode, solver_jobs, certificate, profile)
+
+
+def _build(record):
+    # (имя, GraphNX) или (имя, строка с ошибкой разбора)
+    name, vertices, edges = record
+    if vertices is None:
+        return name, {'name': name, 'error': edges}  # испорченная запись при чтении
+    try:
+        return name, build_graph(vertices, edges)
+    except Exception as e:
+        return name, {'name': name, 'error': f"{type(e).__name__}: {e}"}
+
+
+def _check_built(name, graph, time_budget, with_faces, cache_path, exact, memory_budget, mode,
+                 solver_jobs, certificate, profile):
+    if isinstance(graph, dict):
+        return graph
+    if not profile:
+        return check_graph(name, graph, time_budget, with_faces, cache_path, exact,
+                           memory_budget, mode, solver_jobs, certificate)
+    with profiling() as profiler:
+        row = check_graph(name, graph, time_budget, with_faces, cache_path, exact,
+                          memory_budget, mode, solver_jobs, certificate)
+    row['profile'] = profiler.to_dict()
+    return row
+
+
+def check_graph(name, graph, time_budget=None, with_faces=False, cache_path=None, exact=False,
+                memory_budget=256, mode='counts', solver_jobs=1, certificate=False):
+    """Проверка уже построенного GraphNX (анализ, сделанный до вызова, переиспользуется)"""
+    try:
+        control = SolverControl(time_budget) if time_budget else None
+        mutable_params = []
+        report = {}
+        result = graph.greenberg_condition(mutable_params, control, open_cache(cache_path), mode,
+                                           report, solver_jobs)
+
+        row = {
+            'name': name,
+            'vertices': graph.number_of_vertices(),
+            'edges': graph.number_of_edges(),
+        }
+        if result is True or result is False:
+            # теорема применялась, значит граф планарный и двусвязный
+            # (из кэша результат приходит без анализа планарности)
+            row['planar'] = True
+            row['biconnected'] = True
+        else:
+            row['planar'] = graph.is_planar()
+            row['biconnected'] = graph.is_biconnected()
+        # в двойственном режиме найденное разбиение задаёт гамильтонов цикл
+        row['greenberg'] = 'hamiltonian' if mode == 'dual' and result is True \
+            else VERDICTS.get(result, result)
+        if 'rule' in report:
+            row['rule'] = report['rule']
+        if mutable_params:
+            f_prime, f_double_prime = mutable_params
+            row['partition'] = {
+                'f_prime_k': face_size_counts(f_prime),
+                'f_double_prime_k': face_size_counts(f_double_prime),
+            }
+            if with_faces:
+                row['partition']['f_prime'] = f_prime
+                row['partition']['f_double_prime'] = f_double_prime
+        if certificate:
+            row['certificate'] = make_certificate(graph, result, mutable_params, mode)
+        if exact and (result == 'nonplanar' or result is True and mode != 'dual'):
+            # теорема не дала ответа: точный поиск цикла в том же лимите времени
+            cycle = graph.find_hamiltonian_cycle(control, memory_budget=memory_budget * 1024 * 1024,
+                                                 jobs=solver_jobs)
+            if isinstance(cycle, list):
+                row['hamiltonian'] = True
+                row['cycle'] = cycle
+            else:
+                row['hamiltonian'] = cycle if isinstance(cycle, str) else False
+        return row
+    except Exception as e:
+        return {'name': name, 'error': f"{type(e).__name__}: {e}"}
+
+
+def check_chunk(records, time_budget=None, with_faces=False, cache_path=None, exact=False,
+                memory_budget=256, mode='counts', solver_jobs=1, certificate=False,
+                profile=False):
+    """Проверка пачки графов; разбиения для всей пачки ищутся одним проходом (solve_batch)"""
+    built = [_build(record) for record in records]
+    if mode == 'counts' and cache_path is None:
+        # с кэшем результатов на диске большая часть графов до поиска не доходит
+        solve_batch([graph for _, graph in built if not isinstance(graph, dict)])
+    return [_check_built(name, graph, time_budget, with_faces, cache_path, exact, memory_budget,
+                         mode, solver_jobs, certificate, profile)
+            for name, graph in built]
+
+
+def iter_chunks(records, chunk_size):
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_check(args):
+    records = read_graphs(args.inputs, args.format)
+    chunks = iter_chunks(records, args.chunk_size)
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    profile_out = open(args.profile, 'w', encoding='utf-8') if args.profile else None
+    # для Prometheus замеры суммируются по всем графам и пишутся в конце
+    total = Profiler()
+    checked = 0
+
+    def write(rows):
+        nonlocal checked
+        for row in rows:
+            profile = row.pop('profile', None)
+            out.write(json.dumps(row, ensure_ascii=False) + '\n')
+            if profile is None:
+                continue
+            if args.profile_format == 'jsonl':
+                profile_out.write(json.dumps({'name': row['name'], **profile},
+                                             ensure_ascii=False) + '\n')
+            else:
+                total.merge(profile)
+        checked += len(rows)
+
+    try:
+        if args.jobs == 1:
+            for chunk in chunks:
+                write(check_chunk(chunk, args.time_budget, args.faces, args.cache, args.exact,
+                                  args.memory_budget, args.mode, args.solver_jobs,
+                                  args.certificate, profile_out is not None))
+        else:
+            # ограничиваем число блоков в работе, чтобы память не росла
+            # с размером входа; результаты выводятся в порядке чтения
+            max_pending = args.jobs * 4
+            pending = deque()
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+                for chunk in chunks:
+                    pending.append(pool.submit(check_chunk, chunk, args.time_budget,
+                                               args.faces, args.cache, args.exact,
+                                               args.memory_budget, args.mode,
+                                               args.solver_jobs, args.certificate,
+                                               profile_out is not None))
+                    if len(pending) >= max_pending:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+        if profile_out is not None and args.profile_format == 'prometheus':
+            profile_out.write(total.prometheus())
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if profile_out is not None:
+            profile_out.close()
+
+    print(f"Проверено графов: {checked}", file=sys.stderr)
+    return 0
+
+
+def run_verify(args):
+    """Проверка сертификатов из JSON Lines (строки check --certificate или сами сертификаты)"""
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    checked = invalid = unverifiable = 0
+    try:
+        for path in args.inputs or ['-']:
+            lines = sys.stdin if path == '-' else open(path, encoding='utf-8')
+            try:
+                for number, line in enumerate(lines):
+                    if not line.strip():
+                        continue
+                    name = f"{path}:{number}"
+                    try:
+                        row = json.loads(line)
+                        if not isinstance(row, dict):
+                            raise ValueError("строка не является объектом JSON")
+                        # сам сертификат узнаётся по полю version; у строки check
+                        # без --certificate или с ошибкой сертификата нет
+                        certificate = row if 'version' in row else row.get('certificate')
+                        name = row.get('name', name)
+                    except ValueError as e:
+                        status, messages = 'invalid', [f"некорректная строка: {e}"]
+                    else:
+                        if certificate is None:
+                            status = 'invalid'
+                            messages = [row['error'] if 'error' in row else
+                                        "сертификата нет (проверка не завершилась"
+                                        " или запущена без --certificate)"]
+                        else:
+                            status, messages = certificate_status(certificate)
+                    checked += 1
+                    invalid += status == 'invalid'
+                    unverifiable += status == 'unverifiable'
+                    # непроверяемый сертификат не верен и не неверен
+                    result = {'name': name,
+                              'valid': None if status == 'unverifiable' else status == 'valid'}
+                    if status == 'unverifiable':
+                        result['unverifiable'] = messages
+                    elif messages:
+                        result['errors'] = messages
+                    out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            finally:
+                if lines is not sys.stdin:
+                    lines.close()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"Проверено сертификатов: {checked}, неверных: {invalid}, "
+          f"непроверяемых: {unverifiable}", file=sys.stderr)
+    # 1 — есть неверные, 2 — неверных нет, но есть непроверяемые
+    return 1 if invalid else 2 if unverifiable else 0
+
+
+def _found(row):
+    # что ищет перебор: негамильтоновы графы (по теореме или точным поиском),
+    # графы без ответа из-за лимита времени и ошибки
+    return ('error' in row or row.get('greenberg') in ('not_hamiltonian', 'inconclusive')
+            or row.get('hamiltonian') in (False, 'inconclusive'))
+
+
+def enumerate_unit(unit, n, options, time_budget=None, cache_path=None, exact=False,
+                   memory_budget=256, mode='counts', report_all=False):
+    """Проверка графов одного шарда перебора: (число графов, строки для вывода)"""
+    graphs, rows = 0, []
+    vertices = [str(v) for v in range(n)]
+    for adj in iter_planar_graphs(n, options, unit):
+        edges = graph_edges(adj)
+        graph = build_graph(vertices, [(str(u), str(v)) for u, v in edges])
+        # грани считаются один раз: анализ переиспользует проверка
+        if options.min_face > 3 and graph.is_biconnected() \
+                and min(len(face) for face in graph.get_faces()) < options.min_face:
+            continue
+        graphs += 1
+        row = check_graph(encode_graph6(n, edges), graph, time_budget, False, cache_path, exact,
+                          memory_budget, mode)
+        if report_all or _found(row):
+            rows.append(row)
+    return graphs, rows
+
+
+def _read_checkpoint(path, header):
+    # число готовых шардов; шарды завершаются по порядку, строка на шард
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path, encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if not lines:
+        return 0
+    if lines[0] != header:
+        raise ValueError(f"контрольная точка {path} записана с другими параметрами перебора")
+    return len(lines) - 1
+
+
+def run_enumerate(args):
+    """Перебор планарных графов на n вершинах с проверкой каждого"""
+    options = enumeration_options(args.cubic, args.connectivity, args.min_face, args.max_degree)
+    shard_level = min(args.n, args.shard_level or max(1, args.n - 3))
+    header = {'n': args.n, 'options': options._asdict(), 'shard_level': shard_level,
+              'mode': args.mode, 'exact': args.exact, 'all': args.all}
+    if args.checkpoint and not args.output:
+        print("Для --checkpoint нужен файл результатов -o", file=sys.stderr)
+        return 2
+    try:
+        done = _read_checkpoint(args.checkpoint, header)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    # при продолжении результаты дописываются; шард, прерванный после записи
+    # строк, но до отметки в контрольной точке, будет выведен повторно
+    out = open(args.output, 'a' if done else 'w', encoding='utf-8') if args.output else sys.stdout
+    checkpoint = open(args.checkpoint, 'a', encoding='utf-8') if args.checkpoint else None
+    if checkpoint is not None and not done:
+        checkpoint.truncate(0)
+        checkpoint.write(json.dumps(header) + '\n')
+        checkpoint.flush()
+    units = islice(iter_level(shard_level, args.n, options), done, None)
+    unit_args = (args.n, options, args.time_budget, args.cache, args.exact, args.memory_budget,
+                 args.mode, args.all)
+    checked = found = 0
+
+    def write(result):
+        nonlocal checked, found, done
+        graphs, rows = result
+        for row in rows:
+            out.write(json.dumps(row, ensure_ascii=False) + '\n')
+        out.flush()
+        checked += graphs
+        found += len(rows)
+        if checkpoint is not None:
+            os.fsync(out.fileno())
+            mark = {'unit': done, 'graphs': graphs, 'found': len(rows)}
+            checkpoint.write(json.dumps(mark) + '\n')
+            checkpoint.flush()
+        done += 1
+
+    try:
+        if args.jobs == 1:
+            for unit in units:
+                write(enumerate_unit(unit, *unit_args))
+        else:
+            # как в check: ограниченное число шардов в работе, вывод по порядку
+            max_pending = args.jobs * 4
+            pending = deque()
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+                for unit in units:
+                    pending.append(pool.submit(enumerate_unit, unit, *unit_args))
+                    if len(pending) >= max_pending:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if checkpoint is not None:
+            checkpoint.close()
+
+    print(f"Проверено графов: {checked}, выведено: {found}, шардов готово: {done}",
+          file=sys.stderr)
+    return 0
+
+
+def run_gui(args):
+    try:
+        from .gui import main as gui_main
+    except ImportError as e:
+        # tkinter — необязательная зависимость, консольный режим без него работает
+        print(f"GUI недоступен: {e}. Нужен tkinter (например, пакет python3-tk)",
+              file=sys.stderr)
+        return 1
+    gui_main()
+    return 0
+
+
+def _handler(module, name):
+    # модуль подкоманды (asyncio для serve и т. п.) импортируется только при её запуске
+    def run(args):
+        return getattr(importlib.import_module(f'.{module}', __package__), name)(args)
+    return run
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='greenberg',
+        description="Проверка графов на негамильтоновость по теореме Гринберга без GUI")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    check = commands.add_parser('check', help="проверить графы и вывести JSON Lines")
+    check.add_argument('inputs', nargs='*',
+                       help="файлы с графами ('-' или ничего — стандартный ввод)")
+    check.add_argument('-f', '--format', choices=sorted(READERS),
+                       help="формат входа (по умолчанию — по расширению файла)")
+    check.add_argument('-o', '--output', help="файл для результатов (по умолчанию stdout)")
+    check.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                       help="число процессов (1 — без пула)")
+    check.add_argument('--solver-jobs', type=int, default=1, metavar='N',
+                       help="процессов на поиск деревьев граней (--mode dual) и цикла"
+                            " (--exact) одного графа; вместе с -j 1")
+    check.add_argument('--chunk-size', type=int, default=256,
+                       help="сколько графов отправлять процессу за раз")
+    check.add_argument('--time-budget', type=float, default=None,
+                       help="лимит времени на граф в секундах")
+    check.add_argument('--faces', action='store_true',
+                       help="выводить сами грани разбиения, а не только f'_k и f''_k")
+    check.add_argument('--cache', metavar='PATH',
+                       help="файл SQLite для кэша результатов между запусками")
+    check.add_argument('--mode', choices=['counts', 'dual'], default='counts',
+                       help="counts — разбиение по f_k; dual — только разбиения, где f' и f''"
+                            " образуют деревья в двойственном графе")
+    check.add_argument('--exact', action='store_true',
+                       help="если теорема не дала ответа, искать гамильтонов цикл точно")
+    check.add_argument('--memory-budget', type=int, default=256, metavar='MIB',
+                       help="память для таблицы Хелда-Карпа при --exact, МиБ")
+    check.add_argument('--certificate', action='store_true',
+                       help="добавлять сертификат результата для проверки командой verify")
+    check.add_argument('--profile', metavar='PATH',
+                       help="файл для замеров этапов (время, состояния перебора, клетки ДП,"
+                            " попадания в кэш)")
+    check.add_argument('--profile-format', choices=['jsonl', 'prometheus'], default='jsonl',
+                       help="jsonl — строка на граф; prometheus — суммы по всем графам"
+                            " в текстовом формате Prometheus")
+    check.set_defaults(handler=run_check)
+
+    verify = commands.add_parser(
+        'verify', help="проверить сертификаты без повторного анализа (код 1 — есть неверные, "
+                       "2 — есть непроверяемые опровержения перебором)")
+    verify.add_argument('inputs', nargs='*',
+                        help="файлы JSON Lines ('-' или ничего — стандартный ввод)")
+    verify.add_argument('-o', '--output', help="файл для результатов (по умолчанию stdout)")
+    verify.set_defaults(handler=run_verify)
+
+    enum = commands.add_parser('enumerate',
+                               help="перебрать планарные графы на n вершинах и проверить каждый")
+    enum.add_argument('n', type=int, help="число вершин")
+    enum.add_argument('--cubic', action='store_true', help="только кубические графы")
+    enum.add_argument('--connectivity', type=int, choices=[1, 2, 3], default=2,
+                      help="наименьшая вершинная связность (по умолчанию 2)")
+    enum.add_argument('--min-face', type=int, default=3, metavar='K',
+                      help="наименьший размер грани")
+    enum.add_argument('--max-degree', type=int, default=None, metavar='D',
+                      help="наибольшая степень вершины")
+    enum.add_argument('--all', action='store_true',
+                      help="выводить все графы, а не только негамильтоновы и неясные")
+    enum.add_argument('-o', '--output', help="файл для результатов (по умолчанию stdout)")
+    enum.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                      help="число процессов (1 — без пула)")
+    enum.add_argument('--shard-level', type=int, default=None, metavar='L',
+                      help="шард — поддерево графа на L вершинах (по умолчанию n - 3)")
+    enum.add_argument('--checkpoint', metavar='PATH',
+                      help="файл контрольных точек: при повторном запуске перебор продолжится")
+    enum.add_argument('--time-budget', type=float, default=None,
+                      help="лимит времени на граф в секундах")
+    enum.add_argument('--cache', metavar='PATH',
+                      help="файл SQLite для кэша результатов между запусками")
+    enum.add_argument('--mode', choices=['counts', 'dual'], default='counts',
+                      help="режим проверки, как в check")
+    enum.add_argument('--exact', action='store_true',
+                      help="если теорема не дала ответа, искать гамильтонов цикл точно")
+    enum.add_argument('--memory-budget', type=int, default=256, metavar='MIB',
+                      help="память для таблицы Хелда-Карпа при --exact, МиБ")
+    enum.set_defaults(handler=run_enumerate)
+
+    serve = commands.add_parser('serve', help="локальный сервис проверки (JSON-RPC построчно)")
+    serve.add_argument('--host', default='127.0.0.1', help="адрес (по умолчанию только localhost)")
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--unix', metavar='PATH', help="Unix-сокет вместо TCP")
+    serve.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                       help="процессов в пуле")
+    serve.add_argument('--batch-size', type=int, default=16,
+                       help="наибольшее число графов в пачке для одного процесса")
+    serve.add_argument('--batch-window', type=float, default=1.0, metavar='MS',
+                       help="сколько первый запрос пачки ждёт остальных, мс")
+    serve.add_argument('--queue-size', type=int, default=1024,
+                       help="сколько запросов может ждать пула; сверх — отказ OVERLOADED")
+    serve.add_argument('--max-inflight', type=int, default=64,
+                       help="запросов в работе на одно соединение")
+    serve.add_argument('--deadline-ms', type=float, default=None,
+                       help="лимит времени на запрос по умолчанию, мс")
+    serve.add_argument('--cache-size', type=int, default=10000,
+                       help="результатов в кэше в памяти")
+    serve.add_argument('--cache', metavar='PATH',
+                       help="файл SQLite для кэша результатов в процессах пула")
+    serve.set_defaults(handler=_handler('service', 'run_serve'))
+
+    load = commands.add_parser('load', help="нагрузочный прогон сервиса: пропускная способность"
+                                            " и задержки p50/p99")
+    load.add_argument('--host', default='127.0.0.1')
+    load.add_argument('--port', type=int, default=8765)
+    load.add_argument('--unix', metavar='PATH', help="Unix-сокет вместо TCP")
+    load.add_argument('-n', '--requests', type=int, default=2000)
+    load.add_argument('-c', '--concurrency', type=int, default=16,
+                      help="число соединений, в каждом запросы идут по одному")
+    load.add_argument('--distinct', type=int, default=200,
+                      help="различных графов (остальные запросы — повторы)")
+    load.add_argument('--deadline-ms', type=float, default=None)
+    load.add_argument('--seed', type=int, default=0)
+    load.set_defaults(handler=_handler('service', 'run_load'))
+
+    startup = commands.add_parser('startup', help="время холодного старта проверки одного графа"
+                                                  " против бюджета (код 1 при превышении)")
+    startup.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS,
+                         help=f"бюджет, мс (по умолчанию {STARTUP_BUDGET_MS:g})")
+    startup.add_argument('--repeat', type=int, default=5, help="число замеров, берётся лучший")
+    startup.set_defaults(handler=_handler('benchmark', 'run_startup'))
+
+    gui = commands.add_parser('gui', help="графический редактор (нужен tkinter)")
+    gui.set_defaults(handler=run_gui)
+
+    bench = commands.add_parser('bench', help="замеры скорости на семействах графов")
+    benchmark.add_arguments(bench)
+    bench.set_defaults(handler=_handler('benchmark', 'run'))
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+from array import array
+
+
+class GraphCore:
+    """Компактное ядро графа: целые id вершин и битовые маски смежности.
+
+    Метки вершин (строки) хранятся только в таблице labels <-> ids, вся
+    остальная работа идёт по целым id. Освободившиеся id переиспользуются.
+    Вес хранится только для рёбер с весом, отличным от 1.
+    """
+
+    __slots__ = ('labels', 'ids', 'adj', 'free', 'edge_count', 'weights', '_csr', '_nx')
+
+    def __init__(self):
+        self.labels = []  # id -> метка (None для свободного id)
+        self.ids = {}  # метка -> id
+        self.adj = []  # id -> битовая маска соседей
+        self.free = []
+        self.edge_count = 0
+        self.weights = {}
+        self._csr = None
+        self._nx = None
+
+    def _changed(self):
+        self._csr = None
+        self._nx = None
+
+    def copy(self):
+        other = GraphCore()
+        other.labels = list(self.labels)
+        other.ids = dict(self.ids)
+        other.adj = list(self.adj)
+        other.free = list(self.free)
+        other.edge_count = self.edge_count
+        other.weights = dict(self.weights)
+        return other
+
+    def vertex_count(self):
+        return len(self.ids)
+
+    def vertices(self):
+        return [v for v, label in enumerate(self.labels) if label is not None]
+
+    def add_vertex(self, label):
+        vertex = self.ids.get(label)
+        if vertex is not None:
+            return vertex
+        if self.free:
+            vertex = self.free.pop()
+            self.labels[vertex] = label
+        else:
+            vertex = len(self.labels)
+            self.labels.append(label)
+            self.adj.append(0)
+        self.ids[label] = vertex
+        self._changed()
+        return vertex
+
+    def remove_vertex(self, label):
+        vertex = self.ids.pop(label)
+        bit = 1 << vertex
+        for u in self.neighbors(vertex):
+            self.adj[u] &= ~bit
+            self.weights.pop((min(u, vertex), max(u, vertex)), None)
+            self.edge_count -= 1
+        self.adj[vertex] = 0
+        self.labels[vertex] = None
+        self.free.append(vertex)
+        self._changed()
+
+    def add_edge(self, u, v, weight=1):
+        if not (self.adj[u] >> v) & 1:
+            self.adj[u] |= 1 << v
+            self.adj[v] |= 1 << u
+            self.edge_count += 1
+            self._changed()
+        key = (min(u, v), max(u, v))
+        if weight == 1:
+            self.weights.pop(key, None)
+        else:
+            self.weights[key] = weight
+
+    def remove_edge(self, u, v):
+        if not (self.adj[u] >> v) & 1:
+            return False
+        self.adj[u] &= ~(1 << v)
+        self.adj[v] &= ~(1 << u)
+        self.weights.pop((min(u, v), max(u, v)), None)
+        self.edge_count -= 1
+        self._changed()
+        return True
+
+    def clear_edges(self):
+        self.adj = [0] * len(self.adj)
+        self.weights = {}
+        self.edge_count = 0
+        self._changed()
+
+    def has_edge(self, u, v):
+        return bool((self.adj[u] >> v) & 1)
+
+    def degree(self, vertex):
+        return self.adj[vertex].bit_count()
+
+    def neighbors(self, vertex):
+        mask = self.adj[vertex]
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def edges(self):
+        for u in range(len(self.adj)):
+            for v in self.neighbors(u):
+                if v > u:
+                    yield u, v
+
+    def weight(self, u, v):
+        return self.weights.get((min(u, v), max(u, v)), 1)
+
+    def csr(self):
+        """CSR-представление (offsets, targets), строится один раз на ревизию"""
+        if self._csr is None:
+            offsets = array('l', [0])
+            targets = array('l')
+            for u in range(len(self.adj)):
+                targets.extend(self.neighbors(u))
+                offsets.append(len(targets))
+            self._csr = (offsets, targets)
+        return self._csr
+
+    def to_networkx(self):
+        """Граф networkx на целых id — только для алгоритмов планарности"""
+        if self._nx is None:
+            import networkx as nx
+            graph = nx.Graph()
+            graph.add_nodes_from(self.vertices())
+            graph.add_edges_from(self.edges())
+            self._nx = graph
+        return self._nx
+
+    def is_connected(self):
+        vertices = self.vertices()
+        if not vertices:
+            return False
+        offsets, targets = self.csr()
+        seen = {vertices[0]}
+        stack = [vertices[0]]
+        while stack:
+            u = stack.pop()
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if v not in seen:
+                    seen.add(v)
+                    stack.append(v)
+        return len(seen) == len(vertices)
+
+    def is_biconnected(self):
+        """Связность без точек сочленения (не меньше 3 вершин), итеративный DFS"""
+        vertices = self.vertices()
+        if len(vertices) < 3:
+            return False
+        offsets, targets = self.csr()
+        root = vertices[0]
+        order = {root: 0}
+        low = {root: 0}
+        root_children = 0
+        # стек: (вершина, родитель, позиция в списке соседей)
+        stack = [(root, -1, offsets[root])]
+        while stack:
+            u, parent, i = stack[-1]
+            if i < offsets[u + 1]:
+                stack[-1] = (u, parent, i + 1)
+                v = targets[i]
+                if v not in order:
+                    order[v] = low[v] = len(order)
+                    if u == root:
+                        root_children += 1
+                    stack.append((v, u, offsets[v]))
+                elif v != parent:
+                    low[u] = min(low[u], order[v])
+                continue
+            stack.pop()
+            if parent != -1:
+                low[parent] = min(low[parent], low[u])
+                if parent != root and low[u] >= order[parent]:
+                    return False  # parent — точка сочленения
+        return len(order) == len(vertices) and root_children == 1
@@ -0,0 +1,640 @@
+from collections import deque, namedtuple
+
+# Разложение графа для проверки по частям: блоки (дерево блоков и точек
+# сочленения) и трисвязные компоненты каждого блока (SPQR-дерево, алгоритм
+# Хопкрофта-Тарьяна в исправленном виде Гутвенгера-Мутцеля, за O(V + E)).
+# Все обходы итеративные: глубина DFS на больших графах не ограничена стеком.
+
+# Трисвязная компонента (узел SPQR-дерева): kind — 'P' (пучок рёбер между
+# двумя вершинами), 'S' (простой цикл) или 'R' (трисвязный граф); edges —
+# номера рёбер в SPQRTree.ends. Виртуальное ребро (номер не меньше
+# SPQRTree.real) есть ровно в двух компонентах и задаёт ребро дерева.
+TriconnectedComponent = namedtuple('TriconnectedComponent', 'kind edges')
+
+
+def biconnected_blocks(n, edges):
+    """Блоки графа на вершинах 0..n-1: (списки номеров рёбер, точки сочленения).
+
+    Мост — блок из одного ребра; изолированные вершины в блоки не входят.
+    """
+    incident = [[] for _ in range(n)]
+    for e, (u, v) in enumerate(edges):
+        incident[u].append(e)
+        incident[v].append(e)
+    order = [0] * n
+    low = [0] * n
+    blocks, cut_vertices = [], set()
+    counter = 0
+    for root in range(n):
+        if order[root] or not incident[root]:
+            continue
+        counter += 1
+        order[root] = low[root] = counter
+        root_children = 0
+        edge_stack = []
+        # стек: (вершина, ребро, по которому пришли, позиция в списке рёбер)
+        stack = [(root, -1, 0)]
+        while stack:
+            v, via, i = stack[-1]
+            if i < len(incident[v]):
+                stack[-1] = (v, via, i + 1)
+                e = incident[v][i]
+                if e == via:
+                    continue
+                u, w = edges[e]
+                w = w if u == v else u
+                if not order[w]:
+                    counter += 1
+                    order[w] = low[w] = counter
+                    edge_stack.append(e)
+                    if v == root:
+                        root_children += 1
+                    stack.append((w, e, 0))
+                elif order[w] < order[v]:
+                    edge_stack.append(e)
+                    low[v] = min(low[v], order[w])
+                continue
+            stack.pop()
+            if not stack:
+                continue
+            parent = stack[-1][0]
+            low[parent] = min(low[parent], low[v])
+            if low[v] >= order[parent]:
+                # parent отделяет поддерево v: рёбра до via включительно — блок
+                block = []
+                while True:
+                    e = edge_stack.pop()
+                    block.append(e)
+                    if e == via:
+                        break
+                blocks.append(block)
+                if parent != root:
+                    cut_vertices.add(parent)
+        if root_children > 1:
+            cut_vertices.add(root)
+    return blocks, cut_vertices
+
+
+class SPQRTree:
+    """SPQR-дерево двусвязного простого графа (не меньше трёх рёбер).
+
+    ends — концы всех рёбер: сначала рёбра графа в порядке edges (номера
+    0..real-1), затем виртуальные; nodes — трисвязные компоненты. Соседние
+    узлы одного типа P или S слиты, поэтому разложение однозначно.
+    """
+
+    def __init__(self, edges):
+        labels = sorted({v for edge in edges for v in edge})
+        index = {v: i for i, v in enumerate(labels)}
+        local = [(index[u], index[v]) for u, v in edges]
+        self.real = len(edges)
+        components, ends = _triconnected_components(len(labels), local)
+        self.ends = [(labels[u], labels[v]) for u, v in ends]
+        self.nodes = _assemble(components, ends, self.real)
+
+    def vertices(self, node):
+        """Вершины компоненты (в порядке первого появления в её рёбрах)"""
+        seen = {}
+        for e in self.nodes[node].edges:
+            u, v = self.ends[e]
+            seen.setdefault(u)
+            seen.setdefault(v)
+        return list(seen)
+
+    def is_triconnected(self):
+        """Нет пары разделяющих вершин: один узел R или треугольник"""
+        return len(self.nodes) == 1 and (self.nodes[0].kind == 'R' or self.real == 3)
+
+    def wide_bonds(self):
+        """Узлы P с тремя и более виртуальными рёбрами: (u, v) для каждого.
+
+        Без пары u, v граф распадается на столько же частей, сколько
+        виртуальных рёбер, а гамильтонов цикл проходит не больше двух.
+        """
+        for component in self.nodes:
+            if component.kind == 'P' and sum(e >= self.real for e in component.edges) >= 3:
+                yield self.ends[component.edges[0]]
+
+
+class Decomposition:
+    """Блоки графа и SPQR-деревья блоков; вершины — целые id ядра.
+
+    Дерево блока строится при первом обращении: для двусвязного графа
+    блок один, и больше ничего не считается.
+    """
+
+    def __init__(self, vertices, edges):
+        self.vertices = list(vertices)
+        self.edges = list(edges)
+        n = max(self.vertices) + 1 if self.vertices else 0
+        self.blocks, self.cut_vertices = biconnected_blocks(n, self.edges)
+        self._trees = {}
+
+    def is_biconnected(self):
+        """Один блок на всех вершинах (не меньше трёх)"""
+        if len(self.vertices) < 3 or len(self.blocks) != 1:
+            return False
+        return len({v for e in self.blocks[0] for v in self.edges[e]}) == len(self.vertices)
+
+    def tree(self, block=0):
+        """SPQR-дерево блока (None для моста)"""
+        if block not in self._trees:
+            edges = [self.edges[e] for e in self.blocks[block]]
+            self._trees[block] = SPQRTree(edges) if len(edges) >= 3 else None
+        return self._trees[block]
+
+    def is_triconnected(self):
+        """Связность без точек сочленения и пар разделяющих вершин"""
+        return self.is_biconnected() and self.tree().is_triconnected()
+
+    def separation_pair(self):
+        """Пара вершин, без которой граф распадается на три части и больше, или None"""
+        for block in range(len(self.blocks)):
+            tree = self.tree(block)
+            if tree is not None:
+                for pair in tree.wide_bonds():
+                    return pair
+        return None
+
+    def skeletons(self):
+        """Узлы R по всем блокам: (дерево, номер узла)"""
+        for block in range(len(self.blocks)):
+            tree = self.tree(block)
+            if tree is None:
+                continue
+            for node, component in enumerate(tree.nodes):
+                if component.kind == 'R':
+                    yield tree, node
+
+
+def skeleton(tree, node):
+    """Скелет узла R, где каждое виртуальное ребро подразбито вершиной.
+
+    Возвращает (вершины, adj): сначала вершины узла, затем по вершине на
+    виртуальное ребро; adj — битовые маски соседей. Гамильтонов цикл графа
+    проходит каждое виртуальное ребро узла, поэтому он есть только тогда,
+    когда есть гамильтонов цикл такого скелета.
+    """
+    vertices = tree.vertices(node)
+    index = {v: i for i, v in enumerate(vertices)}
+    adj = [0] * len(vertices)
+    for e in tree.nodes[node].edges:
+        u, v = index[tree.ends[e][0]], index[tree.ends[e][1]]
+        if e >= tree.real:
+            middle = len(adj)
+            adj.append((1 << u) | (1 << v))
+            adj[u] |= 1 << middle
+            adj[v] |= 1 << middle
+        else:
+            adj[u] |= 1 << v
+            adj[v] |= 1 << u
+    return vertices, adj
+
+
+def cycle_edges(tree, cycles):
+    """Рёбра гамильтонова цикла блока, собранного из циклов скелетов.
+
+    cycles[node] — гамильтонов цикл скелета узла R (номера вершин из
+    skeleton). Каждое ребро графа лежит ровно в одном узле, а виртуальные
+    рёбра заменяются путями соседних узлов, поэтому в цикл входят рёбра
+    циклов скелетов R между вершинами узла и все рёбра узлов S.
+    """
+    edges = []
+    for node, component in enumerate(tree.nodes):
+        if component.kind == 'S':
+            edges.extend(tree.ends[e] for e in component.edges if e < tree.real)
+        elif component.kind == 'R':
+            vertices = tree.vertices(node)
+            cycle = cycles[node]
+            for a, b in zip(cycle, cycle[1:] + cycle[:1]):
+                if a < len(vertices) and b < len(vertices):
+                    edges.append((vertices[a], vertices[b]))
+    return edges
+
+
+def _triconnected_components(n, edges):
+    # Разбиение на расщеплённые компоненты (ещё не слитые): список
+    # [kind, рёбра] и концы всех рёбер, включая созданные виртуальные.
+    # Граф простой и двусвязный, поэтому кратные рёбра отщеплять не нужно.
+    src = [u for u, _ in edges]
+    dst = [v for _, v in edges]
+    # тип ребра: 0 — не пройдено, 1 — ребро дерева, 2 — обратное, 3 — удалено
+    etype = [0] * len(edges)
+    components = []
+    if len(edges) < 3:
+        return components, list(zip(src, dst))
+
+    def new_edge(u, v, kind=0):
+        src.append(u)
+        dst.append(v)
+        etype.append(kind)
+        in_adj.append(-1)
+        in_high.append(None)
+        starts.append(False)
+        return len(src) - 1
+
+    incident = [[] for _ in range(n)]
+    for e, (u, v) in enumerate(edges):
+        incident[u].append(e)
+        incident[v].append(e)
+
+    # DFS 1: дерево и обратные рёбра, номера, LOWPT1, LOWPT2, ND
+    number = [0] * n
+    parent = [-1] * n
+    lowpt1 = [0] * n
+    lowpt2 = [0] * n
+    nd = [1] * n
+    tree_arc = [-1] * n
+    degree = [len(around) for around in incident]
+    root, count = 0, 1
+    number[root] = lowpt1[root] = lowpt2[root] = 1
+    stack = [(root, 0)]
+    while stack:
+        v, i = stack[-1]
+        if i < len(incident[v]):
+            stack[-1] = (v, i + 1)
+            e = incident[v][i]
+            if etype[e]:
+                continue
+            w = dst[e] if src[e] == v else src[e]
+            src[e], dst[e] = v, w
+            if not number[w]:
+                etype[e] = 1
+                tree_arc[w] = e
+                parent[w] = v
+                count += 1
+                number[w] = lowpt1[w] = lowpt2[w] = count
+                stack.append((w, 0))
+            else:
+                etype[e] = 2
+                if number[w] < lowpt1[v]:
+                    lowpt2[v] = lowpt1[v]
+                    lowpt1[v] = number[w]
+                elif number[w] > lowpt1[v]:
+                    lowpt2[v] = min(lowpt2[v], number[w])
+            continue
+        stack.pop()
+        u = parent[v]
+        if u < 0:
+            continue
+        if lowpt1[v] < lowpt1[u]:
+            lowpt2[u] = min(lowpt1[u], lowpt2[v])
+            lowpt1[u] = lowpt1[v]
+        elif lowpt1[v] == lowpt1[u]:
+            lowpt2[u] = min(lowpt2[u], lowpt2[v])
+        else:
+            lowpt2[u] = min(lowpt2[u], lowpt1[v])
+        nd[u] += nd[v]
+
+    # допустимый порядок смежности: сортировка рёбер по phi корзинами
+    buckets = [[] for _ in range(3 * n + 3)]
+    for e in range(len(edges)):
+        v, w = src[e], dst[e]
+        if etype[e] == 1:
+            phi = 3 * lowpt1[w] if lowpt2[w] < number[v] else 3 * lowpt1[w] + 2
+        else:
+            phi = 3 * number[w] + 1
+        buckets[phi].append(e)
+
+    # списки смежности — двусвязные списки ячеек; ячейку можно удалить или
+    # заменить в ней ребро, не теряя позиции обхода
+    cell_edge, cell_next, cell_prev, cell_owner = [], [], [], []
+    head, tail, size = [-1] * n, [-1] * n, [0] * n
+    in_adj = [-1] * len(edges)
+    in_high = [None] * len(edges)
+    starts = [False] * len(edges)
+    for bucket in buckets:
+        for e in bucket:
+            v = src[e]
+            c = len(cell_edge)
+            cell_edge.append(e)
+            cell_next.append(-1)
+            cell_prev.append(tail[v])
+            cell_owner.append(v)
+            if tail[v] >= 0:
+                cell_next[tail[v]] = c
+            else:
+                head[v] = c
+            tail[v] = c
+            size[v] += 1
+            in_adj[e] = c
+
+    def delete_cell(c):
+        v = cell_owner[c]
+        before, after = cell_prev[c], cell_next[c]
+        if before >= 0:
+            cell_next[before] = after
+        else:
+            head[v] = after
+        if after >= 0:
+            cell_prev[after] = before
+        else:
+            tail[v] = before
+        size[v] -= 1
+
+    # перенумерация: потомки v — номера v .. v + ND(v) - 1, первый по
+    # порядку сын получает старшие номера; HIGHPT — списки начал обратных рёбер
+    newnum = [0] * n
+    highpt = [deque() for _ in range(n)]
+    counter = n
+    new_path = True
+    newnum[root] = counter - nd[root] + 1
+    frames = [[root, head[root]]]
+    while frames:
+        frame = frames[-1]
+        v, c = frame
+        if c < 0:
+            frames.pop()
+            if frames:
+                counter -= 1
+            continue
+        frame[1] = cell_next[c]
+        e = cell_edge[c]
+        w = dst[e]
+        if new_path:
+            new_path = False
+            starts[e] = True
+        if etype[e] == 1:
+            newnum[w] = counter - nd[w] + 1
+            frames.append([w, head[w]])
+        else:
+            entry = [newnum[v], True]
+            highpt[w].append(entry)
+            in_high[e] = entry
+            new_path = True
+    renumber = [0] * (n + 1)
+    node_at = [0] * (n + 1)
+    for v in range(n):
+        renumber[number[v]] = newnum[v]
+        node_at[newnum[v]] = v
+    for v in range(n):
+        lowpt1[v] = renumber[lowpt1[v]]
+        lowpt2[v] = renumber[lowpt2[v]]
+
+    def high(v):
+        around = highpt[v]
+        while around and not around[0][1]:
+            around.popleft()
+        return around[0][0] if around else 0
+
+    def del_high(e):
+        entry = in_high[e]
+        if entry is not None:
+            entry[1] = False
+            in_high[e] = None
+
+    def first_child_num(w):
+        return newnum[dst[cell_edge[head[w]]]] if head[w] >= 0 else 0
+
+    def finish(component, e):
+        component.append(e)
+        components.append(['R' if len(component) >= 4 else 'S', component])
+
+    # поиск пар разделяющих вершин по путям; TSTACK — тройки (h, a, b),
+    # конец сегмента отмечен a = -1
+    th, ta, tb = [0], [-1], [0]
+    estack = []
+    # кадр: вершина, текущая ячейка, следующая ячейка, outv, ребро и сын
+    # (пока ждём возврата из сына)
+    frames = [[root, -1, head[root], size[root], -1, -1]]
+    while frames:
+        frame = frames[-1]
+        v, c, c_next, outv, e, w = frame
+        vnum = newnum[v]
+        if w == -1:
+            if c_next < 0:
+                frames.pop()
+                if frames:
+                    frames[-1][5] = -frames[-1][5] - 2  # сын обработан
+                continue
+            c = c_next
+            frame[1], frame[2] = c, cell_next[c]
+            e = cell_edge[c]
+            w = dst[e]
+            wnum = newnum[w]
+            if etype[e] == 1:
+                if starts[e]:
+                    if ta[-1] > lowpt1[w]:
+                        y = 0
+                        while ta[-1] > lowpt1[w]:
+                            y = max(y, th.pop())
+                            ta.pop()
+                            b = tb.pop()
+                        th.append(max(y, wnum + nd[w] - 1))
+                        ta.append(lowpt1[w])
+                        tb.append(b)
+                    else:
+                        th.append(wnum + nd[w] - 1)
+                        ta.append(lowpt1[w])
+                        tb.append(vnum)
+                    th.append(0)
+                    ta.append(-1)
+                    tb.append(0)
+                frame[4], frame[5] = e, w
+                frames.append([w, -1, head[w], size[w], -1, -1])
+                continue
+            # обратное ребро
+            if starts[e]:
+                if ta[-1] > wnum:
+                    y = 0
+                    while ta[-1] > wnum:
+                        y = max(y, th.pop())
+                        ta.pop()
+                        b = tb.pop()
+                    th.append(y)
+                    ta.append(wnum)
+                    tb.append(b)
+                else:
+                    th.append(vnum)
+                    ta.append(wnum)
+                    tb.append(vnum)
+            if w == parent[v]:
+                eh = tree_arc[v]
+                virtual = new_edge(w, v, 1)
+                components.append(['P', [e, eh, virtual]])
+                etype[e] = 3
+                cell_edge[in_adj[eh]] = virtual
+                in_adj[virtual] = in_adj[eh]
+                tree_arc[v] = virtual
+            else:
+                estack.append(e)
+            frame[5] = -1
+            continue
+        # возврат из сына по ребру дерева e
+        w = -w - 2
+        frame[5] = -1
+        wnum = newnum[w]
+        estack.append(tree_arc[w])
+
+        # пары второго типа
+        while vnum != 1 and (ta[-1] == vnum
+                             or degree[w] == 2 and first_child_num(w) > wnum):
+            a, b = ta[-1], tb[-1]
+            if a == vnum and parent[node_at[b]] == node_at[a]:
+                th.pop()
+                ta.pop()
+                tb.pop()
+                continue
+            e_ab = -1
+            if degree[w] == 2 and first_child_num(w) > wnum:
+                e1 = estack.pop()
+                e2 = estack.pop()
+                delete_cell(in_adj[e2])
+                x = dst[e2]
+                virtual = new_edge(v, x)
+                degree[x] -= 1
+                degree[v] -= 1
+                components.append(['S', [e1, e2, virtual]])
+                if estack:
+                    top = estack[-1]
+                    if src[top] == x and dst[top] == v:
+                        e_ab = estack.pop()
+                        delete_cell(in_adj[e_ab])
+                        del_high(e_ab)
+            else:
+                h = th.pop()
+                ta.pop()
+                tb.pop()
+                component = []
+                while estack:
+                    xy = estack[-1]
+                    x, y = newnum[src[xy]], newnum[dst[xy]]
+                    if not (a <= x <= h and a <= y <= h):
+                        break
+                    estack.pop()
+                    if (x == a and y == b) or (y == a and x == b):
+                        e_ab = xy
+                        delete_cell(in_adj[xy])
+                        del_high(xy)
+                    else:
+                        if in_adj[xy] != c:
+                            delete_cell(in_adj[xy])
+                            del_high(xy)
+                        component.append(xy)
+                        degree[src[xy]] -= 1
+                        degree[dst[xy]] -= 1
+                virtual = new_edge(node_at[a], node_at[b])
+                finish(component, virtual)
+                x = node_at[b]
+            if e_ab >= 0:
+                bond = new_edge(v, x)
+                components.append(['P', [e_ab, virtual, bond]])
+                virtual = bond
+                degree[x] -= 1
+                degree[v] -= 1
+            estack.append(virtual)
+            cell_edge[c] = virtual
+            in_adj[virtual] = c
+            degree[x] += 1
+            degree[v] += 1
+            parent[x] = v
+            tree_arc[x] = virtual
+            etype[virtual] = 1
+            w, wnum = x, newnum[x]
+
+        # пара первого типа
+        if lowpt2[w] >= vnum and lowpt1[w] < vnum and (parent[v] != root or outv >= 2):
+            component = []
+            x = y = 0
+            while estack:
+                xy = estack[-1]
+                x, y = newnum[src[xy]], newnum[dst[xy]]
+                if not (wnum <= x < wnum + nd[w] or wnum <= y < wnum + nd[w]):
+                    break
+                component.append(estack.pop())
+                del_high(xy)
+                degree[src[xy]] -= 1
+                degree[dst[xy]] -= 1
+            low = node_at[lowpt1[w]]
+            virtual = new_edge(v, low)
+            finish(component, virtual)
+            if (x == vnum and y == lowpt1[w]) or (y == vnum and x == lowpt1[w]):
+                eh = estack.pop()
+                if in_adj[eh] != c:
+                    delete_cell(in_adj[eh])
+                bond = new_edge(v, low)
+                components.append(['P', [eh, virtual, bond]])
+                in_high[bond] = in_high[eh]
+                virtual = bond
+                degree[v] -= 1
+                degree[low] -= 1
+            if low != parent[v]:
+                estack.append(virtual)
+                cell_edge[c] = virtual
+                in_adj[virtual] = c
+                etype[virtual] = 2
+                if in_high[virtual] is None and high(low) < vnum:
+                    entry = [vnum, True]
+                    highpt[low].appendleft(entry)
+                    in_high[virtual] = entry
+                degree[v] += 1
+                degree[low] += 1
+            else:
+                delete_cell(c)
+                bond = new_edge(low, v, 1)
+                eh = tree_arc[v]
+                components.append(['P', [virtual, bond, eh]])
+                tree_arc[v] = bond
+                in_adj[bond] = in_adj[eh]
+                cell_edge[in_adj[eh]] = bond
+
+        if starts[e]:
+            while ta[-1] != -1:
+                th.pop()
+                ta.pop()
+                tb.pop()
+            th.pop()
+            ta.pop()
+            tb.pop()
+        while ta[-1] != -1 and tb[-1] != vnum and high(v) > th[-1]:
+            th.pop()
+            ta.pop()
+            tb.pop()
+        frame[3] = outv - 1
+
+    if estack:
+        components.append(['R' if len(estack) >= 4 else 'S', estack])
+    return components, list(zip(src, dst))
+
+
+def _assemble(components, ends, real):
+    # слияние соседних P с P и S с S по общим виртуальным рёбрам; тип
+    # каждой компоненты уточняется по её строению
+    for component in components:
+        component[0] = _kind(component[1], ends)
+    owners = {}
+    for i, (_, edges) in enumerate(components):
+        for e in edges:
+            if e >= real:
+                owners.setdefault(e, []).append(i)
+    merged = [False] * len(components)
+    nodes = []
+    for i, (kind, edges) in enumerate(components):
+        if merged[i]:
+            continue
+        merged[i] = True
+        if kind == 'R':
+            nodes.append(TriconnectedComponent(kind, list(edges)))
+            continue
+        result, pending = [], list(edges)
+        while pending:
+            e = pending.pop()
+            if e >= real:
+                other = [j for j in owners[e] if not merged[j]]
+                if other and components[other[0]][0] == kind:
+                    j = other[0]
+                    merged[j] = True
+                    pending.extend(f for f in components[j][1] if f != e)
+                    continue
+            result.append(e)
+        nodes.append(TriconnectedComponent(kind, result))
+    return nodes
+
+
+def _kind(edges, ends):
+    vertices = {v for e in edges for v in ends[e]}
+    if len(vertices) == 2:
+        return 'P'
+    if len(edges) == len(vertices):
+        return 'S'
+    return 'R'
@@ -0,0 +1,269 @@
+from collections import deque
+
+from . import profiler
+
+
+def dual_adjacency(faces):
+    """Двойственный граф по граням: для каждой грани — список (u, v, соседняя грань).
+
+    Грани двусвязного плоского графа — простые циклы, каждое ребро лежит
+    ровно на двух разных гранях.
+    """
+    edge_faces = {}
+    for i, face in enumerate(faces):
+        for a, b in zip(face, face[1:] + face[:1]):
+            edge_faces.setdefault((a, b) if a <= b else (b, a), []).append(i)
+
+    borders = [[] for _ in faces]
+    for (a, b), pair in edge_faces.items():
+        if len(pair) != 2 or pair[0] == pair[1]:
+            raise ValueError("грани должны быть простыми циклами двусвязного графа")
+        i, j = pair
+        borders[i].append((a, b, j))
+        borders[j].append((a, b, i))
+    return borders
+
+
+class _DualSearch:
+    """Перебор внутренних граней гамильтонова цикла как поддеревьев двойственного графа.
+
+    Грани внутри цикла образуют дерево в двойственном графе, грани снаружи —
+    тоже. Множество S (внутренние грани, содержит грань 0) растёт от грани к
+    грани: грань добавляется, только если у неё ровно одно общее ребро с S,
+    иначе она навсегда уходит наружу. Каждое связное S встречается один раз
+    (ветвление «взять кандидата / исключить его»), общий префикс S разделяют
+    все ветви под ним. Изменения состояния пишутся в журнал и откатываются.
+    """
+
+    def __init__(self, faces, control=None):
+        self.faces = faces
+        self.control = control
+        self.borders = dual_adjacency(faces)
+        self.weights = [len(face) - 2 for face in faces]
+        total = sum(self.weights)
+        self.target = total // 2 if total % 2 == 0 else None
+
+        count = len(faces)
+        self.in_s = [False] * count
+        self.excluded = [False] * count
+        self.shared = [0] * count  # число общих рёбер грани с S
+        self.weight = 0
+        self.free_weight = total  # вес ещё не решённых граней
+        self.excluded_count = 0
+
+        self.vertex_faces = {}
+        for i, face in enumerate(faces):
+            for v in face:
+                self.vertex_faces.setdefault(v, []).append(i)
+        # степень вершины в границе S и число её нерешённых граней
+        self.boundary = dict.fromkeys(self.vertex_faces, 0)
+        self.undecided = {v: len(fs) for v, fs in self.vertex_faces.items()}
+        self.trail = []
+        self.failed = False
+
+    def _decide(self, face):
+        self.free_weight -= self.weights[face]
+        for v in self.faces[face]:
+            self.undecided[v] -= 1
+            # все грани вокруг вершины решены: граница должна проходить через неё ровно раз
+            if self.undecided[v] == 0 and self.boundary[v] != 2:
+                self.failed = True
+
+    def _undecide(self, face):
+        self.free_weight += self.weights[face]
+        for v in self.faces[face]:
+            self.undecided[v] += 1
+
+    def include(self, face):
+        self.trail.append(('in', face))
+        self.in_s[face] = True
+        self.weight += self.weights[face]
+        boundary = self.boundary
+        for a, b, other in self.borders[face]:
+            delta = -1 if self.in_s[other] else 1
+            boundary[a] += delta
+            boundary[b] += delta
+            self.shared[other] += 1
+        self._decide(face)
+        # грань с двумя общими рёбрами замкнула бы цикл в дереве S
+        for _, _, other in self.borders[face]:
+            if not self.in_s[other] and not self.excluded[other] and self.shared[other] >= 2:
+                self.exclude(other)
+
+    def exclude(self, face):
+        self.trail.append(('out', face))
+        self.excluded[face] = True
+        self.excluded_count += 1
+        self._decide(face)
+
+    def undo(self, mark):
+        boundary = self.boundary
+        while len(self.trail) > mark:
+            kind, face = self.trail.pop()
+            self._undecide(face)
+            if kind == 'in':
+                self.in_s[face] = False
+                self.weight -= self.weights[face]
+                for a, b, other in self.borders[face]:
+                    delta = 1 if self.in_s[other] else -1
+                    boundary[a] += delta
+                    boundary[b] += delta
+                    self.shared[other] -= 1
+            else:
+                self.excluded[face] = False
+                self.excluded_count -= 1
+        self.failed = False
+
+    def complement_connected(self, all_outside=False):
+        """Исключённые грани (или все грани вне S) связны в двойственном графе без S"""
+        in_s, excluded = self.in_s, self.excluded
+        start = next((i for i in range(len(self.faces))
+                      if (excluded[i] if not all_outside else not in_s[i])), None)
+        if start is None:
+            return True
+        need = (len(self.faces) - sum(in_s)) if all_outside else self.excluded_count
+        seen = {start}
+        found = 1
+        queue = deque([start])
+        while queue and found < need:
+            face = queue.popleft()
+            for _, _, other in self.borders[face]:
+                if not in_s[other] and other not in seen:
+                    seen.add(other)
+                    queue.append(other)
+                    if all_outside or excluded[other]:
+                        found += 1
+        return found >= need
+
+    def viable(self):
+        if self.failed or self.weight > self.target:
+            return False
+        if self.weight + self.free_weight < self.target:
+            return False
+        return self.excluded_count < 2 or self.complement_connected()
+
+    def complete(self):
+        # все нерешённые грани уходят наружу: граница S — один простой цикл
+        # через все вершины, если у каждой вершины граничная степень 2
+        # и грани вне S связны
+        if any(d != 2 for d in self.boundary.values()):
+            return False
+        return self.complement_connected(all_outside=True)
+
+    def candidate(self):
+        in_s, excluded = self.in_s, self.excluded
+        best = None
+        for kind, face in self.trail:
+            if kind != 'in':
+                continue
+            for _, _, other in self.borders[face]:
+                if not in_s[other] and not excluded[other] and (best is None or other < best):
+                    best = other
+        return best
+
+    def walk(self, prefix=(), depth=None):
+        """События перебора: ('solution', грани f') и ('prefix', развилки).
+
+        prefix — решения (грань, взята ли), с которых начинается перебор; откат
+        выше них не идёт. При depth ветви на этой глубине не перебираются, а
+        выдаются как префиксы для отдельных шардов.
+        """
+        if self.target is None or not self.faces:
+            return
+        control = self.control
+        self.include(0)
+        for face, taken in prefix:
+            if taken:
+                self.include(face)
+            else:
+                self.exclude(face)
+        frames = []  # (отметка журнала, грань, взята ли грань)
+        states = 0
+        try:
+            while True:
+                states += 1
+                if control is not None:
+                    control.step()
+                advance = False
+                if self.viable():
+                    if self.weight == self.target:
+                        if self.complete():
+                            yield 'solution', [i for i, inside in enumerate(self.in_s) if inside]
+                    else:
+                        face = self.candidate()
+                        if face is not None and depth is not None and len(frames) == depth:
+                            yield 'prefix', list(prefix) + [(f, taken) for _, f, taken in frames]
+                        elif face is not None:
+                            frames.append((len(self.trail), face, True))
+                            self.include(face)
+                            advance = True
+                if advance:
+                    continue
+
+                # откат до ближайшей грани, которую ещё можно исключить
+                while frames:
+                    mark, face, taken = frames.pop()
+                    self.undo(mark)
+                    if taken:
+                        frames.append((mark, face, False))
+                        self.exclude(face)
+                        break
+                else:
+                    return
+        finally:
+            profiler.count('dual_states', states)
+
+    def __iter__(self):
+        for _, inside in self.walk():
+            yield inside
+
+
+def iter_dual_partitions(faces, control=None, prefix=()):
+    """Ленивый перебор разбиений граней, которые дают гамильтонов цикл.
+
+    Выдаёт списки номеров граней f' (внутренних), при которых и f', и f''
+    образуют деревья в двойственном графе, а граница f' проходит через все
+    вершины — то есть является гамильтоновым циклом. Грань 0 всегда в f'.
+    prefix (из dual_prefixes) ограничивает перебор одной ветвью.
+    """
+    if control is not None:
+        control.start_stage('dual')
+    return (inside for _, inside in _DualSearch(faces, control).walk(prefix))
+
+
+def dual_prefixes(faces, depth, control=None):
+    """Ветви перебора на глубине depth для параллельного поиска.
+
+    Возвращает (решение, найденное выше этой глубины, или None; список
+    префиксов). Ветви префиксов не пересекаются и вместе покрывают перебор.
+    """
+    prefixes = []
+    for kind, value in _DualSearch(faces, control).walk(depth=depth):
+        if kind == 'solution':
+            return value, prefixes
+        prefixes.append(value)
+    return None, prefixes
+
+
+def boundary_cycle(faces):
+    """Граница набора граней как цикл вершин (рёбра, лежащие ровно на одной грани)"""
+    count = {}
+    for face in faces:
+        for a, b in zip(face, face[1:] + face[:1]):
+            key = (a, b) if a <= b else (b, a)
+            count[key] = count.get(key, 0) + 1
+    neighbors = {}
+    for (a, b), c in count.items():
+        if c == 1:
+            neighbors.setdefault(a, []).append(b)
+            neighbors.setdefault(b, []).append(a)
+    if not neighbors:
+        return []
+    start = next(iter(neighbors))
+    cycle, previous, current = [start], None, start
+    while True:
+        a, b = neighbors[current]
+        previous, current = current, (b if a == previous else a)
+        if current == start:
+            return cycle
+        cycle.append(current)
@@ -0,0 +1,294 @@
+from collections import namedtuple
+from itertools import combinations
+
+# Перебор планарных графов без повторов по изоморфизму (канонические
+# дополнения Маккея). Граф на k вершинах — кортеж масок смежности adj, дети
+# получаются добавлением вершины k с соседями S. Ребёнок G принимается, только
+# если новая вершина лежит в одной орбите Aut(G) с канонически удаляемой
+# вершиной m(G); тогда у каждого графа единственный родитель G - m(G), а
+# изоморфных детей одного родителя отсекает локальное множество канонических
+# форм. Перебор — обход дерева в глубину, память — на один путь от корня.
+#
+# m(G) — вершина минимальной степени среди не точек сочленения (удаление
+# такой вершины сохраняет связность), из них — последняя в каноническом
+# порядке. Поэтому все графы в дереве связные.
+
+# Ограничения перебора: степени, связность (1–3) и наименьшая грань (только
+# для итоговых графов, см. cli enumerate)
+EnumerationOptions = namedtuple('EnumerationOptions',
+                                'max_degree min_degree connectivity min_face')
+
+
+def enumeration_options(cubic=False, connectivity=2, min_face=3, max_degree=None):
+    """Ограничения перебора; cubic — все степени равны 3"""
+    min_degree = max(1, connectivity)
+    if cubic:
+        min_degree, max_degree = 3, 3
+    return EnumerationOptions(max_degree, min_degree, connectivity, min_face)
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _refine(adj, cells):
+    # равномерное разбиение: клетки делятся по числу соседей в клетке-делителе,
+    # порядок частей задаётся числом соседей, так что результат инвариантен;
+    # проходы по делителям повторяются, пока разбиение меняется
+    n = len(adj)
+    changed = True
+    while changed and len(cells) < n:
+        changed = False
+        i = 0
+        while i < len(cells):
+            mask = 0
+            for v in cells[i]:
+                mask |= 1 << v
+            refined = []
+            for cell in cells:
+                if len(cell) == 1:
+                    refined.append(cell)
+                    continue
+                groups = {}
+                for v in cell:
+                    groups.setdefault((adj[v] & mask).bit_count(), []).append(v)
+                if len(groups) == 1:
+                    refined.append(cell)
+                else:
+                    refined.extend(groups[key] for key in sorted(groups))
+            if len(refined) != len(cells):
+                cells = refined
+                changed = True
+            i += 1
+    return cells
+
+
+def canonical_form(adj, special=None):
+    """Каноническая форма графа и порядок вершин, на котором она достигается.
+
+    Форма — кортеж масок смежности после перенумерации; у изоморфных графов
+    формы равны. special — вершина, которая должна переходить в вершину
+    (изоморфизмы с отмеченной вершиной). Поиск — уточнение разбиения и
+    индивидуализация вершин; из вершин клетки с одинаковыми соседями
+    (близнецов) перебирается одна, остальные дают те же формы.
+    """
+    n = len(adj)
+    if special is None:
+        cells = [list(range(n))]
+    else:
+        cells = [[v for v in range(n) if v != special], [special]]
+        cells = [cell for cell in cells if cell]
+    best = [None, None]
+
+    def search(cells):
+        cells = _refine(adj, cells)
+        if len(cells) == n:
+            order = [cell[0] for cell in cells]
+            position = [0] * n
+            for i, v in enumerate(order):
+                position[v] = i
+            form = tuple(sum(1 << position[u] for u in _bits(adj[v])) for v in order)
+            if best[0] is None or form > best[0]:
+                best[0], best[1] = form, order
+            return
+        target = min((i for i, cell in enumerate(cells) if len(cell) > 1),
+                     key=lambda i: len(cells[i]))
+        cell = cells[target]
+        # близнецы: равные окрестности (несмежные) или равные замкнутые (смежные)
+        open_seen, closed_seen = set(), set()
+        for v in cell:
+            closed = adj[v] | 1 << v
+            if adj[v] in open_seen or closed in closed_seen:
+                continue
+            open_seen.add(adj[v])
+            closed_seen.add(closed)
+            rest = [u for u in cell if u != v]
+            search(cells[:target] + [[v], rest] + cells[target + 1:])
+
+    search(cells)
+    return best[0], best[1]
+
+
+def cut_vertices(adj):
+    """Маска точек сочленения связного графа (Тарьян на битовых масках)"""
+    n = len(adj)
+    if n < 3:
+        return 0
+    order = [-1] * n
+    low = [0] * n
+    cuts = 0
+    order[0] = 0
+    counter = 1
+    root_children = 0
+    stack = [(0, -1, _bits(adj[0]))]
+    while stack:
+        v, parent, neighbors = stack[-1]
+        for u in neighbors:
+            if order[u] < 0:
+                order[u] = low[u] = counter
+                counter += 1
+                stack.append((u, v, _bits(adj[u])))
+                break
+            if u != parent:
+                low[v] = min(low[v], order[u])
+        else:
+            stack.pop()
+            if parent < 0:
+                continue
+            low[parent] = min(low[parent], low[v])
+            if parent == 0:
+                root_children += 1
+            elif low[v] >= order[parent]:
+                cuts |= 1 << parent
+    if root_children > 1:
+        cuts |= 1
+    return cuts
+
+
+def is_connected(adj, removed=0):
+    """Связность графа без вершин маски removed"""
+    alive = ((1 << len(adj)) - 1) & ~removed
+    if not alive:
+        return True
+    reach = alive & -alive
+    frontier = reach
+    while frontier:
+        grow = 0
+        for v in _bits(frontier):
+            grow |= adj[v]
+        frontier = grow & alive & ~reach
+        reach |= frontier
+    return reach == alive
+
+
+def vertex_connectivity_at_least(adj, k):
+    """Вершинная k-связность для k <= 3 (перебор удаляемых вершин)"""
+    n = len(adj)
+    if k <= 0:
+        return True
+    if n <= k:
+        return n == k and all(adj[v].bit_count() == n - 1 for v in range(n))
+    if not is_connected(adj):
+        return False
+    if k == 1:
+        return True
+    if cut_vertices(adj):
+        return False
+    if k == 2:
+        return True
+    for v in range(n):
+        for u in range(v + 1, n):
+            if not is_connected(adj, (1 << v) | (1 << u)):
+                return False
+    return True
+
+
+def _is_planar(adj):
+    n = len(adj)
+    edges = sum(mask.bit_count() for mask in adj) // 2
+    if n >= 3 and edges > 3 * n - 6:
+        return False
+    import networkx as nx
+    graph = nx.Graph()
+    graph.add_nodes_from(range(n))
+    graph.add_edges_from(graph_edges(adj))
+    return nx.check_planarity(graph)[0]
+
+
+def _deletion_candidates(adj):
+    # претенденты на m(G): не точки сочленения минимальной степени, из них —
+    # с наибольшим набором степеней соседей; среди оставшихся m(G) — последняя
+    # в каноническом порядке. Инвариант отсекает большинство детей без
+    # канонической формы
+    degrees = [mask.bit_count() for mask in adj]
+    cuts = cut_vertices(adj)
+    eligible = [v for v in range(len(adj)) if not cuts >> v & 1]
+    degree = min(degrees[v] for v in eligible)
+    eligible = [v for v in eligible if degrees[v] == degree]
+    if len(eligible) == 1:
+        return eligible
+    invariant = {v: sorted(degrees[u] for u in _bits(adj[v])) for v in eligible}
+    best = max(invariant.values())
+    return [v for v in eligible if invariant[v] == best]
+
+
+def children(adj, n, options):
+    """Неизоморфные дети графа adj в дереве перебора графов на n вершинах"""
+    k = len(adj)
+    rest = n - k - 1  # сколько вершин добавится после ребёнка
+    max_degree = options.max_degree if options.max_degree is not None else k
+    degrees = [mask.bit_count() for mask in adj]
+    edges = sum(degrees) // 2
+    # к концу степень каждой вершины вырастет не больше чем на rest (+1, если она в S)
+    if any(degree + 1 + rest < options.min_degree for degree in degrees):
+        return
+    must = sum(1 << v for v in range(k) if degrees[v] + rest < options.min_degree)
+    free = [v for v in range(k) if degrees[v] < max_degree]
+    smallest = max(1, options.min_degree - rest, must.bit_count())
+    largest = min(max_degree, len(free))
+    if k + 1 >= 3:
+        largest = min(largest, 3 * (k + 1) - 6 - edges)
+    seen = set()
+    for size in range(smallest, largest + 1):
+        for chosen in combinations(free, size):
+            mask = sum(1 << v for v in chosen)
+            if must & ~mask:
+                continue
+            child = tuple(adj[v] | (1 << k if mask >> v & 1 else 0) for v in range(k)) + (mask,)
+            # ребёнок принимается, если новая вершина k в орбите m(G)
+            candidates = _deletion_candidates(child)
+            if k not in candidates:
+                continue
+            form, order = canonical_form(child)
+            if len(candidates) > 1:
+                position = {v: i for i, v in enumerate(order)}
+                m = max(candidates, key=position.__getitem__)
+                if m != k and canonical_form(child, m)[0] != canonical_form(child, k)[0]:
+                    continue
+            if form in seen:
+                continue
+            # вершина степени 1 и графы меньше K3,3 (9 рёбер) планарность не нарушают
+            if size > 1 and edges + size >= 9 and not _is_planar(child):
+                continue
+            seen.add(form)
+            yield child
+
+
+def accepts(adj, options):
+    """Итоговый граф удовлетворяет ограничениям степеней и связности"""
+    degrees = [mask.bit_count() for mask in adj]
+    if min(degrees) < options.min_degree:
+        return False
+    if options.max_degree is not None and max(degrees) > options.max_degree:
+        return False
+    return vertex_connectivity_at_least(adj, options.connectivity)
+
+
+def iter_level(level, n, options, root=(0,)):
+    """Графы дерева перебора на level вершинах (потомки root) — шарды перебора"""
+    if len(root) == level:
+        yield root
+        return
+    stack = [children(root, n, options)]
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+        elif len(child) == level:
+            yield child
+        else:
+            stack.append(children(child, n, options))
+
+
+def iter_planar_graphs(n, options, root=(0,)):
+    """Ленивый перебор неизоморфных планарных графов на n вершинах из поддерева root"""
+    for graph in iter_level(n, n, options, root):
+        if accepts(graph, options):
+            yield graph
+
+
+def graph_edges(adj):
+    return [(v, u) for v in range(len(adj)) for u in _bits(adj[v]) if u > v]
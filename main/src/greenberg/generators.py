@@ -0,0 +1,151 @@
+import math
+import random
+
+# Генераторы возвращают (n, edges): вершины — целые 0..n-1, рёбра — пары (i, j).
+
+
+def _edge_from_index(index):
+    # нумерация пар (i, j), i < j, по столбцам: (0,1), (0,2), (1,2), (0,3), ...
+    j = (1 + math.isqrt(1 + 8 * index)) // 2
+    i = index - j * (j - 1) // 2
+    return i, j
+
+
+def random_edges(n, m, rng=random):
+    """Случайный граф G(n, m) за один проход без отбраковки повторов"""
+    max_edges = n * (n - 1) // 2
+    m = min(m, max_edges)
+    return n, [_edge_from_index(index) for index in rng.sample(range(max_edges), m)]
+
+
+def _random_triangulation_faces(n, rng, flips_per_vertex=4):
+    # third[(a, b)] = c для ориентированного треугольника (a, b, c)
+    third = {}
+    adjacency = [set() for _ in range(n)]
+
+    def add_triangle(a, b, c):
+        third[(a, b)] = c
+        third[(b, c)] = a
+        third[(c, a)] = b
+        for x, y in ((a, b), (b, c), (c, a)):
+            adjacency[x].add(y)
+            adjacency[y].add(x)
+
+    def remove_triangle(a, b, c):
+        for x, y in ((a, b), (b, c), (c, a)):
+            del third[(x, y)]
+
+    add_triangle(0, 1, 2)
+    add_triangle(0, 2, 1)
+    triangles = [(0, 1, 2), (0, 2, 1)]
+
+    # вставка вершин в случайные треугольники
+    for v in range(3, n):
+        index = rng.randrange(len(triangles))
+        a, b, c = triangles[index]
+        remove_triangle(a, b, c)
+        add_triangle(a, b, v)
+        add_triangle(b, c, v)
+        add_triangle(c, a, v)
+        triangles[index] = (a, b, v)
+        triangles.append((b, c, v))
+        triangles.append((c, a, v))
+
+    # случайные флипы рёбер, чтобы не ограничиваться стековыми триангуляциями
+    if n > 4:
+        edge_list = [(a, b) for a, b in third if a < b]
+        for _ in range(flips_per_vertex * n):
+            index = rng.randrange(len(edge_list))
+            a, b = edge_list[index]
+            c, d = third[(a, b)], third[(b, a)]
+            if d in adjacency[c] or len(adjacency[a]) <= 3 or len(adjacency[b]) <= 3:
+                continue
+            remove_triangle(a, b, c)
+            remove_triangle(b, a, d)
+            adjacency[a].discard(b)
+            adjacency[b].discard(a)
+            add_triangle(c, a, d)
+            add_triangle(d, b, c)
+            edge_list[index] = (c, d)
+
+    faces = {}
+    for (a, b), c in third.items():
+        key = min((a, b, c), (b, c, a), (c, a, b))
+        faces[key] = list(key)
+    return list(faces.values())
+
+
+def _face_edges(faces):
+    edges = set()
+    for face in faces:
+        for i, u in enumerate(face):
+            v = face[(i + 1) % len(face)]
+            edges.add((min(u, v), max(u, v)))
+    return sorted(edges)
+
+
+def random_triangulation(n, rng=random):
+    """Случайная планарная триангуляция на n >= 3 вершинах (3-связна при n >= 4)"""
+    return n, _face_edges(_random_triangulation_faces(n, rng))
+
+
+def random_planar_biconnected(n, deletion=0.3, rng=random):
+    """Случайный планарный двусвязный граф: триангуляция с удалёнными рёбрами.
+
+    Удаляется примерно доля deletion рёбер; ребро удаляется, только если
+    слитая грань остаётся простым циклом, т.е. граф остаётся двусвязным.
+    """
+    faces = dict(enumerate(_random_triangulation_faces(n, rng)))
+    # полуребро -> грань, в которой оно идёт в порядке обхода
+    face_of = {}
+    for face_id, face in faces.items():
+        for i, u in enumerate(face):
+            face_of[(u, face[(i + 1) % len(face)])] = face_id
+
+    edges = _face_edges(faces.values())
+    rng.shuffle(edges)
+    to_delete = int(deletion * len(edges))
+    removed = 0
+    for a, b in edges:
+        if removed >= to_delete:
+            break
+        first, second = face_of[(a, b)], face_of[(b, a)]
+        left, right = faces[first], faces[second]
+        if first == second or set(left) & set(right) != {a, b}:
+            continue
+
+        # путь по первой грани от b до a и по второй от a до b
+        i = left.index(b)
+        left_path = left[i:] + left[:i]
+        j = right.index(a)
+        right_path = right[j:] + right[:j]
+        merged = left_path + right_path[1:-1]
+
+        del faces[second]
+        del face_of[(a, b)], face_of[(b, a)]
+        faces[first] = merged
+        for k, u in enumerate(merged):
+            face_of[(u, merged[(k + 1) % len(merged)])] = first
+        removed += 1
+
+    return n, _face_edges(faces.values())
+
+
+def random_cubic_planar(n, rng=random):
+    """Случайный 3-связный кубический планарный граф на чётном n >= 4 вершинах.
+
+    Строится как двойственный граф случайной триангуляции на n / 2 + 2 вершинах.
+    """
+    if n < 4 or n % 2:
+        raise ValueError("число вершин кубического графа должно быть чётным и не меньше 4")
+    triangles = _random_triangulation_faces(n // 2 + 2, rng)
+    # полуребро -> номер треугольника, двойственные рёбра соединяют соседние треугольники
+    face_of = {}
+    for face_id, (a, b, c) in enumerate(triangles):
+        for x, y in ((a, b), (b, c), (c, a)):
+            face_of[(x, y)] = face_id
+    edges = sorted({
+        (min(face_id, face_of[(y, x)]), max(face_id, face_of[(y, x)]))
+        for (x, y), face_id in face_of.items()
+    })
+    return len(triangles), edges
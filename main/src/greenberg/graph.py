@@ -0,0 +1,506 @@
+from .core import GraphCore
+from .planarity import PlanarAnalysis
+from collections import namedtuple
+from itertools import islice
+
+from .cache import signature_cache
+from .decomposition import Decomposition, cycle_edges, skeleton
+from .dual import iter_dual_partitions
+from .prefilter import prefilter
+from .profiler import count, stage
+from .hamiltonian import find_hamiltonian_cycle
+from .solver import (GreenbergPartition, SolverInterrupted, batch_partition_counts,
+                    face_size_counts, greenberg_partition_counts, iter_partition_counts,
+                    split_faces)
+
+# с какого числа графов в очереди разбиения ищутся одним пакетом (solve_batch)
+BATCH_MIN_GRAPHS = 32
+
+# Опровержение по разложению графа. rule='separation_pair': без двух вершин
+# separator граф распадается на три части и больше. rule='component': каждая
+# часть графа без вершин separator примыкает ровно к двум из них (пары в
+# attachments), и граф skeleton — подграф на separator плюс по вершине на
+# каждую часть, соединённой с её парой, — не проходит теорему Гринберга.
+# Гамильтонов цикл графа проходит каждую часть одним куском от одной вершины
+# пары до другой, поэтому дал бы гамильтонов цикл skeleton.
+Obstruction = namedtuple('Obstruction', 'rule separator attachments skeleton')
+
+class GraphNX:
+    def __init__(self):
+        # метки вершин снаружи, целые id и битовые маски внутри
+        self.core = GraphCore()
+        self.revision = 0
+        self._analysis = None
+        self._decomposition = None
+        self._obstruction = None
+        self._edges = None
+        self._layout = None  # LayoutService: numpy нужен только для рисования
+
+    def copy(self):
+        """Независимая копия графа той же ревизии (для проверки в фоне)"""
+        other = GraphNX()
+        other.core = self.core.copy()
+        other.revision = self.revision
+        return other
+
+    def adopt_analysis(self, other):
+        """Забирает готовый анализ у копии, если граф с тех пор не менялся"""
+        if other.revision == self.revision and self._analysis is None:
+            self._analysis = other._analysis
+            if self._analysis is not None:
+                self._analysis.core = self.core
+
+    def _changed(self, analysis_kept=False):
+        # изменение структуры делает анализ устаревшим, если его не удалось
+        # обновить на месте (правка одного ребра планарного двусвязного графа)
+        self.revision += 1
+        self._decomposition = None
+        self._obstruction = None
+        self._edges = None
+        # укладка единственна только у трисвязного графа; иначе обновлённые
+        # на месте грани зависят от истории правок, и f_k считается заново
+        if not analysis_kept or not self.decomposition().is_triconnected():
+            self._analysis = None
+
+    def analysis(self):
+        """Анализ планарности текущей ревизии графа (считается один раз)"""
+        if self._analysis is None:
+            self._analysis = PlanarAnalysis(self.core)
+        return self._analysis
+
+    def decomposition(self):
+        """Блоки и SPQR-деревья текущей ревизии графа (считаются один раз)"""
+        if self._decomposition is None:
+            core = self.core
+            self._decomposition = Decomposition(core.vertices(), core.edges())
+        return self._decomposition
+
+    def add_vertex(self, vertex):
+        vertex = vertex.strip()
+        self.core.add_vertex(vertex)
+        self._changed()
+
+    def add_edge(self, start, end, weight=1):
+        start, end = start.strip(), end.strip()
+        if start == end:
+            return  # петли не допускаются
+        core = self.core
+        u, v = core.ids.get(start), core.ids.get(end)
+        kept = False
+        if u is not None and v is not None and self._analysis is not None:
+            # ребро внутри общей грани делит её; смена веса укладку не меняет
+            kept = core.has_edge(u, v) or self._analysis.insert_edge(u, v)
+        core.add_edge(core.add_vertex(start), core.add_vertex(end), weight)
+        self._changed(kept)
+
+    def add_edges_from(self, edges):
+        # пакетное добавление: кэш сбрасывается один раз на все рёбра
+        core = self.core
+        for start, end in edges:
+            start, end = start.strip(), end.strip()
+            if start != end:
+                core.add_edge(core.add_vertex(start), core.add_vertex(end))
+        self._changed()
+
+    def clear_edges(self):
+        self.core.clear_edges()
+        self._changed()
+
+    def remove_vertex(self, vertex):
+        # грани вокруг вершины сливаются в одну, если граф остаётся двусвязным
+        kept = self._analysis is not None and self._analysis.delete_vertex(self.core.ids[vertex])
+        self.core.remove_vertex(vertex)
+        self._changed(kept)
+    
+    def remove_edge(self, start, end):
+        start, end = start.strip(), end.strip()
+        core = self.core
+        ids = core.ids
+        if start in ids and end in ids and core.has_edge(ids[start], ids[end]):
+            u, v = ids[start], ids[end]
+            # две грани у ребра сливаются, если граф остаётся двусвязным
+            kept = self._analysis is not None and self._analysis.delete_edge(u, v)
+            core.remove_edge(u, v)
+            self._changed(kept)
+            
+    def get_vertices(self):
+        labels = self.core.labels
+        return [labels[v] for v in self.core.vertices()]
+
+    def get_edges(self):
+        # список строится один раз на ревизию; его нельзя изменять на месте
+        if self._edges is None:
+            core = self.core
+            labels = core.labels
+            self._edges = [(labels[u], labels[v], core.weight(u, v)) for u, v in core.edges()]
+        return self._edges
+
+    def has_edge(self, start, end):
+        ids = self.core.ids
+        return start in ids and end in ids and self.core.has_edge(ids[start], ids[end])
+
+    def number_of_vertices(self):
+        return self.core.vertex_count()
+
+    def number_of_edges(self):
+        return self.core.edge_count
+
+    def degree(self, vertex):
+        return self.core.degree(self.core.ids[vertex])
+
+    def is_planar(self):
+        return self.analysis().is_planar
+
+    def is_biconnected(self):
+        return self.analysis().is_biconnected
+
+    def has_separating_cycles(self):
+        # есть точка сочленения или пара разделяющих вершин
+        return not self.decomposition().is_triconnected()
+
+    def obstruction(self, control=None):
+        """Опровержение гамильтоновости по разложению (Obstruction) или None.
+
+        Для планарного двусвязного графа: сначала пары разделяющих вершин из
+        узлов P SPQR-дерева, затем теорема Гринберга для каждого узла R
+        отдельно. Результат кэшируется до изменения графа.
+        """
+        if self._obstruction is None:
+            self._obstruction = self._find_obstruction(control) or False
+        return self._obstruction or None
+
+    def _find_obstruction(self, control):
+        decomposition = self.decomposition()
+        pair = decomposition.separation_pair()
+        if pair is not None:
+            count('decomposition_separation_pairs')
+            return Obstruction('separation_pair', list(pair), [], None)
+        core = self.core
+        for tree, node in decomposition.skeletons():
+            if len(tree.nodes) == 1:
+                continue  # узел R — весь граф, его уже проверили
+            separator = tree.vertices(node)
+            attachments = _attachments(core, separator)
+            if attachments is None:
+                continue
+            part = GraphNX()
+            part.core = _skeleton_core(core, separator, attachments)
+            if not part.is_planar() or not part.is_biconnected():
+                continue
+            f_k = face_size_counts(part.analysis().face_ids)
+            decided = prefilter(f_k)
+            if decided is not None:
+                found = decided.verdict
+            else:
+                found = _solve_counts(f_k, control) is not None
+            count('decomposition_components')
+            if not found:
+                return Obstruction('component', separator, attachments, part)
+        return None
+
+    def get_faces(self):
+        return self.analysis().faces
+
+    def live_verdict(self):
+        """Быстрый вердикт для строки состояния: (вердикт, число разбиений).
+
+        После правок по одному ребру трисвязного графа f_k и таблица сумм
+        обновляются на месте, поэтому вызов после такой правки почти ничего
+        не стоит; у остальных графов укладка строится заново.
+        """
+        analysis = self.analysis()
+        if not analysis.is_planar:
+            return 'nonplanar', 0
+        if not analysis.is_biconnected:
+            return 'nonbiconnected', 0
+        partitions = analysis.face_sums.partitions()
+        return partitions > 0, partitions
+
+    def greenberg_condition(self, mutable_params, control=None, cache=None, mode='counts',
+                            report=None, jobs=1):
+        # control позволяет следить за прогрессом, отменять проверку и
+        # ограничивать её по времени; по истечении лимита — 'inconclusive'.
+        # cache (ResultCache) хранит готовые результаты на диске.
+        # mode='dual' принимает только разбиения, где f' и f'' — деревья в
+        # двойственном графе; такой ответ точнее, поэтому кэши не используются.
+        # В report (словарь), если он передан, записывается, чем решён ответ.
+        # jobs > 1 — поиск деревьев граней (mode='dual') делится на шарды в пуле процессов
+        if report is None:
+            report = {}
+        if mode == 'dual':
+            cache = None
+        if cache is not None:
+            cached = cache.get(self)
+            if cached is not None:
+                result, partition = cached
+                mutable_params.extend(partition)
+                report['rule'] = 'result_cache'
+                count('result_cache_hits')
+                return result
+
+        try:
+            result = self._greenberg_condition(mutable_params, control, mode, report, jobs)
+        except SolverInterrupted as e:
+            return 'inconclusive' if e.reason == 'timeout' else 'cancelled'
+
+        if cache is not None:
+            cache.put(self, result, mutable_params)
+        return result
+
+    def _greenberg_condition(self, mutable_params, control, mode, report, jobs=1):
+        if control is not None:
+            control.start_stage('planarity')
+
+        # проверка на планарность
+        with stage('planarity'):
+            planar = self.is_planar()
+        if not planar:
+            return 'nonplanar'
+        
+        # проверка на двусвязность
+        with stage('biconnectivity'):
+            biconnected = self.is_biconnected()
+        if not biconnected:
+            return 'nonbiconnected'
+        
+        # находим все грани
+        if control is not None:
+            control.start_stage('faces')
+        with stage('faces'):
+            faces = self.get_faces()
+        if not faces:
+            return False
+
+        if mode == 'dual':
+            if self._refuted(control, report):
+                return False
+            report['rule'] = 'dual'
+            with stage('dual'):
+                if jobs > 1:
+                    from .parallel import parallel_dual_partition
+                    inside = parallel_dual_partition(self.analysis().face_ids, jobs, control)
+                else:
+                    inside = next(iter_dual_partitions(self.analysis().face_ids, control), None)
+            if inside is None:
+                return False
+            mutable_params.extend(self._split_by_index(faces, inside))
+            return True
+
+        # сначала быстрые правила по f_k (чётность, остатки, жадный набор)
+        if control is not None:
+            control.start_stage('prefilter')
+        with stage('prefilter'):
+            f_k = face_size_counts(faces)
+            decided = prefilter(f_k)
+        if decided is not None:
+            report['rule'] = decided.rule
+            prime_counts = decided.prime_counts
+        else:
+            # достаточно первого разбиения; оно зависит только от f_k,
+            # поэтому берётся из общего кэша сигнатур, если уже искалось
+            report['rule'] = 'solver'
+            prime_counts = _solve_counts(f_k, control)
+        if prime_counts is None:
+            return False
+        # разбиение для всего графа есть; опровергнуть может разложение
+        if self._refuted(control, report):
+            return False
+
+        f_prime, f_double_prime = split_faces(faces, prime_counts)
+        mutable_params.append(f_prime)
+        mutable_params.append(f_double_prime)
+        return True
+
+    def _refuted(self, control, report):
+        # опровержение по разложению; его правило записывается в report
+        if control is not None:
+            control.start_stage('decomposition')
+        with stage('decomposition'):
+            obstruction = self.obstruction(control)
+        if obstruction is None:
+            return False
+        report['rule'] = obstruction.rule
+        return True
+
+    def find_hamiltonian_cycle(self, control=None, held_karp_limit=16,
+                               memory_budget=256 * 1024 * 1024, jobs=1):
+        """Точная проверка гамильтоновости, когда теорема Гринберга не дала ответа.
+
+        Цикл ищется отдельно в скелете каждого узла R SPQR-дерева (с jobs > 1 —
+        в пуле процессов) и собирается из их циклов, поэтому время зависит от
+        самого большого узла, а не от всего графа.
+        Возвращает цикл (список меток вершин), False, если цикла нет, либо
+        'inconclusive' / 'cancelled' при остановке через control.
+        """
+        if control is not None:
+            control.start_stage('hamiltonian')
+        try:
+            with stage('hamiltonian'):
+                edges = self._hamiltonian_edges(control, held_karp_limit, memory_budget, jobs)
+        except SolverInterrupted as e:
+            return 'inconclusive' if e.reason == 'timeout' else 'cancelled'
+        if edges is None:
+            return False
+        following = {}
+        for u, v in edges:
+            following.setdefault(u, []).append(v)
+            following.setdefault(v, []).append(u)
+        start = edges[0][0]
+        cycle, previous, current = [start], start, following[start][0]
+        while current != start:
+            cycle.append(current)
+            a, b = following[current]
+            previous, current = current, b if a == previous else a
+        labels = self.core.labels
+        return [labels[v] for v in cycle]
+
+    def _hamiltonian_edges(self, control, held_karp_limit, memory_budget, jobs):
+        # рёбра гамильтонова цикла (пары id) или None
+        decomposition = self.decomposition()
+        if not decomposition.is_biconnected() or decomposition.separation_pair() is not None:
+            return None
+        tree = decomposition.tree()
+        nodes, skeletons = [], []
+        for _, node in decomposition.skeletons():
+            nodes.append(node)
+            skeletons.append(skeleton(tree, node)[1])
+        # малые скелеты первыми: отсутствие цикла выясняется раньше
+        order = sorted(range(len(nodes)), key=lambda i: len(skeletons[i]))
+        large = sum(len(adj) > held_karp_limit for adj in skeletons)
+        if jobs > 1 and large > 1:
+            from .parallel import parallel_hamiltonian_cycles
+            found = parallel_hamiltonian_cycles([(len(adj), adj) for adj in skeletons], jobs,
+                                                control, held_karp_limit, memory_budget)
+            if found is None:
+                return None
+        else:
+            found = [None] * len(nodes)
+            for i in order:
+                adj = skeletons[i]
+                found[i] = find_hamiltonian_cycle(len(adj), adj, control, held_karp_limit,
+                                                  memory_budget)
+                if found[i] is None:
+                    return None
+        count('decomposition_skeletons', len(nodes))
+        return cycle_edges(tree, dict(zip(nodes, found)))
+
+    @staticmethod
+    def _split_by_index(faces, inside):
+        chosen = set(inside)
+        return ([face for i, face in enumerate(faces) if i in chosen],
+                [face for i, face in enumerate(faces) if i not in chosen])
+
+    def iter_greenberg_partitions(self, limit=None, control=None, mode='counts'):
+        """Ленивый перебор различных разбиений граней по теореме Гринберга.
+
+        Разбиения различаются по f'_k (мультимножеству порядков граней), а не
+        по конкретным граням; разбиение и его дополнение выдаются один раз.
+        В режиме 'dual' выдаются конкретные наборы граней, у которых f' и f''
+        — деревья в двойственном графе (по одному на гамильтонов цикл).
+        Для непланарного или не двусвязного графа ничего не выдаётся.
+        """
+        if not self.is_planar() or not self.is_biconnected():
+            return
+        faces = self.get_faces()
+        if mode == 'dual':
+            for inside in islice(iter_dual_partitions(self.analysis().face_ids, control), limit):
+                f_prime, f_double_prime = self._split_by_index(faces, inside)
+                yield GreenbergPartition(face_size_counts(f_prime), f_prime, f_double_prime)
+            return
+        f_k = face_size_counts(faces)
+        for prime_counts in islice(iter_partition_counts(f_k, control), limit):
+            f_prime, f_double_prime = split_faces(faces, prime_counts)
+            yield GreenbergPartition(prime_counts, f_prime, f_double_prime)
+
+    def layout_planar_or_default(self):
+        # координаты кэшируются по ревизии, непланарный граф укладывается
+        # силовым методом от прежних координат
+        if self._layout is None:
+            from .layout import LayoutService
+            self._layout = LayoutService()
+        return self._layout.layout(self)
+        
+    def print_graph_state(self):
+        print("\nТекущие вершины графа:")
+        core = self.core
+        for node in core.vertices():
+            neighbors = [(core.labels[v], {'weight': core.weight(node, v)}) for v in core.neighbors(node)]
+            print(f"{core.labels[node]}: {neighbors}")
+
+
+def _solve_counts(f_k, control):
+    # первое разбиение по f_k: из кэша сигнатур или поиском
+    found, prime_counts = signature_cache.get(f_k)
+    count('signature_cache_hits' if found else 'signature_cache_misses')
+    if not found:
+        with stage('solver'):
+            prime_counts = greenberg_partition_counts(f_k, control)
+        signature_cache.put(f_k, prime_counts)
+    return prime_counts
+
+
+def _attachments(core, separator):
+    # пары вершин separator, к которым примыкают части графа без separator;
+    # None, если какая-то часть примыкает не к двум вершинам
+    inside = set(separator)
+    seen = set(inside)
+    attachments = []
+    for v in separator:
+        for start in core.neighbors(v):
+            if start in seen:
+                continue
+            seen.add(start)
+            stack, touched = [start], set()
+            while stack:
+                u = stack.pop()
+                for w in core.neighbors(u):
+                    if w in inside:
+                        touched.add(w)
+                    elif w not in seen:
+                        seen.add(w)
+                        stack.append(w)
+            if len(touched) != 2:
+                return None
+            attachments.append(sorted(touched))
+    return attachments
+
+
+def _skeleton_core(core, separator, attachments):
+    # подграф на separator и по вершине (метка — номер части) на каждую часть
+    part = GraphCore()
+    ids = {v: part.add_vertex(core.labels[v]) for v in separator}
+    for u in separator:
+        for v in core.neighbors(u):
+            if v in ids and u < v:
+                part.add_edge(ids[u], ids[v])
+    for i, (a, b) in enumerate(attachments):
+        middle = part.add_vertex(i)
+        part.add_edge(middle, ids[a])
+        part.add_edge(middle, ids[b])
+    return part
+
+
+def solve_batch(graphs):
+    """Поиск разбиений сразу для очереди графов (режим 'counts').
+
+    f_k всех планарных двусвязных графов, не решённые быстрыми правилами и
+    кэшем сигнатур, решаются одним вызовом batch_partition_counts, ответы
+    кладутся в кэш сигнатур; greenberg_condition затем берёт их оттуда.
+    Анализ графов (планарность, грани) сохраняется и повторно не считается.
+    Меньше BATCH_MIN_GRAPHS графов — ничего не делает.
+    """
+    if len(graphs) < BATCH_MIN_GRAPHS:
+        return
+    pending = {}
+    with stage('batch'):
+        for graph in graphs:
+            if not graph.is_planar() or not graph.is_biconnected():
+                continue
+            f_k = face_size_counts(graph.get_faces())
+            if not f_k or prefilter(f_k) is not None or f_k in signature_cache:
+                continue
+            pending.setdefault(signature_cache.signature(f_k), f_k)
+        histograms = list(pending.values())
+        for f_k, prime_counts in zip(histograms, batch_partition_counts(histograms)):
+            signature_cache.put(f_k, prime_counts)
+        count('batch_signatures', len(histograms))
@@ -0,0 +1,223 @@
+import json
+import os
+import sys
+from .graph import GraphNX
+
+
+# Графы передаются между процессами как лёгкие записи
+# (имя, список вершин, список рёбер) — без объектов networkx.
+# Испорченная запись — (имя, None, текст ошибки): проверка выдаёт для неё
+# строку с ошибкой, а чтение остальных графов продолжается.
+
+
+def _bad_record(name, error):
+    return name, None, f"{type(error).__name__}: {error}"
+
+def guess_format(path):
+    """Определение формата по расширению файла"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.g6', '.graph6'):
+        return 'graph6'
+    if ext in ('.json', '.jsonl'):
+        return 'json'
+    return 'edgelist'
+
+
+def read_edgelist(lines, source='stdin'):
+    """Список рёбер: строка "u v" — ребро, одно имя — изолированная вершина.
+
+    Графы разделяются пустыми строками, строки с # — комментарии. Граф со
+    строкой из трёх и более слов становится испорченной записью.
+    """
+    vertices, edges, error = [], [], None
+    index = 0
+    for number, line in enumerate(lines, 1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            if vertices or edges or error:
+                name = f"{source}:{index}"
+                yield _bad_record(name, error) if error else (name, vertices, edges)
+                index += 1
+                vertices, edges, error = [], [], None
+            continue
+        parts = line.split()
+        if len(parts) == 1:
+            vertices.append(parts[0])
+        elif len(parts) == 2:
+            edges.append((parts[0], parts[1]))
+        elif error is None:
+            error = ValueError(f"строка {number}: ожидается 'u v' или одна вершина, "
+                               f"слов: {len(parts)}")
+    if vertices or edges or error:
+        name = f"{source}:{index}"
+        yield _bad_record(name, error) if error else (name, vertices, edges)
+
+
+def _json_record(obj, default_name):
+    if isinstance(obj, list):
+        # голый список рёбер
+        obj = {'edges': obj}
+    name = str(obj.get('name', default_name))
+    vertices = [str(v) for v in obj.get('vertices', [])]
+    edges = [(str(u), str(v)) for u, v, *_ in obj.get('edges', [])]
+    return name, vertices, edges
+
+
+def _json_line(line, default_name):
+    try:
+        return _json_record(json.loads(line), default_name)
+    except Exception as e:
+        return _bad_record(default_name, e)
+
+
+def read_json(lines, source='stdin'):
+    """JSON: один объект {"name", "vertices", "edges"}, их список или JSON Lines.
+
+    В JSON Lines испорченная строка становится испорченной записью, а
+    испорченный документ целиком — одной такой записью.
+    """
+    lines = iter(lines)
+    first = ''
+    for first in lines:
+        if first.strip():
+            break
+    stripped = first.strip()
+    if not stripped:
+        return
+
+    if stripped.startswith('{'):
+        try:
+            obj = json.loads(stripped)
+        except json.JSONDecodeError:
+            obj = None
+        if obj is not None and 'graphs' not in obj:
+            # JSON Lines: каждый граф на своей строке
+            yield _json_line(stripped, f"{source}:0")
+            index = 1
+            for line in lines:
+                if line.strip():
+                    yield _json_line(line, f"{source}:{index}")
+                    index += 1
+            return
+
+    try:
+        data = json.loads(first + ''.join(lines))
+        if isinstance(data, dict):
+            data = data.get('graphs', [data])
+        if not isinstance(data, list):
+            raise ValueError("ожидается объект или список графов")
+    except ValueError as e:
+        yield _bad_record(f"{source}:0", e)
+        return
+    for index, obj in enumerate(data):
+        name = f"{source}:{index}"
+        try:
+            yield _json_record(obj, name)
+        except Exception as e:
+            yield _bad_record(name, e)
+
+
+def decode_graph6(line):
+    """Декодирование строки graph6 в (вершины, рёбра).
+
+    ValueError, если строка пустая, есть символы вне '?'..'~' или длина
+    заголовка и матрицы смежности не совпадает с числом вершин.
+    """
+    line = line.strip()
+    if not line:
+        raise ValueError("пустая строка graph6")
+    data = [ord(c) - 63 for c in line]
+    if any(not 0 <= value < 64 for value in data):
+        raise ValueError("символ вне диапазона graph6 ('?'..'~')")
+    if data[0] < 63:
+        n, pos = data[0], 1
+    elif len(data) >= 4 and data[1] < 63:
+        n, pos = (data[1] << 12) | (data[2] << 6) | data[3], 4
+    elif len(data) >= 8 and data[1] == 63:
+        n, pos = 0, 2
+        for value in data[2:8]:
+            n = (n << 6) | value
+        pos = 8
+    else:
+        raise ValueError("обрезанный заголовок graph6")
+    expected = (n * (n - 1) // 2 + 5) // 6
+    if len(data) - pos != expected:
+        raise ValueError(f"для {n} вершин нужно {expected} символов матрицы смежности, "
+                         f"а не {len(data) - pos}")
+
+    vertices = [str(i) for i in range(n)]
+    edges = []
+    bits = ((value >> shift) & 1 for value in data[pos:] for shift in range(5, -1, -1))
+    # биты верхнего треугольника матрицы смежности идут по столбцам
+    for j in range(1, n):
+        for i in range(j):
+            if next(bits, 0):
+                edges.append((vertices[i], vertices[j]))
+    return vertices, edges
+
+
+def encode_graph6(n, edges):
+    """Строка graph6 графа на вершинах 0..n-1"""
+    if n < 63:
+        data = [n]
+    elif n < 258048:
+        data = [63, n >> 12 & 63, n >> 6 & 63, n & 63]
+    else:
+        data = [63, 63] + [n >> shift & 63 for shift in range(30, -1, -6)]
+    bits = [0] * (n * (n - 1) // 2)
+    for u, v in edges:
+        i, j = min(u, v), max(u, v)
+        bits[j * (j - 1) // 2 + i] = 1
+    bits += [0] * (-len(bits) % 6)
+    for start in range(0, len(bits), 6):
+        value = 0
+        for bit in bits[start:start + 6]:
+            value = (value << 1) | bit
+        data.append(value)
+    return ''.join(chr(value + 63) for value in data)
+
+
+def read_graph6(lines, source='stdin'):
+    index = 0
+    for line in lines:
+        line = line.strip()
+        if line.startswith('>>graph6<<'):
+            line = line[len('>>graph6<<'):]
+        if not line:
+            continue
+        name = f"{source}:{index}"
+        try:
+            vertices, edges = decode_graph6(line)
+        except ValueError as e:
+            yield _bad_record(name, e)
+        else:
+            yield name, vertices, edges
+        index += 1
+
+
+READERS = {
+    'edgelist': read_edgelist,
+    'json': read_json,
+    'graph6': read_graph6,
+}
+
+
+def read_graphs(paths, fmt=None):
+    """Ленивое чтение графов из файлов ('-' — стандартный ввод)"""
+    for path in paths or ['-']:
+        file_format = fmt or ('edgelist' if path == '-' else guess_format(path))
+        reader = READERS[file_format]
+        if path == '-':
+            yield from reader(sys.stdin, 'stdin')
+        else:
+            with open(path, encoding='utf-8') as f:
+                yield from reader(f, path)
+
+
+def build_graph(vertices, edges):
+    """Сборка GraphNX из записи"""
+    graph = GraphNX()
+    for vertex in vertices:
+        graph.add_vertex(vertex)
+    graph.add_edges_from(edges)
+    return graph
@@ -0,0 +1,1123 @@
+import tkinter as tk
+from tkinter import filedialog, messagebox, simpledialog, ttk
+import json
+import math
+import os
+import queue
+import threading
+from .generators import random_cubic_planar, random_edges, random_planar_biconnected
+from .cache import ResultCache
+from .certificate import make_certificate
+from .dual import boundary_cycle
+from .graph import GraphNX
+from .profiler import profiling
+from .solver import SolverControl
+from .spatial import SpatialIndex
+
+# Порог подробности в пикселях экранного радиуса вершины: меньше LABEL_MIN_RADIUS —
+# без подписей, меньше DETAIL_MIN_RADIUS — точки без обводки и тонкие рёбра
+LABEL_MIN_RADIUS = 8
+DETAIL_MIN_RADIUS = 3
+MAX_VERTICES = 10000
+
+
+class GraphGUI:
+    def __init__(self, master):
+        self.master = master
+        self.master.title("Проверка графа на гамильтоновость")
+        self.graph = GraphNX()
+        self.vertex_count = 0
+        self.canvas = None
+        self.vertex_radius = 20
+        self.vertex_positions = {}
+        self.selected_vertex = None
+        self.edge_creation_mode = False
+        self.vertex_removal_mode = False
+        self.edge_removal_mode = False
+        self.vertex_create_mode = False
+
+        # Элементы холста: вершина -> (овал, подпись), ребро -> линия
+        self.vertex_items = {}
+        self.edge_items = {}
+        self.planar_view = False
+        # Вид холста: экранные координаты = мировые * zoom + offset
+        self.zoom = 1.0
+        self.offset = (0.0, 0.0)
+        self.saved_view = None
+        self.pan_start = None
+        # Сетка вершин и рёбер для поиска под курсором; ключ ребра — frozenset
+        # концов. Согласована с графом ревизии index_revision
+        self.index = SpatialIndex(3 * self.vertex_radius)
+        self.index_revision = None
+        # Выделение рамкой или кликом по ребру: вершины и рёбра для удаления
+        self.marked_vertices = set()
+        self.marked_edges = set()
+        self.band_start = None
+        # Найденный гамильтонов цикл: (ревизия графа, множество рёбер цикла)
+        self.hamiltonian_cycle = None
+        # Последняя завершённая проверка: (копия графа, результат, разбиение, режим)
+        self.last_check = None
+
+        # Фоновая проверка графа
+        self.check_control = None
+        self.check_results = queue.Queue()
+        try:
+            self.result_cache = ResultCache()
+        except Exception as e:
+            # sqlite3 к этому моменту уже загружен самим ResultCache
+            import sqlite3
+            if not isinstance(e, (OSError, sqlite3.Error)):
+                raise
+            self.result_cache = None  # без кэша на диске проверка всё равно работает
+        self.rule_names = {
+            'parity': "сумма S нечётна",
+            'dominant_face': "одна грань тяжелее S/2",
+            'gcd': "общий делитель k-2 не делит S/2",
+            'residue_mod_': "S/2 недостижима по модулю {m}",
+            'single_face_residue': "все грани, кроме одной, дают 0 по модулю (как mod 3)",
+            'greedy': "разбиение найдено жадным набором граней",
+            'dp': "битовая динамика по суммам граней",
+            'solver': "полный поиск разбиения",
+            'result_cache': "результат из кэша",
+            'separation_pair': "без пары вершин граф распадается на три части",
+            'component': "нет разбиения для трисвязной части графа",
+        }
+        self.check_stage_names = {
+            'planarity': "Проверка планарности",
+            'faces': "Поиск граней",
+            'solver': "Поиск разбиения, клетки ДП",
+            'hamiltonian': "Поиск гамильтонова цикла, шаги",
+            'dual': "Поиск деревьев граней, состояния",
+            'prefilter': "Проверка остатков по f_k",
+            'parallel': "Параллельный поиск, готовые шарды",
+            'decomposition': "Разложение на трисвязные части",
+        }
+        # Краткие подписи замеров для строки «Этапы» после проверки
+        self.profile_names = {
+            'planarity': "планарность",
+            'biconnectivity': "двусвязность",
+            'faces': "грани",
+            'prefilter': "предфильтр",
+            'solver': "решатель",
+            'dual': "деревья граней",
+            'hamiltonian': "точный поиск",
+            'decomposition': "разложение",
+            'dp_cells': "клетки ДП",
+            'dual_states': "состояния перебора",
+            'backtracking_states': "шаги перебора",
+            'held_karp_states': "состояния Хелда-Карпа",
+            'signature_cache_hits': "попадания в кэш сигнатур",
+            'signature_cache_misses': "промахи кэша сигнатур",
+            'result_cache_hits': "кэш результатов",
+            'decomposition_skeletons': "скелеты узлов R",
+        }
+
+        # Настройка размеров окна
+        self.master.geometry("1500x800")
+        self.master.minsize(600, 500)
+        
+        self.setup_ui()
+    
+    def setup_ui(self):
+        """Настройка пользовательского интерфейса с адаптивной панелью"""
+        # Главный фрейм
+        main_frame = tk.Frame(self.master)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Панель управления с увеличенной высотой и возможностью прокрутки
+        control_frame = tk.Frame(main_frame, bg="lightgray", padx=5, pady=8, height=80)
+        control_frame.pack(side=tk.TOP, fill=tk.X)
+        control_frame.pack_propagate(False)  # Фиксируем высоту
+        
+        # Фрейм для кнопок с прокруткой
+        button_container = tk.Frame(control_frame)
+        button_container.pack(fill=tk.BOTH, expand=True)
+        
+        # Горизонтальный скроллбар для кнопок
+        scrollbar = tk.Scrollbar(button_container, orient=tk.HORIZONTAL)
+        scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        # Холст для кнопок
+        self.button_canvas = tk.Canvas(button_container, 
+                                     height=60, 
+                                     xscrollcommand=scrollbar.set,
+                                     bg="lightgray",
+                                     highlightthickness=0)
+        self.button_canvas.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=self.button_canvas.xview)
+        
+        # Фрейм для кнопок внутри холста
+        self.button_frame = tk.Frame(self.button_canvas, bg="lightgray")
+        self.button_canvas.create_window((0,0), 
+                                       window=self.button_frame, 
+                                       anchor="nw",
+                                       tags="button_frame")
+        
+        # Кнопки управления
+        buttons = [
+            ("Задать кол-во вершин", self.set_vertex_count, "lightblue"),
+            ("Сгенерировать ребра", self.graph_edge_generation, "lightblue"),
+            ("Планарный граф", self.generate_planar_graph, "lightblue"),
+            ("Кубический граф", self.generate_cubic_graph, "lightblue"),
+            ("Проверить граф", self.check_hamiltonian, "lightgoldenrod"),
+            ("Сертификат", self.save_certificate, "lightgoldenrod"),
+            ("Перемещение вершин", self.reset_modes, "white"),
+            ("Добавление вершин", self.toggle_vertex_mode, "lightgreen"),
+            ("Добавление ребер", self.toggle_edge_mode, "lightgreen"),
+            ("Удаление вершин", self.toggle_vertex_removal_mode, "pink"),
+            ("Удаление ребер", self.toggle_edge_removal_mode, "pink"),
+            ("Удалить выделенное", self.delete_marked, "pink"),
+            ("Очистить всё", self.clear_graphs, "salmon"),
+            ("Справка", self.show_help, "white")
+        ]
+        
+        for text, command, color in buttons:
+            btn = tk.Button(self.button_frame, 
+                          text=text, 
+                          command=command,
+                          bg=color,
+                          padx=10,
+                          pady=5,
+                          font=('Arial', 10),
+                          relief=tk.RAISED,
+                          bd=2)
+            btn.pack(side=tk.LEFT, padx=5, pady=5)
+        
+        # Обновление размера фрейма кнопок
+        self.button_frame.update_idletasks()
+        self.button_canvas.config(scrollregion=self.button_canvas.bbox("all"))
+        self.button_canvas.bind("<Configure>", self.on_button_canvas_configure)
+        
+        # Строка состояния фоновой проверки
+        status_frame = tk.Frame(main_frame, bg="lightgray", padx=5, pady=3)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+
+        tk.Label(status_frame, text="Лимит проверки, с (0 — без лимита):",
+                 bg="lightgray").pack(side=tk.LEFT)
+        self.time_budget_var = tk.StringVar(value="30")
+        tk.Spinbox(status_frame, from_=0, to=3600, width=6,
+                   textvariable=self.time_budget_var).pack(side=tk.LEFT, padx=5)
+        # Двойственный режим: f' и f'' должны быть деревьями в двойственном графе
+        self.dual_mode_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(status_frame, text="Деревья граней", variable=self.dual_mode_var,
+                       bg="lightgray").pack(side=tk.LEFT, padx=5)
+        # Поиск деревьев граней одного графа в нескольких процессах
+        tk.Label(status_frame, text="Процессы:", bg="lightgray").pack(side=tk.LEFT)
+        self.solver_jobs_var = tk.StringVar(value="1")
+        tk.Spinbox(status_frame, from_=1, to=os.cpu_count() or 1, width=4,
+                   textvariable=self.solver_jobs_var).pack(side=tk.LEFT, padx=5)
+
+        # Вердикт после каждой правки (грани и f_k обновляются на месте)
+        self.live_label = tk.Label(status_frame, text="", bg="lightgray")
+        self.live_label.pack(side=tk.LEFT, padx=10)
+        # Разбивка времени последней проверки по этапам
+        self.profile_label = tk.Label(status_frame, text="", bg="lightgray")
+        self.profile_label.pack(side=tk.LEFT, padx=10)
+
+        self.cancel_button = tk.Button(status_frame, text="Отмена",
+                                       command=self.cancel_check, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.RIGHT, padx=5)
+        self.progress_bar = ttk.Progressbar(status_frame, length=250, mode="determinate")
+        self.progress_bar.pack(side=tk.RIGHT, padx=5)
+        self.progress_label = tk.Label(status_frame, text="", bg="lightgray")
+        self.progress_label.pack(side=tk.RIGHT, padx=5)
+
+        # Холст для графа
+        canvas_container = tk.Frame(main_frame)
+        canvas_container.pack(fill=tk.BOTH, expand=True)
+        
+        self.canvas = tk.Canvas(canvas_container, bg="white")
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        # Обработчики событий
+        self.canvas.bind("<Button-1>", self.on_canvas_click)
+        self.canvas.bind("<B1-Motion>", self.on_vertex_drag)
+        self.canvas.bind("<ButtonRelease-1>", self.on_button_release)
+        # клавиша Delete работает, когда фокус на холсте (после клика по нему)
+        self.canvas.bind("<Delete>", lambda event: self.delete_marked())
+        # Масштаб колесом мыши, сдвиг правой или средней кнопкой
+        self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.canvas.bind("<Button-4>", self.on_mouse_wheel)
+        self.canvas.bind("<Button-5>", self.on_mouse_wheel)
+        for button in (2, 3):
+            self.canvas.bind(f"<ButtonPress-{button}>", self.on_pan_start)
+            self.canvas.bind(f"<B{button}-Motion>", self.on_pan_move)
+            self.canvas.bind(f"<ButtonRelease-{button}>", self.on_pan_end)
+    
+    def on_button_canvas_configure(self, event):
+        """Обновление области прокрутки для кнопок"""
+        # Рассчитываем необходимую ширину для всех кнопок
+        required_width = self.button_frame.winfo_reqwidth()
+
+        # Устанавливаем ширину фрейма как максимальную из:
+        # - реальной ширины всех кнопок
+        # - текущей доступной ширины холста
+        new_width = max(required_width, event.width)
+        self.button_canvas.itemconfig("button_frame", width=new_width)
+
+        # Обновляем область прокрутки
+        self.button_canvas.config(scrollregion=self.button_canvas.bbox("all"))
+
+    def show_help_window(self, help_text):
+        help_win = tk.Toplevel()
+        help_win.title("Справка")
+        help_win.geometry("400x400") 
+
+        scrollbar = tk.Scrollbar(help_win)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        text = tk.Text(help_win, wrap=tk.WORD, yscrollcommand=scrollbar.set)
+        text.pack(expand=True, fill=tk.BOTH)
+        text.insert(tk.END, help_text)
+        text.config(state=tk.DISABLED)
+
+        scrollbar.config(command=text.yview)
+
+    def show_help(self):
+        """Показать справку"""
+        help_text = (
+            "Инструкция по использованию:\n\n"
+            "1. Задайте количество вершин\n"
+            "2. Сгенерируйте ребра или случайный планарный\n"
+            "   двусвязный / кубический граф\n"
+            "3. Можете использовать инструменты:\n"
+            "   - Перемещение вершин (по умолчанию): \n"
+            "            перетаскивание курсором\n"
+            "   - Добавление вершин: клик на холст\n"
+            "   - Добавление ребер: клик на 2 вершины\n"
+            "   - Удаление вершин: клик на вершину\n"
+            "   - Удаление ребер: клик на ребро или на 2 вершины\n"
+            "   - Выделение: клик на ребро или рамка по пустому\n"
+            "            месту, удаление — клавиша Delete\n"
+            "   - Масштаб: колесо мыши, сдвиг: правая кнопка\n"
+            "4. Проверьте граф на гамильтоновость\n\n"
+            "Теорема Гринберга проверяет планарные графы\n"
+            "на наличие гамильтонова цикла. Если она не дала\n"
+            "ответа, цикл ищется точно в пределах лимита\n"
+            "времени; найденный цикл выделяется красным.\n"
+            "«Деревья граней» принимает только разбиения,\n"
+            "где f' и f'' — деревья в двойственном графе:\n"
+            "так ответ точный, но поиск может быть дольше."
+        )
+        self.show_help_window(help_text)
+    
+    def toggle_edge_mode(self):
+        """Переключение режима создания рёбер"""
+        self.reset_modes()  
+        self.edge_creation_mode = True 
+        self.master.config(cursor="cross")
+
+    def toggle_vertex_mode(self):
+        """Переключение режима создания вершин"""
+        self.reset_modes()  
+        self.vertex_create_mode = True 
+        self.master.config(cursor="plus")
+
+    def add_vertex_at(self, x, y):
+        """Добавляет вершину в указанные координаты"""
+        # Генерируем уникальное имя вершины
+        used_indices = [int(name[1:]) for name in self.vertex_positions.keys() if name.startswith("V")]
+        new_index = max(used_indices) + 1 if used_indices else 1
+        vertex_name = f"V{new_index}"
+        
+        # Добавляем вершину
+        synced = self.index_revision == self.graph.revision
+        self.vertex_positions[vertex_name] = (x, y)
+        self.graph.add_vertex(vertex_name)
+        if synced:
+            self.index.add_point(vertex_name, x, y)
+            self.index_revision = self.graph.revision
+        self.vertex_count += 1
+        self.redraw_graph()
+    
+    def toggle_vertex_removal_mode(self):
+        """Переключение режима удаления вершин"""
+        self.reset_modes()
+        self.vertex_removal_mode = True
+        self.master.config(cursor="pirate")
+
+    def toggle_edge_removal_mode(self):
+        """Переключение режима удаления рёбер"""
+        self.reset_modes()
+        self.edge_removal_mode = True
+        self.master.config(cursor="X_cursor")
+        
+    def remove_vertex(self, vertex):
+        """Удаление вершины из графа"""
+        if vertex in self.vertex_positions:
+            synced = self.index_revision == self.graph.revision
+            self.graph.remove_vertex(vertex)
+            del self.vertex_positions[vertex]
+            if synced:
+                self.index.remove_point(vertex)
+                self.index_revision = self.graph.revision
+            self.redraw_graph()
+            return True
+        return False
+    
+    def remove_edge(self, u, v):
+        """Удаление ребра между вершинами"""
+        if u in self.vertex_positions and v in self.vertex_positions:
+            if self.graph.has_edge(u, v):
+                synced = self.index_revision == self.graph.revision
+                self.graph.remove_edge(u, v)
+                if synced:
+                    self.index.remove_segment(frozenset((u, v)))
+                    self.index_revision = self.graph.revision
+                self.redraw_graph()
+                return True
+        return False
+    
+    def clear_edges(self):
+        """Удаление всех ребер"""
+        self.graph.clear_edges()
+        self.redraw_graph()
+    
+    def reset_modes(self):
+        """Сброс всех режимов и курсора"""
+        self.edge_creation_mode = False
+        self.vertex_removal_mode = False
+        self.edge_removal_mode = False
+        self.vertex_create_mode = False
+        self.select_vertex(None)
+        self.unmark()
+        self.master.config(cursor="")
+
+    def set_vertex_count(self):
+        """Запрос количества вершин у пользователя"""
+        self.reset_modes()
+        count = simpledialog.askinteger("Количество вершин", 
+                                      f"Введите количество вершин (2-{MAX_VERTICES}):", 
+                                      parent=self.master, 
+                                      minvalue=2, 
+                                      maxvalue=MAX_VERTICES)
+        if count:
+            self.vertex_count = count
+            self.clear_canvas()
+            self.circular_draw_vertices()
+    
+    def circular_draw_vertices(self):
+        """Расстановка вершин: по кругу, а для больших графов — сеткой"""
+        if not self.vertex_count:
+            return
+        
+        self.vertex_positions = {}
+        canvas_width = self.canvas.winfo_width() - 2 * self.vertex_radius
+        canvas_height = self.canvas.winfo_height() - 2 * self.vertex_radius
+        
+        # Если холст ещё не отобразился, используем стандартные размеры
+        if canvas_width <= 0:
+            canvas_width = 800 - 2 * self.vertex_radius
+        if canvas_height <= 0:
+            canvas_height = 600 - 2 * self.vertex_radius
+        
+        if self.vertex_count > 50:
+            # на одном круге вершины слились бы: сетка с шагом в три радиуса
+            step = 3 * self.vertex_radius
+            columns = math.ceil(math.sqrt(self.vertex_count))
+            for i in range(self.vertex_count):
+                vertex = f"V{i+1}"
+                self.vertex_positions[vertex] = (self.vertex_radius + (i % columns) * step,
+                                                 self.vertex_radius + (i // columns) * step)
+                self.graph.add_vertex(vertex)
+            self.fit_view(self.vertex_positions)
+            self.redraw_graph()
+            return
+
+        center_x, center_y = canvas_width // 2, canvas_height // 2
+        radius = min(center_x - 50, center_y - 50, 
+                    max(50, min(canvas_width, canvas_height) // 3))
+        
+        for i in range(self.vertex_count):
+            angle = 2 * math.pi * i / self.vertex_count
+            x = center_x + radius * math.cos(angle)
+            y = center_y + radius * math.sin(angle)
+            
+            # Убедимся, что вершина не выходит за границы
+            x = max(self.vertex_radius, min(x, canvas_width - self.vertex_radius))
+            y = max(self.vertex_radius, min(y, canvas_height - self.vertex_radius))
+            
+            vertex = f"V{i+1}"
+            self.vertex_positions[vertex] = (x, y)
+            self.graph.add_vertex(vertex)
+        
+        self.redraw_graph()
+
+    def canvas_size(self):
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        return (width if width > 1 else 800), (height if height > 1 else 600)
+
+    def to_world(self, x, y):
+        """Экранные координаты холста -> координаты графа"""
+        ox, oy = self.offset
+        return (x - ox) / self.zoom, (y - oy) / self.zoom
+
+    def fit_view(self, positions):
+        """Масштаб и сдвиг, при которых все вершины видны (крупнее 1:1 не увеличиваем)"""
+        width, height = self.canvas_size()
+        if not positions:
+            self.zoom, self.offset = 1.0, (0.0, 0.0)
+            return
+        xs = [x for x, _ in positions.values()]
+        ys = [y for _, y in positions.values()]
+        margin = 2 * self.vertex_radius
+        min_x, max_x = min(xs) - margin, max(xs) + margin
+        min_y, max_y = min(ys) - margin, max(ys) + margin
+        if min_x >= 0 and min_y >= 0 and max_x <= width and max_y <= height:
+            self.zoom, self.offset = 1.0, (0.0, 0.0)
+            return
+        self.zoom = min(1.0, width / (max_x - min_x), height / (max_y - min_y))
+        self.offset = ((width - (max_x + min_x) * self.zoom) / 2,
+                       (height - (max_y + min_y) * self.zoom) / 2)
+
+    def on_mouse_wheel(self, event):
+        """Масштабирование вокруг курсора"""
+        up = event.num == 4 or getattr(event, 'delta', 0) > 0
+        factor = 1.2 if up else 1 / 1.2
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        wx, wy = self.to_world(x, y)
+        self.zoom = min(8.0, max(0.005, self.zoom * factor))
+        # точка под курсором остаётся на месте
+        self.offset = (x - wx * self.zoom, y - wy * self.zoom)
+        self.redraw_current()
+
+    def on_pan_start(self, event):
+        self.pan_start = (event.x, event.y)
+
+    def on_pan_move(self, event):
+        """Сдвиг вида: элементы двигаются целиком, недостающие дорисуются в конце"""
+        if self.pan_start is None:
+            return
+        dx, dy = event.x - self.pan_start[0], event.y - self.pan_start[1]
+        self.pan_start = (event.x, event.y)
+        ox, oy = self.offset
+        self.offset = (ox + dx, oy + dy)
+        self.canvas.move("graph", dx, dy)
+
+    def on_pan_end(self, event):
+        if self.pan_start is not None:
+            self.pan_start = None
+            self.redraw_current()
+
+    def redraw_current(self):
+        if self.planar_view:
+            self.redraw_planar_graph(keep_view=True)
+        else:
+            self.redraw_graph()
+
+    def sync_index(self):
+        """Перестройка сетки, если граф менялся помимо правок по одной вершине или ребру"""
+        if self.index_revision == self.graph.revision:
+            return
+        self.index = SpatialIndex(3 * self.vertex_radius)
+        for vertex, (x, y) in self.vertex_positions.items():
+            self.index.add_point(vertex, x, y)
+        for start, end, _ in self.graph.get_edges():
+            self.index.add_segment(frozenset((start, end)), start, end)
+        self.index_revision = self.graph.revision
+
+    def on_canvas_click(self, event):
+        """Обработчик клика на холсте"""
+        # Координаты с учётом прокрутки и масштаба
+        x, y = self.to_world(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        self.canvas.focus_set()
+        
+        if self.vertex_create_mode:
+            self.add_vertex_at(x, y)
+            return
+        
+        if not self.vertex_positions:
+            return
+        
+        # Ищем вершину, а если её нет — ребро под курсором; при сильном
+        # отдалении по ним всё равно можно попасть
+        self.sync_index()
+        clicked_vertex = self.index.point_at(x, y, max(self.vertex_radius, 4 / self.zoom))
+        clicked_edge = None
+        if clicked_vertex is None:
+            clicked_edge = self.index.segment_at(x, y, 4 / self.zoom)
+        
+        if clicked_vertex:
+            if self.vertex_removal_mode:
+                self.remove_vertex(clicked_vertex)
+                return
+            elif self.edge_removal_mode:
+                if self.selected_vertex is None:
+                    self.select_vertex(clicked_vertex)
+                else:
+                    self.remove_edge(self.selected_vertex, clicked_vertex)
+                    self.select_vertex(None)
+                return
+            elif self.edge_creation_mode:
+                if self.selected_vertex is None:
+                    self.select_vertex(clicked_vertex)
+                else:
+                    self.add_edge(self.selected_vertex, clicked_vertex)
+                    self.select_vertex(None)
+                return
+            else:
+                self.select_vertex(clicked_vertex)
+        elif clicked_edge is not None and not self.planar_view:
+            if self.edge_removal_mode:
+                self.remove_edge(*clicked_edge)
+                self.select_vertex(None)
+            elif not (self.vertex_removal_mode or self.edge_creation_mode):
+                self.select_vertex(None)
+                self.mark(set(), {clicked_edge})
+        else:
+            self.select_vertex(None)
+            if not (self.planar_view or self.vertex_removal_mode or
+                    self.edge_removal_mode or self.edge_creation_mode):
+                # рамка выделения от пустого места
+                self.unmark()
+                self.band_start = (self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+                self.canvas.create_rectangle(*self.band_start, *self.band_start,
+                                             outline="blue", dash=(4, 2), tags="band")
+
+    def on_button_release(self, event):
+        """Конец рамки: выделяются вершины внутри и рёбра с обоими концами внутри"""
+        if self.band_start is None:
+            return
+        x1, y1 = self.to_world(*self.band_start)
+        x2, y2 = self.to_world(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        self.band_start = None
+        self.canvas.delete("band")
+        left, right = min(x1, x2), max(x1, x2)
+        top, bottom = min(y1, y2), max(y1, y2)
+        self.sync_index()
+        vertices = set(self.index.points_in_rect(left, top, right, bottom))
+        edges = {key for key in self.index.segments_in_rect(left, top, right, bottom)
+                 if key <= vertices}
+        if vertices or edges:
+            self.mark(vertices, edges)
+
+    def mark(self, vertices, edges):
+        self.marked_vertices, self.marked_edges = vertices, edges
+        self.redraw_graph()
+
+    def unmark(self):
+        if self.marked_vertices or self.marked_edges:
+            self.mark(set(), set())
+
+    def delete_marked(self):
+        """Удаление выделенных вершин и рёбер с одной перерисовкой"""
+        if not (self.marked_vertices or self.marked_edges):
+            return
+        self.sync_index()
+        for edge in self.marked_edges:
+            u, v = edge
+            if self.graph.has_edge(u, v):
+                self.graph.remove_edge(u, v)
+                self.index.remove_segment(edge)
+        for vertex in self.marked_vertices:
+            if vertex in self.vertex_positions:
+                self.graph.remove_vertex(vertex)
+                del self.vertex_positions[vertex]
+                self.index.remove_point(vertex)
+        self.index_revision = self.graph.revision
+        if self.selected_vertex in self.marked_vertices:
+            self.selected_vertex = None
+        self.marked_vertices, self.marked_edges = set(), set()
+        self.redraw_graph()
+    
+    def on_vertex_drag(self, event):
+        """Перемещение вершины при перетаскивании"""
+        if self.band_start is not None:
+            x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+            self.canvas.coords("band", *self.band_start, x, y)
+            return
+        if not self.selected_vertex or self.edge_creation_mode:
+            return
+        
+        # Координаты с учётом прокрутки; вершина не выходит за видимую область
+        width, height = self.canvas_size()
+        x = max(0, min(self.canvas.canvasx(event.x), width))
+        y = max(0, min(self.canvas.canvasy(event.y), height))
+        
+        # Обновляем позицию вершины и двигаем только её элементы и инцидентные рёбра
+        vertex = self.selected_vertex
+        self.vertex_positions[vertex] = self.to_world(x, y)
+        if self.planar_view or vertex not in self.vertex_items:
+            self.redraw_graph()
+            return
+        # вершина и её рёбра переходят в новые клетки сетки
+        self.sync_index()
+        self.index.move_point(vertex, *self.vertex_positions[vertex])
+
+        r = self.vertex_radius * self.zoom
+        oval, label = self.vertex_items[vertex]
+        self.canvas.coords(oval, x - r, y - r, x + r, y + r)
+        if label is not None:
+            self.canvas.coords(label, x, y)
+        # инцидентные рёбра берём из сетки: отсечённое при отрисовке ребро
+        # могло въехать на экран вместе с вершиной, тогда рисуем его сейчас
+        zoom, (ox, oy) = self.zoom, self.offset
+        detailed = r >= DETAIL_MIN_RADIUS
+        for segment in self.index.incident[vertex]:
+            start, end = key = self.index.segments[segment]
+            x1, y1 = self.vertex_positions[start]
+            x2, y2 = self.vertex_positions[end]
+            coords = (x1 * zoom + ox, y1 * zoom + oy, x2 * zoom + ox, y2 * zoom + oy)
+            if key in self.edge_items:
+                self.canvas.coords(self.edge_items[key], *coords)
+            else:
+                self.canvas.tag_lower(self.create_edge_item(key, coords, detailed))
+
+    def select_vertex(self, vertex):
+        """Смена выделенной вершины без перерисовки холста"""
+        previous = self.selected_vertex
+        self.selected_vertex = vertex
+        if self.planar_view:
+            # выходим из плоского представления обратно к графу
+            self.redraw_graph()
+            return
+        if previous in self.vertex_items:
+            # при отдалении вершины рисуются точками без обводки
+            detailed = self.vertex_radius * self.zoom >= DETAIL_MIN_RADIUS
+            self.canvas.itemconfig(self.vertex_items[previous][0],
+                                   outline="black" if detailed else "", width=1)
+        if vertex in self.vertex_items:
+            self.canvas.itemconfig(self.vertex_items[vertex][0], outline="red", width=2)
+    
+    def add_edge(self, start, end):
+        """Добавление ребра в граф"""
+        synced = self.index_revision == self.graph.revision
+        self.graph.add_edge(start, end)  
+        if synced and start != end:
+            self.index.add_segment(frozenset((start, end)), start, end)
+            self.index_revision = self.graph.revision
+        self.redraw_graph()
+
+    def scale_positions(self, pos):
+        """Масштабирование координат укладки под размеры холста с отступами.
+
+        Большой граф раскладывается на поле крупнее холста (примерно четыре
+        радиуса вершины на вершину по каждой оси от sqrt(n)), видимая часть
+        выбирается масштабом.
+        """
+        canvas_width, canvas_height = self.canvas_size()
+        side = 4 * self.vertex_radius * math.sqrt(len(pos))
+        canvas_width, canvas_height = max(canvas_width, side), max(canvas_height, side)
+
+        # Найдём минимальные и максимальные координаты из pos
+        xs = [x for x, y in pos.values()]
+        ys = [y for x, y in pos.values()]
+        min_x, max_x = min(xs), max(xs)
+        min_y, max_y = min(ys), max(ys)
+        span_x = (max_x - min_x) or 1
+        span_y = (max_y - min_y) or 1
+
+        margin = 40
+        return {
+            v: (margin + (x - min_x) / span_x * (canvas_width - 2 * margin),
+                margin + (y - min_y) / span_y * (canvas_height - 2 * margin))
+            for v, (x, y) in pos.items()
+        }
+
+    def redraw_planar_graph(self, keep_view=False):
+        """Перерисовка графа с учётом планарности"""
+        if not self.planar_view:
+            self.saved_view = (self.zoom, self.offset)
+        self.planar_view = True
+
+        pos, is_planar = self.graph.layout_planar_or_default()
+        self.planar_positions = self.scale_positions(pos)
+        if not keep_view:
+            self.fit_view(self.planar_positions)
+        # цвет вершин зависит от планарности
+        self.draw_graph(self.planar_positions, "lightblue" if is_planar else "lightcoral")
+            
+        # Добавляем подпись сверху
+        self.canvas.create_text(
+            self.canvas.winfo_width() // 2, 20,  
+            text="Плоский граф текущего графа. Чтобы вернуться, нажмите на экран.",
+            fill="red",
+            font=("Arial", 12, "bold"),
+            anchor="n",  # привязка к верхнему центру текста
+            width=self.canvas.winfo_width() - 40  # чтобы текст переносился и не выходил за края
+        )
+
+    def redraw_graph(self):
+        """Полная перерисовка графа (только при изменении структуры)"""
+        if self.planar_view and self.saved_view is not None:
+            self.zoom, self.offset = self.saved_view
+        self.planar_view = False
+        self.sync_index()
+        self.draw_graph(self.vertex_positions, "lightblue", self.index)
+        self.update_live_verdict()
+
+    def draw_graph(self, positions, fill, index=None):
+        """Отрисовка только видимой части графа с уровнем подробности по масштабу.
+
+        Видимые вершины и рёбра берутся из сетки index (без неё — проходом
+        по всему графу). Их элементы запоминаются для перемещения вершин;
+        при отдалении подписи не рисуются, вершины — точками, рёбра — тонкими.
+        """
+        canvas = self.canvas
+        canvas.delete("all")
+        self.vertex_items = {}
+        self.edge_items = {}
+
+        zoom, (ox, oy) = self.zoom, self.offset
+        width, height = self.canvas_size()
+        r = self.vertex_radius * zoom
+        show_labels = r >= LABEL_MIN_RADIUS
+        detailed = r >= DETAIL_MIN_RADIUS
+        font = ("Arial", max(6, min(16, round(12 * zoom))))
+
+        if index is not None:
+            left, top = self.to_world(-r, -r)
+            right, bottom = self.to_world(width + r, height + r)
+            shown = index.points_in_rect(left, top, right, bottom)
+            lines = [index.segments[key] for key in index.segments_in_rect(left, top, right, bottom)]
+        else:
+            shown, lines = [], []
+            for vertex, (x, y) in positions.items():
+                sx, sy = x * zoom + ox, y * zoom + oy
+                if -r <= sx <= width + r and -r <= sy <= height + r:
+                    shown.append(vertex)
+            for start, end, _ in self.graph.get_edges():
+                # рисуем, только если рамка отрезка пересекает экран
+                (x1, y1), (x2, y2) = positions[start], positions[end]
+                x1, y1, x2, y2 = x1 * zoom + ox, y1 * zoom + oy, x2 * zoom + ox, y2 * zoom + oy
+                if max(x1, x2) >= 0 and min(x1, x2) <= width and max(y1, y2) >= 0 and min(y1, y2) <= height:
+                    lines.append((start, end))
+
+        # Рисуем рёбра; рёбра найденного гамильтонова цикла и выделенные рёбра отмечаются цветом
+        create_line = canvas.create_line
+        cycle_edges = self.cycle_edges()
+        marked_edges = self.marked_edges
+        edge_width = 2 if detailed else 1
+        for start, end in lines:
+            (x1, y1), (x2, y2) = positions[start], positions[end]
+            x1, y1, x2, y2 = x1 * zoom + ox, y1 * zoom + oy, x2 * zoom + ox, y2 * zoom + oy
+            if not detailed and abs(x1 - x2) < 1 and abs(y1 - y2) < 1:
+                continue  # короче пикселя
+            key = (start, end)
+            pair = frozenset(key)
+            color = "orange" if pair in marked_edges else "red" if pair in cycle_edges else "black"
+            self.edge_items[key] = create_line(x1, y1, x2, y2, tags="graph", fill=color,
+                                               width=edge_width if color == "black" else 2 * edge_width)
+        
+        # Рисуем вершины
+        create_oval, create_text = canvas.create_oval, canvas.create_text
+        dot = max(r, 1.5)
+        for vertex in shown:
+            x, y = positions[vertex]
+            x, y = x * zoom + ox, y * zoom + oy
+            selected = vertex == self.selected_vertex
+            color = "orange" if vertex in self.marked_vertices else fill
+            if detailed:
+                oval = create_oval(x - r, y - r, x + r, y + r, fill=color, tags="graph",
+                                   outline="red" if selected else "black", width=2 if selected else 1)
+            else:
+                oval = create_oval(x - dot, y - dot, x + dot, y + dot, fill=color, tags="graph",
+                                   outline="red" if selected else "")
+            label = create_text(x, y, text=vertex, font=font, tags="graph") if show_labels else None
+            self.vertex_items[vertex] = (oval, label)
+
+    def create_edge_item(self, key, coords, detailed):
+        """Линия ребра key в экранных координатах coords, в цветах draw_graph"""
+        pair = frozenset(key)
+        color = "orange" if pair in self.marked_edges else "red" if pair in self.cycle_edges() \
+            else "black"
+        width = 2 if detailed else 1
+        item = self.canvas.create_line(*coords, tags="graph", fill=color,
+                                       width=width if color == "black" else 2 * width)
+        self.edge_items[key] = item
+        return item
+
+    def update_live_verdict(self):
+        """Быстрый вердикт по теореме Гринберга в строке состояния"""
+        if self.graph.number_of_vertices() < 3:
+            self.live_label.config(text="")
+            return
+        verdict, count = self.graph.live_verdict()
+        if verdict == 'nonplanar':
+            text = "Сейчас: граф непланарный"
+        elif verdict == 'nonbiconnected':
+            text = "Сейчас: граф не двусвязный"
+        elif verdict:
+            text = f"Сейчас: может быть гамильтонов (разбиений граней: {count // 2})"
+        else:
+            text = "Сейчас: не гамильтонов по теореме Гринберга"
+        self.live_label.config(text=text)
+        
+    def graph_edge_generation(self):
+        """Генерация случайного графа"""
+        self.reset_modes()
+        if not self.vertex_count:
+            messagebox.showwarning("Ошибка", "Сначала задайте количество вершин!")
+            return
+            
+        density = simpledialog.askfloat("Плотность графа", 
+                                      "Введите плотность графа (0.0-1.0):",
+                                      parent=self.master,
+                                      minvalue=0,
+                                      maxvalue=1.0)
+        if density is None:
+            return
+        
+        self.graph.clear_edges()
+        
+        # Генерация рёбер за один проход и одна перерисовка в конце
+        vertices = list(self.vertex_positions.keys())
+        max_edges = len(vertices) * (len(vertices) - 1) // 2
+        _, edges = random_edges(len(vertices), int(density * max_edges))
+        self.graph.add_edges_from((vertices[i], vertices[j]) for i, j in edges)
+        
+        self.redraw_graph()
+
+    def generate_planar_graph(self):
+        """Генерация случайного планарного двусвязного графа"""
+        self.reset_modes()
+        count = simpledialog.askinteger("Количество вершин",
+                                        f"Введите количество вершин (3-{MAX_VERTICES}):",
+                                        parent=self.master, minvalue=3, maxvalue=MAX_VERTICES)
+        if not count:
+            return
+        deletion = simpledialog.askfloat("Удаление рёбер",
+                                         "Доля удаляемых рёбер триангуляции (0.0-1.0):",
+                                         parent=self.master, minvalue=0, maxvalue=1.0)
+        if deletion is None:
+            return
+        self.show_generated_graph(*random_planar_biconnected(count, deletion))
+
+    def generate_cubic_graph(self):
+        """Генерация случайного кубического планарного графа"""
+        self.reset_modes()
+        count = simpledialog.askinteger("Количество вершин",
+                                        f"Введите чётное количество вершин (4-{MAX_VERTICES}):",
+                                        parent=self.master, minvalue=4, maxvalue=MAX_VERTICES)
+        if not count:
+            return
+        self.show_generated_graph(*random_cubic_planar(count - count % 2))
+
+    def show_generated_graph(self, count, edges):
+        """Замена графа сгенерированным и размещение вершин по плоской укладке"""
+        self.clear_canvas()
+        self.vertex_count = count
+        vertices = [f"V{i+1}" for i in range(count)]
+        for vertex in vertices:
+            self.graph.add_vertex(vertex)
+        self.graph.add_edges_from((vertices[i], vertices[j]) for i, j in edges)
+
+        pos, _ = self.graph.layout_planar_or_default()
+        self.vertex_positions = self.scale_positions(pos)
+        self.fit_view(self.vertex_positions)
+        self.redraw_graph()
+    
+    def check_hamiltonian(self):
+        """Запуск проверки графа на гамильтоновость в фоновом потоке"""
+        self.reset_modes()
+        if not self.graph.get_vertices():
+            messagebox.showwarning("Ошибка", "Граф пуст!")
+            return
+        if self.check_control is not None:
+            messagebox.showwarning("Ошибка", "Проверка уже выполняется")
+            return
+
+        try:
+            time_budget = float(self.time_budget_var.get())
+        except ValueError:
+            time_budget = 0
+
+        # Проверяем копию, чтобы граф можно было редактировать во время проверки
+        snapshot = self.graph.copy()
+        control = SolverControl(time_budget)
+        self.check_control = control
+        self.cancel_button.config(state=tk.NORMAL)
+        self.progress_bar.config(value=0)
+
+        mode = 'dual' if self.dual_mode_var.get() else 'counts'
+        try:
+            jobs = max(1, int(self.solver_jobs_var.get()))
+        except ValueError:
+            jobs = 1
+
+        def worker():
+            # любая ошибка передаётся в poll_check: иначе поток молча умирает,
+            # а check_control остаётся занятым до перезапуска программы
+            try:
+                mutable_params = []
+                report = {}
+                with profiling() as profiler:
+                    result = snapshot.greenberg_condition(mutable_params, control,
+                                                          self.result_cache, mode, report, jobs)
+                    # теорема не дала ответа — точный поиск цикла в оставшееся время;
+                    # в двойственном режиме цикл — граница найденных граней f'
+                    cycle = None
+                    if result is True and mode == 'dual':
+                        cycle = boundary_cycle(mutable_params[0])
+                    elif result in (True, 'nonplanar'):
+                        cycle = snapshot.find_hamiltonian_cycle(control)
+                self.check_results.put((snapshot, result, mutable_params, cycle, mode, report,
+                                        profiler))
+            except BaseException as e:
+                self.check_results.put(('error', e))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.master.after(100, self.poll_check)
+
+    def cancel_check(self):
+        """Отмена фоновой проверки"""
+        if self.check_control is not None:
+            self.check_control.cancel()
+
+    def poll_check(self):
+        """Опрос фоновой проверки: обновление прогресса и вывод результата"""
+        control = self.check_control
+        if control is None:
+            return
+
+        try:
+            outcome = self.check_results.get_nowait()
+        except queue.Empty:
+            stage = self.check_stage_names.get(control.stage, "")
+            if control.total:
+                self.progress_bar.config(maximum=control.total, value=control.done)
+                stage = f"{stage}: {control.done}/{control.total}"
+            self.progress_label.config(text=stage)
+            self.master.after(100, self.poll_check)
+            return
+
+        self.check_control = None
+        self.cancel_button.config(state=tk.DISABLED)
+        self.progress_bar.config(value=0)
+        self.progress_label.config(text="")
+        if outcome[0] == 'error':
+            error = outcome[1]
+            messagebox.showerror("Ошибка проверки", f"{type(error).__name__}: {error}")
+            return
+        snapshot, result, mutable_params, cycle, mode, report, profiler = outcome
+        # Если граф не менялся, переиспользуем уже посчитанную укладку
+        self.graph.adopt_analysis(snapshot)
+        graph_unchanged = snapshot.revision == self.graph.revision
+        if isinstance(cycle, list) and graph_unchanged:
+            edges = {frozenset(pair) for pair in zip(cycle, cycle[1:] + cycle[:1])}
+            self.hamiltonian_cycle = (self.graph.revision, edges)
+        self.last_check = (snapshot, result, mutable_params, mode)
+        self.profile_label.config(text=self.profile_text(profiler))
+        self.show_check_result(result, mutable_params, graph_unchanged, cycle, mode,
+                               report.get('rule'))
+
+    def profile_text(self, profiler):
+        """Строка с временем этапов проверки и счётчиками перебора"""
+        names = self.profile_names
+        parts = [f"{names.get(name, name)} {seconds * 1000:.1f} мс"
+                 for name, seconds in profiler.timings.items()]
+        parts += [f"{names.get(name, name)}: {amount}"
+                  for name, amount in profiler.counters.items() if amount]
+        return "Этапы: " + ", ".join(parts) if parts else ""
+
+    def save_certificate(self):
+        """Сохранение сертификата последней проверки в JSON (проверка: cli.py verify)"""
+        self.reset_modes()
+        if self.last_check is None:
+            messagebox.showwarning("Ошибка", "Сначала проверьте граф")
+            return
+        snapshot, result, mutable_params, mode = self.last_check
+        certificate = make_certificate(snapshot, result, mutable_params, mode)
+        if certificate is None:
+            messagebox.showwarning("Ошибка", "Проверка не завершилась, сертификата нет")
+            return
+        if snapshot.revision != self.graph.revision:
+            messagebox.showinfo("Сертификат", "Граф изменён после проверки: сертификат "
+                                "относится к графу на момент проверки")
+        path = filedialog.asksaveasfilename(parent=self.master, defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(certificate, f, ensure_ascii=False)
+
+    def cycle_edges(self):
+        """Рёбра найденного гамильтонова цикла, если граф с тех пор не менялся"""
+        if self.hamiltonian_cycle is None:
+            return set()
+        revision, edges = self.hamiltonian_cycle
+        return edges if revision == self.graph.revision else set()
+
+    def cycle_message(self, cycle):
+        """Текст о результате точного поиска гамильтонова цикла"""
+        if isinstance(cycle, list):
+            return "Найден гамильтонов цикл: " + " - ".join(cycle + cycle[:1])
+        if cycle is False:
+            return "Точный поиск: гамильтонова цикла нет"
+        if cycle == 'inconclusive':
+            return "Точный поиск: лимит времени исчерпан, цикл не найден"
+        return ""
+
+    def rule_label(self, rule):
+        # правила вида residue_mod_<m> ищем по префиксу и подставляем модуль
+        if rule in self.rule_names:
+            return self.rule_names[rule]
+        if rule.startswith('residue_mod_'):
+            return self.rule_names['residue_mod_'].format(m=rule[len('residue_mod_'):])
+        return rule
+
+    def show_check_result(self, result, mutable_params, graph_unchanged=True, cycle=None,
+                          mode='counts', rule=None):
+        """Вывод результата проверки"""
+        if cycle == 'cancelled':
+            return
+        details = self.cycle_message(cycle)
+        if result == True and mode == 'dual':
+            messagebox.showinfo("Результат", f"Граф гамильтонов: грани f' и f'' образуют деревья в двойственном графе\nf'_k: {mutable_params[0]}\nf''_k: {mutable_params[1]}\n{details}")
+            if graph_unchanged:
+                self.redraw_planar_graph()
+        elif result == True:
+            messagebox.showinfo("Результат", f"Граф может быть гамильтонов (по теореме Гринберга)\nf'_k: {mutable_params[0]}\nf''_k: {mutable_params[1]}\n{details}")
+            if graph_unchanged:
+                self.redraw_planar_graph()
+        elif result == False and mode == 'dual' and rule not in ('separation_pair', 'component'):
+            messagebox.showinfo("Результат", "Граф не гамильтонов: нет разбиения граней на два дерева двойственного графа")
+        elif result == False:
+            how = f"\nПравило: {self.rule_label(rule)}" if rule else ""
+            messagebox.showinfo("Результат", f"Граф не гамильтонов (по теореме Гринберга){how}")
+        elif result == 'nonplanar':
+            messagebox.showinfo("Результат", f"Граф непланарный, теорема Гринберга не применима\n{details}")
+            if graph_unchanged and isinstance(cycle, list):
+                self.redraw_graph()
+        elif result == 'nonbiconnected':
+            messagebox.showinfo("Результат", "Граф не двусвязный, теорема Гринберга не применима, гамильтоновости нет")
+        elif result == 'inconclusive':
+            messagebox.showinfo("Результат", "Лимит времени исчерпан, результат не определён")
+        elif result == 'cancelled':
+            pass
+        else:
+            messagebox.showwarning("Ошибка", "Неожиданный результат")
+
+    def clear_canvas(self):
+        """Очистка холста и графа"""
+        self.canvas.delete("all")
+        self.vertex_items = {}
+        self.edge_items = {}
+        self.planar_view = False
+        self.zoom, self.offset, self.saved_view = 1.0, (0.0, 0.0), None
+        self.index_revision = None
+        self.marked_vertices, self.marked_edges = set(), set()
+        self.band_start = None
+        self.graph = GraphNX()
+        self.vertex_positions = {}
+        self.selected_vertex = None
+        self.live_label.config(text="")
+        self.profile_label.config(text="")
+        self.last_check = None
+        self.edge_creation_mode = False
+        self.master.config(cursor="")
+
+    def clear_graphs(self):
+        """Очистка холста, графа и вершин"""
+        self.reset_modes()
+        self.clear_canvas()
+        self.vertex_count = 0
+
+
+def main():
+    root = tk.Tk()
+    app = GraphGUI(root)
+    root.mainloop()
+
+if __name__ == "__main__":
+    import math
+    main()
@@ -0,0 +1,145 @@
+# Точный поиск гамильтонова цикла на битовых масках смежности:
+# adj[v] — маска соседей вершины v, вершины пронумерованы 0..n-1.
+
+from . import profiler
+
+# примерный размер одной записи таблицы Хелда-Карпа (int в списке), байт
+_HELD_KARP_ENTRY_BYTES = 40
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def held_karp(n, adj, control=None):
+    """Динамика Хелда-Карпа по подмножествам за O(2^n * n^2).
+
+    dp[S] — маска вершин v, в которых может заканчиваться путь из 0,
+    проходящий ровно по S. Возвращает цикл (список вершин) или None.
+    """
+    full = (1 << n) - 1
+    size = 1 << (n - 1)  # маски всегда содержат вершину 0, её бит не храним
+    dp = [0] * size
+    for v in _bits(adj[0]):
+        dp[1 << (v - 1)] |= 1 << v
+
+    for index in range(1, size):
+        ends = dp[index]
+        if not ends:
+            continue
+        mask = (index << 1) | 1
+        free = full & ~mask
+        for v in _bits(ends):
+            for w in _bits(adj[v] & free):
+                dp[(mask | (1 << w)) >> 1] |= 1 << w
+        if control is not None and index & 0xFFF == 0:
+            control.step(0x1000)
+
+    profiler.count('held_karp_states', size)
+    last = dp[size - 1] & adj[0]
+    if not last:
+        return None
+
+    # восстановление пути с конца
+    v = last.bit_length() - 1
+    mask = full
+    cycle = [v]
+    while True:
+        mask &= ~(1 << v)
+        if mask == 1:
+            break
+        v = (dp[mask >> 1] & adj[v]).bit_length() - 1
+        cycle.append(v)
+    cycle.append(0)
+    cycle.reverse()
+    return cycle
+
+
+def backtracking(n, adj, control=None):
+    """Перебор с возвратом для больших разреженных графов.
+
+    Путь растёт из вершины наименьшей степени. Отсечения: у каждой
+    непосещённой вершины должно остаться не меньше двух доступных соседей;
+    сосед головы, у которого их ровно два, обязан идти следующим; голова,
+    начало и непосещённые вершины должны оставаться связными.
+    """
+    full = (1 << n) - 1
+    start = min(range(n), key=lambda v: adj[v].bit_count())
+    start_bit = 1 << start
+
+    def feasible(head, unvisited):
+        allowed = unvisited | (1 << head) | start_bit
+        for w in _bits(unvisited):
+            if (adj[w] & allowed).bit_count() < 2:
+                return False
+        # связность: от головы до начала через все непосещённые вершины
+        reach = 1 << head
+        frontier = reach
+        while frontier:
+            grow = 0
+            for v in _bits(frontier):
+                grow |= adj[v]
+            frontier = grow & unvisited & ~reach
+            reach |= frontier | (grow & start_bit)
+        return unvisited & ~reach == 0 and reach & start_bit
+
+    def candidates(head, unvisited):
+        options = adj[head] & unvisited
+        allowed = unvisited | (1 << head) | start_bit
+        # сосед, у которого осталось ровно два доступных соседа, обязан идти
+        # следующим; у начала таких может быть два — второй замкнёт цикл
+        forced = [w for w in _bits(options) if (adj[w] & allowed).bit_count() == 2]
+        if len(forced) > (2 if head == start else 1):
+            return []
+        order = forced or list(_bits(options))
+        # сначала вершины с меньшим числом доступных соседей
+        order.sort(key=lambda w: (adj[w] & allowed).bit_count())
+        return order
+
+    path = [start]
+    unvisited = full & ~start_bit
+    stack = [iter(candidates(start, unvisited))]
+    states = 0
+    try:
+        while stack:
+            states += 1
+            if control is not None:
+                control.step()
+            w = next(stack[-1], None)
+            if w is None:
+                stack.pop()
+                unvisited |= 1 << path.pop()
+                continue
+            rest = unvisited & ~(1 << w)
+            if not rest:
+                if adj[w] & start_bit:
+                    return path + [w]
+                continue
+            if not feasible(w, rest):
+                continue
+            path.append(w)
+            unvisited = rest
+            stack.append(iter(candidates(w, unvisited)))
+        return None
+    finally:
+        profiler.count('backtracking_states', states)
+
+
+def find_hamiltonian_cycle(n, adj, control=None, held_karp_limit=16,
+                           memory_budget=256 * 1024 * 1024):
+    """Гамильтонов цикл (список вершин) или None, если его нет.
+
+    Для малых n — Хелд-Карп, если его таблица укладывается в memory_budget
+    байт, иначе перебор с возвратом. Ограничение по времени и отмена —
+    через control (SolverControl), который прерывает поиск исключением.
+    """
+    if n < 3:
+        return None
+    if any(adj[v].bit_count() < 2 for v in range(n)):
+        return None
+    if n <= held_karp_limit and (1 << (n - 1)) * _HELD_KARP_ENTRY_BYTES <= memory_budget:
+        return held_karp(n, adj, control)
+    return backtracking(n, adj, control)
@@ -0,0 +1,159 @@
+import random
+
+import numpy as np
+
+# до этого числа вершин отталкивание считается по всем парам (матрица n x n),
+# дальше — только между соседними клетками сетки
+FULL_PAIRWISE_LIMIT = 200
+
+
+def _repulsion_pairwise(pos, k):
+    delta = pos[:, None, :] - pos[None, :, :]
+    dist = np.maximum(np.hypot(delta[..., 0], delta[..., 1]), 1e-3)
+    return (delta * (k * k / dist ** 2)[..., None]).sum(axis=1)
+
+
+def _repulsion_grid(pos, k, coarse=8):
+    # ближнее отталкивание — точно, для пар из соседних клеток мелкой сетки
+    # (в клетке в среднем несколько вершин); дальнее — от центров масс
+    # клеток крупной сетки coarse x coarse, кроме собственной клетки вершины
+    n = len(pos)
+    # границы клеток по квантилям каждой оси: в каждом столбце и каждой
+    # строке сетки поровну вершин, так что сгущения и далеко отброшенные
+    # вершины не собирают всех в одну клетку
+    side = max(1, int(np.sqrt(n / 4)))
+    bounds = np.quantile(pos, np.linspace(0, 1, side + 1)[1:-1], axis=0).reshape(-1, 2)
+    cells = np.stack([np.searchsorted(bounds[:, axis], pos[:, axis]) for axis in (0, 1)],
+                     axis=1) + 1
+    width = side + 2
+    keys = cells[:, 0] * width + cells[:, 1]
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+
+    disp = np.zeros_like(pos)
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            wanted = keys + dx * width + dy
+            start = np.searchsorted(sorted_keys, wanted, side='left')
+            count = np.searchsorted(sorted_keys, wanted, side='right') - start
+            total = count.sum()
+            if not total:
+                continue
+            i = np.repeat(np.arange(n), count)
+            shift = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+            j = order[np.repeat(start, count) + shift]
+            keep = i != j
+            i, j = i[keep], j[keep]
+            delta = pos[i] - pos[j]
+            dist2 = np.maximum(delta[:, 0] ** 2 + delta[:, 1] ** 2, 1e-6)
+            push = delta * (k * k / dist2)[:, None]
+            disp[:, 0] += np.bincount(i, push[:, 0], minlength=n)
+            disp[:, 1] += np.bincount(i, push[:, 1], minlength=n)
+
+    low = np.percentile(pos, 1, axis=0)
+    span = np.maximum(np.percentile(pos, 99, axis=0) - low, 1e-9)
+    big = np.clip((pos - low) / span * coarse, 0, coarse - 1).astype(np.int64)
+    big_keys = big[:, 0] * coarse + big[:, 1]
+    mass = np.bincount(big_keys, minlength=coarse * coarse).astype(float)
+    filled = mass > 0
+    centers = np.stack([np.bincount(big_keys, pos[:, axis], minlength=coarse * coarse)
+                        for axis in (0, 1)], axis=1)[filled] / mass[filled][:, None]
+    mass, cell_ids = mass[filled], np.flatnonzero(filled)
+    delta = pos[:, None, :] - centers[None, :, :]
+    dist2 = np.maximum(delta[..., 0] ** 2 + delta[..., 1] ** 2, 1e-6)
+    weight = k * k * mass[None, :] / dist2
+    weight[big_keys[:, None] == cell_ids[None, :]] = 0
+    disp += (delta * weight[..., None]).sum(axis=1)
+    return disp
+
+
+def force_layout(n, edges, initial=None, iterations=50, temperature=0.1, seed=None):
+    """Укладка Фрухтермана-Рейнгольда на numpy: массив координат n x 2.
+
+    initial — начальные координаты (тёплый старт после небольших правок);
+    тогда хватает меньшей температуры и числа итераций.
+    """
+    rng = np.random.default_rng(seed)
+    pos = rng.random((n, 2)) if initial is None else np.array(initial, dtype=float)
+    if n < 2:
+        return pos
+    edges = np.array(edges, dtype=np.int64).reshape(-1, 2)
+    k = 1 / np.sqrt(n)
+    repulsion = _repulsion_pairwise if n <= FULL_PAIRWISE_LIMIT else _repulsion_grid
+
+    for step in range(iterations):
+        disp = repulsion(pos, k)
+        if len(edges):
+            delta = pos[edges[:, 0]] - pos[edges[:, 1]]
+            dist = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 1e-3)
+            pull = delta * (dist / k)[:, None]
+            for axis in (0, 1):
+                disp[:, axis] += np.bincount(edges[:, 1], pull[:, axis], minlength=n)
+                disp[:, axis] -= np.bincount(edges[:, 0], pull[:, axis], minlength=n)
+        # смещение ограничено температурой, которая линейно остывает
+        t = temperature * (1 - step / iterations)
+        length = np.maximum(np.hypot(disp[:, 0], disp[:, 1]), 1e-9)
+        pos += disp * (np.minimum(length, t) / length)[:, None]
+    return pos
+
+
+class LayoutService:
+    """Координаты вершин графа с кэшем по ревизии и тёплым стартом.
+
+    Планарный граф рисуется по плоской укладке (она хранится в анализе
+    ревизии), непланарный — силовой укладкой от прежних координат:
+    новые вершины ставятся в центр уже размещённых соседей.
+    """
+
+    def __init__(self, iterations=50, warm_iterations=15):
+        self.iterations = iterations
+        self.warm_iterations = warm_iterations
+        self.revision = None
+        self.result = None
+        self.previous = {}  # метка -> координаты последней укладки
+
+    def layout(self, graph):
+        """(координаты по меткам, планарен ли граф) для текущей ревизии"""
+        if self.revision == graph.revision:
+            return self.result
+        analysis = graph.analysis()
+        if analysis.is_planar:
+            pos = analysis.positions
+        else:
+            pos = self._force(graph)
+        self.revision = graph.revision
+        self.result = (pos, analysis.is_planar)
+        self.previous = pos
+        return self.result
+
+    def _force(self, graph):
+        core = graph.core
+        ids = core.vertices()
+        index = {v: i for i, v in enumerate(ids)}
+        labels = [core.labels[v] for v in ids]
+        edges = [(index[u], index[v]) for u, v in core.edges()]
+
+        initial = None
+        placed = [label in self.previous for label in labels]
+        if self.previous and any(placed):
+            initial = []
+            for v, label in zip(ids, labels):
+                if label in self.previous:
+                    initial.append(self.previous[label])
+                    continue
+                near = [self.previous[core.labels[u]] for u in core.neighbors(v)
+                        if core.labels[u] in self.previous]
+                if near:
+                    initial.append((sum(x for x, _ in near) / len(near),
+                                    sum(y for _, y in near) / len(near)))
+                else:
+                    initial.append((random.random(), random.random()))
+            # прежние координаты могли быть любого масштаба — приводим к [0, 1]
+            initial = np.array(initial, dtype=float)
+            low = initial.min(axis=0)
+            span = np.maximum(initial.max(axis=0) - low, 1e-9)
+            initial = (initial - low) / span
+            pos = force_layout(len(ids), edges, initial, self.warm_iterations, temperature=0.02)
+        else:
+            pos = force_layout(len(ids), edges, iterations=self.iterations)
+        return {label: (float(x), float(y)) for label, (x, y) in zip(labels, pos)}
@@ -0,0 +1,200 @@
+import atexit
+import multiprocessing
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from .dual import dual_prefixes, iter_dual_partitions
+from .hamiltonian import find_hamiltonian_cycle
+from .profiler import current, profiling
+from .solver import SolverControl, SolverInterrupted
+
+# Параллельный поиск одного разбиения: пространство перебора делится на
+# независимые шарды, которые решаются в пуле процессов без общей памяти.
+# Первый найденный ответ останавливает остальные через общее событие.
+# Пул один на процесс: создаётся при первом поиске и живёт до выхода, поэтому
+# запуск процессов (spawn с импортом модулей) оплачивается один раз. Задача
+# передаётся с каждым шардом, а поиски в одном процессе идут по очереди.
+
+# сколько шардов приходится на один процесс: мелкие шарды выравнивают нагрузку
+SHARDS_PER_JOB = 4
+
+# событие остановки в процессе пула (задаётся при его запуске)
+_stop = None
+
+# общий пул родительского процесса, его размер и событие остановки
+_pool = None
+_pool_jobs = 0
+_pool_stop = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker(stop):
+    global _stop
+    _stop = stop
+
+
+def _shared_pool(jobs):
+    # пул растёт до наибольшего запрошенного jobs; вызывается под _pool_lock
+    global _pool, _pool_jobs, _pool_stop
+    if _pool is None or _pool_jobs < jobs:
+        _shutdown_pool()
+        # spawn: GUI запускает проверку из потока, а fork при живых потоках небезопасен
+        context = multiprocessing.get_context('spawn')
+        _pool_stop = context.Event()
+        _pool = ProcessPoolExecutor(jobs, mp_context=context, initializer=_init_worker,
+                                    initargs=(_pool_stop,))
+        _pool_jobs = jobs
+    return _pool, _pool_stop
+
+
+@atexit.register
+def _shutdown_pool():
+    global _pool, _pool_jobs
+    if _pool is not None:
+        _pool_stop.set()
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool, _pool_jobs = None, 0
+
+
+class _ShardControl(SolverControl):
+    """Остановка шарда, когда другой процесс уже нашёл ответ"""
+
+    def __init__(self, stop, interval=0.05):
+        super().__init__()
+        self.stop = stop
+        self.interval = interval
+        self.next_check = time.monotonic() + interval
+
+    def step(self, amount=1):
+        self.done += amount
+        now = time.monotonic()
+        if now >= self.next_check:
+            self.next_check = now + self.interval
+            if self.stop.is_set():
+                raise SolverInterrupted('cancelled')
+
+
+def _dual_shard(faces, prefix):
+    try:
+        return next(iter_dual_partitions(faces, _ShardControl(_stop), prefix), None)
+    except SolverInterrupted:
+        return None
+
+
+def _skeleton_shard(i, n, adj, held_karp_limit, memory_budget):
+    try:
+        cycle = find_hamiltonian_cycle(n, adj, _ShardControl(_stop), held_karp_limit,
+                                       memory_budget)
+    except SolverInterrupted:
+        return None
+    return i, cycle
+
+
+def _profiled(worker, profile, *task):
+    # ответ шарда и его замеры: профилировщик родителя в процесс пула не попадает
+    if not profile:
+        return worker(*task), None
+    with profiling() as profiler:
+        result = worker(*task)
+    return result, profiler.to_dict()
+
+
+def _completed(worker, tasks, jobs, control):
+    # ответы шардов по мере готовности; отмена и лимит времени проверяются
+    # в родительском процессе и останавливают все шарды. В работе не больше
+    # jobs шардов, даже если общий пул больше. Замеры шардов (и остановленных
+    # тоже) складываются в профилировщик родителя, если он включён
+    global _pool
+    profiler = current()
+    if control is not None:
+        control.start_stage('parallel', len(tasks))
+    tasks = iter(tasks)
+    pending = set()
+    with _pool_lock:
+        pool, stop = _shared_pool(jobs)
+        stop.clear()
+
+        def submit():
+            for task in tasks:
+                pending.add(pool.submit(_profiled, worker, profiler is not None, *task))
+                return
+
+        try:
+            for _ in range(jobs):
+                submit()
+            while pending:
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if control is not None:
+                        control.step()
+                    result, profile = future.result()
+                    if profile is not None:
+                        profiler.merge(profile)
+                    submit()
+                    yield result
+                if control is not None:
+                    control.step(0)
+        except BrokenProcessPool:
+            # процесс пула упал: следующий поиск запустит новый пул
+            _pool = None
+            raise
+        finally:
+            # шарды в работе замечают событие за interval и завершаются; ждём их,
+            # чтобы следующий поиск не застал их в пуле
+            stop.set()
+            for future in pending:
+                future.cancel()
+            wait(pending)
+            if profiler is not None:
+                for future in pending:
+                    if not future.cancelled() and future.exception() is None:
+                        profile = future.result()[1]
+                        if profile is not None:
+                            profiler.merge(profile)
+
+
+def _run(worker, tasks, jobs, control):
+    # ответ первого шарда, вернувшего не None
+    completed = _completed(worker, tasks, jobs, control)
+    try:
+        return next((result for result in completed if result is not None), None)
+    finally:
+        completed.close()
+
+
+def parallel_dual_partition(faces, jobs, control=None):
+    """Номера граней f' первого разбиения на два дерева граней или None.
+
+    Перебор до небольшой глубины идёт в родительском процессе, его ветви
+    (решения «взять / исключить грань») становятся шардами.
+    """
+    if jobs <= 1:
+        return next(iter_dual_partitions(faces, control), None)
+    if control is not None:
+        control.start_stage('dual')
+    found, prefixes = dual_prefixes(faces, (jobs * SHARDS_PER_JOB).bit_length(), control)
+    if found is not None or not prefixes:
+        return found
+    return _run(_dual_shard, [(faces, prefix) for prefix in prefixes], jobs, control)
+
+
+def parallel_hamiltonian_cycles(skeletons, jobs, control=None, held_karp_limit=16,
+                                memory_budget=256 * 1024 * 1024):
+    """Гамильтоновы циклы независимых скелетов (n, adj) в jobs процессах.
+
+    Список циклов в порядке скелетов или None, если у какого-то скелета
+    цикла нет: тогда остальные скелеты не досчитываются.
+    """
+    cycles = [None] * len(skeletons)
+    tasks = [(i, n, adj, held_karp_limit, memory_budget) for i, (n, adj) in enumerate(skeletons)]
+    completed = _completed(_skeleton_shard, tasks, jobs, control)
+    try:
+        for i, cycle in completed:
+            if cycle is None:
+                return None
+            cycles[i] = cycle
+    finally:
+        completed.close()
+    return cycles
@@ -0,0 +1,275 @@
+from .solver import IncrementalSubsetSum
+
+
+def trace_faces(rotation):
+    """Обход граней по системе вращений.
+
+    rotation[v][u] — сосед, к которому уходит грань после прихода в v из u.
+    Каждая грань возвращается списком вершин в порядке обхода.
+    """
+    faces = []
+    visited_edges = set()
+
+    for u in rotation:
+        for v in rotation[u]:
+            if (u, v) not in visited_edges:
+                face = []
+                current_u, current_v = u, v
+                while True:
+                    face.append(current_u)
+                    visited_edges.add((current_u, current_v))
+                    next_v = rotation[current_v][current_u]
+                    current_u, current_v = current_v, next_v
+                    if (current_u, current_v) == (u, v):
+                        break
+                faces.append(face)
+
+    return faces
+
+
+class PlanarAnalysis:
+    """Однократный анализ графа: укладка, грани, двусвязность и координаты.
+
+    Работает на целых id вершин ядра GraphCore; networkx используется только
+    для проверки планарности и построения координат. Планарность проверяется
+    сразу, остальное считается при первом обращении и дальше берётся из кэша.
+
+    Для планарного двусвязного графа правки по одному ребру обновляют
+    систему вращений, грани, f_k и таблицу сумм на месте (insert_edge,
+    delete_edge, delete_vertex); если правка может нарушить укладку или
+    двусвязность, метод возвращает False и анализ нужно построить заново.
+    """
+
+    def __init__(self, core):
+        self.core = core
+        import networkx as nx
+        self.is_planar, embedding = nx.check_planarity(core.to_networkx())
+        self._embedding = embedding if self.is_planar else None
+        self._rotation = None
+        self._face_ids = None
+        self._half_edge_face = None
+        self._face_sums = None
+        self._faces = None
+        self._is_biconnected = None
+        self._positions = None
+
+    @property
+    def embedding(self):
+        """Укладка networkx; после правок на месте собирается из системы вращений"""
+        if self._embedding is None and self.is_planar:
+            data = {}
+            for v, turn in self._rotation.items():
+                # turn[u] — следующий против часовой стрелки сосед после u
+                order = []
+                if turn:
+                    first = next(iter(turn))
+                    u = first
+                    while True:
+                        order.append(u)
+                        u = turn[u]
+                        if u == first:
+                            break
+                data[v] = order[::-1]
+            import networkx as nx
+            embedding = nx.PlanarEmbedding()
+            embedding.set_data(data)
+            self._embedding = embedding
+        return self._embedding
+
+    @property
+    def rotation(self):
+        """Система вращений из укладки по id вершин (None для непланарного графа)"""
+        if self._rotation is None and self.is_planar:
+            embedding = self.embedding
+            # грань после полуребра (u, v) продолжается ребром (v, ccw-сосед u в v)
+            self._rotation = {
+                v: {u: embedding[v][u]['ccw'] for u in embedding[v]}
+                for v in embedding
+            }
+        return self._rotation
+
+    @property
+    def face_ids(self):
+        """Грани как списки id вершин"""
+        if self._face_ids is None:
+            self._face_ids = trace_faces(self.rotation) if self.is_planar else []
+        return self._face_ids
+
+    @property
+    def face_sums(self):
+        """f_k и число наборов граней по суммам (k - 2), обновляемые на месте"""
+        if self._face_sums is None:
+            self._face_sums = IncrementalSubsetSum(len(face) for face in self.face_ids)
+        return self._face_sums
+
+    @property
+    def faces(self):
+        """Грани как списки меток вершин"""
+        if self._faces is None:
+            labels = self.core.labels
+            self._faces = [[labels[v] for v in face] for face in self.face_ids]
+        return self._faces
+
+    @property
+    def is_biconnected(self):
+        if self._is_biconnected is None:
+            self._is_biconnected = self.core.is_biconnected()
+        return self._is_biconnected
+
+    @property
+    def positions(self):
+        """Координаты вершин по плоской укладке (None для непланарного графа)"""
+        if self._positions is None and self.is_planar:
+            import networkx as nx
+            pos = nx.combinatorial_embedding_to_pos(self.embedding)
+            labels = self.core.labels
+            self._positions = {labels[v]: xy for v, xy in pos.items()}
+        return self._positions
+
+    # Правки на месте. Вызываются до изменения ядра; True — анализ обновлён
+
+    def _editable(self):
+        if not self.is_planar or not self.is_biconnected:
+            return False
+        if self._half_edge_face is None:
+            self._half_edge_face = {}
+            for i, face in enumerate(self.face_ids):
+                self._index_face(i)
+        return True
+
+    def _index_face(self, i):
+        face = self._face_ids[i]
+        half_edge_face = self._half_edge_face
+        for a, b in zip(face, face[1:] + face[:1]):
+            half_edge_face[(a, b)] = i
+
+    def _set_face(self, i, face):
+        sums = self._face_sums
+        if sums is not None:
+            sums.remove(len(self._face_ids[i]))
+            sums.add(len(face))
+        self._face_ids[i] = face
+        self._index_face(i)
+
+    def _append_face(self, face):
+        if self._face_sums is not None:
+            self._face_sums.add(len(face))
+        self._face_ids.append(face)
+        self._index_face(len(self._face_ids) - 1)
+
+    def _drop_face(self, i):
+        # последняя грань переезжает на место удаляемой
+        if self._face_sums is not None:
+            self._face_sums.remove(len(self._face_ids[i]))
+        last = self._face_ids.pop()
+        if i < len(self._face_ids):
+            self._face_ids[i] = last
+            self._index_face(i)
+
+    def _edited(self):
+        self._embedding = None
+        self._faces = None
+        self._positions = None
+
+    @staticmethod
+    def _starting_at(face, u, v):
+        # грань с началом в полуребре (u, v)
+        i = face.index(u)
+        face = face[i:] + face[:i]
+        if face[1] != v:
+            raise ValueError("полуребро не лежит на грани")
+        return face
+
+    def insert_edge(self, u, v):
+        """Новое ребро внутри общей грани u и v делит её на две"""
+        if not self._editable() or u not in self._rotation or v not in self._rotation:
+            return False
+        half_edge_face = self._half_edge_face
+        around_v = {half_edge_face[(v, y)] for y in self._rotation[v]}
+        common = [half_edge_face[(u, x)] for x in self._rotation[u]
+                  if half_edge_face[(u, x)] in around_v]
+        if not common:
+            return False  # укладку пришлось бы менять
+        i = common[0]
+        face = self._face_ids[i]
+        start = face.index(u)
+        face = face[start:] + face[:start]
+        j = face.index(v)
+        prev_u, next_u = face[-1], face[1]
+        prev_v, next_v = face[j - 1], face[(j + 1) % len(face)]
+
+        rotation = self._rotation
+        rotation[u][prev_u] = v
+        rotation[u][v] = next_u
+        rotation[v][prev_v] = u
+        rotation[v][u] = next_v
+
+        self._set_face(i, face[:j + 1])
+        self._append_face(face[j:] + [u])
+        self._edited()
+        return True
+
+    def delete_edge(self, u, v):
+        """Удаление ребра сливает две соседние грани; False, если граф перестаёт быть двусвязным"""
+        if not self._editable():
+            return False
+        half_edge_face = self._half_edge_face
+        i, j = half_edge_face[(u, v)], half_edge_face[(v, u)]
+        first = self._starting_at(self._face_ids[i], u, v)
+        second = self._starting_at(self._face_ids[j], v, u)
+        merged = [u] + second[2:] + [v] + first[2:]
+        # грани двусвязного графа — простые циклы
+        if len(set(merged)) != len(merged) or len(merged) < 3:
+            return False
+
+        rotation = self._rotation
+        rotation[u][first[-1]] = rotation[u].pop(v)
+        rotation[v][second[-1]] = rotation[v].pop(u)
+        del half_edge_face[(u, v)], half_edge_face[(v, u)]
+
+        self._set_face(min(i, j), merged)
+        self._drop_face(max(i, j))
+        self._edited()
+        return True
+
+    def delete_vertex(self, v):
+        """Удаление вершины сливает все грани вокруг неё в одну"""
+        if not self._editable():
+            return False
+        rotation = self._rotation
+        half_edge_face = self._half_edge_face
+        turn = rotation[v]
+        neighbors = []
+        x = next(iter(turn))
+        while True:
+            neighbors.append(x)
+            x = turn[x]
+            if x == neighbors[0]:
+                break
+
+        # грань полуребра (v, x_i) идёт x_i -> ... -> x_{i-1}; после удаления
+        # v пути этих граней склеиваются в обратном порядке обхода соседей
+        merged = []
+        indices = []
+        for x in reversed(neighbors):
+            i = half_edge_face[(v, x)]
+            indices.append(i)
+            path = self._starting_at(self._face_ids[i], v, x)[1:]
+            merged += path if not merged else path[1:]
+        merged.pop()
+        if len(set(merged)) != len(merged) or len(merged) < 3:
+            return False
+
+        for x in neighbors:
+            ccw = rotation[x].pop(v)
+            prev = next(u for u, w in rotation[x].items() if w == v)
+            rotation[x][prev] = ccw
+            del half_edge_face[(v, x)], half_edge_face[(x, v)]
+        del rotation[v]
+
+        indices.sort()
+        self._set_face(indices[0], merged)
+        for i in reversed(indices[1:]):
+            self._drop_face(i)
+        self._edited()
+        return True
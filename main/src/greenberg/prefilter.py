@@ -0,0 +1,106 @@
+from collections import namedtuple
+from math import gcd
+
+# Быстрые проверки по f_k до полного поиска разбиения: каждая работает за
+# O(число различных порядков граней) и либо решает задачу, либо пропускает.
+# verdict: False — разбиения нет, True — найдено prime_counts; rule — имя правила
+Prefilter = namedtuple('Prefilter', 'verdict rule prime_counts')
+
+# модули для проверки остатков: достижимые суммы по модулю m ищутся перебором
+# не более m - 1 граней каждого порядка
+RESIDUE_MODULI = (3, 4, 5, 6, 7, 8)
+
+
+def _weights(f_k):
+    return {k: k - 2 for k in f_k if k >= 3 and f_k[k] > 0}
+
+
+def parity(f_k, weights, target):
+    # S = sum f_k * (k - 2) должна делиться пополам
+    if target is None:
+        return Prefilter(False, 'parity', None)
+
+
+def dominant_face(f_k, weights, target):
+    # грань тяжелее S / 2 не помещается ни в f', ни в f''
+    if max(weights.values()) > target:
+        return Prefilter(False, 'dominant_face', None)
+
+
+def common_divisor(f_k, weights, target):
+    # все k - 2 делятся на d, а S / 2 — нет
+    d = 0
+    for w in weights.values():
+        d = gcd(d, w)
+    if target % d:
+        return Prefilter(False, 'gcd', None)
+
+
+def single_face_residue(f_k, weights, target):
+    # обобщение рассуждения по модулю 3: все k - 2, кроме одной грани,
+    # делятся на g, а она — нет. Тогда суммы f' и f'' по модулю g
+    # различаются, и равными они быть не могут
+    sizes = list(weights)
+    prefix, suffix = [0], [0]
+    for k in sizes:
+        prefix.append(gcd(prefix[-1], weights[k]))
+    for k in reversed(sizes):
+        suffix.append(gcd(suffix[-1], weights[k]))
+    suffix.reverse()
+    for i, k in enumerate(sizes):
+        if f_k[k] != 1:
+            continue
+        g = gcd(prefix[i], suffix[i + 1])
+        if g > 1 and weights[k] % g:
+            return Prefilter(False, 'single_face_residue', None)
+
+
+def residue(f_k, weights, target):
+    # суммы подмножеств по модулю m: если S / 2 mod m недостижима,
+    # точной суммы тем более нет
+    for m in RESIDUE_MODULI:
+        full = (1 << m) - 1
+        reach = 1
+        for k, w in weights.items():
+            r = w % m
+            if not r:
+                continue
+            for _ in range(min(f_k[k], m - 1)):
+                shifted = ((reach << r) | (reach >> (m - r))) & full
+                if shifted | reach == reach:
+                    break
+                reach |= shifted
+        if not (reach >> (target % m)) & 1:
+            return Prefilter(False, f'residue_mod_{m}', None)
+
+
+def greedy_witness(f_k, weights, target):
+    # жадный набор от крупных граней к мелким; точное попадание — готовое разбиение
+    remaining = target
+    prime_counts = {}
+    for k in sorted(weights, reverse=True):
+        c = min(f_k[k], remaining // weights[k])
+        prime_counts[k] = c
+        remaining -= c * weights[k]
+    if remaining == 0:
+        return Prefilter(True, 'greedy', {k: prime_counts[k] for k in sorted(prime_counts)})
+
+
+RULES = [parity, dominant_face, common_divisor, single_face_residue, residue, greedy_witness]
+
+
+def prefilter(f_k):
+    """Проверка f_k правилами из RULES по порядку: Prefilter или None.
+
+    None значит, что ни одно правило не сработало и нужен полный поиск.
+    """
+    weights = _weights(f_k)
+    if not weights:
+        return None
+    total_sum = sum(f_k[k] * w for k, w in weights.items())
+    target = total_sum // 2 if total_sum % 2 == 0 else None
+    for rule in RULES:
+        decided = rule(f_k, weights, target)
+        if decided is not None:
+            return decided
+    return None
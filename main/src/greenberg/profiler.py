@@ -0,0 +1,99 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Замеры этапов проверки. Профилировщик включается на время блока with
+# profiling() в своём потоке; без него stage() и count() почти ничего не стоят
+# (одно обращение к threading.local), поэтому вызовы стоят прямо в конвейере.
+# Внутренние циклы (перебор, динамика) копят счётчики в локальных переменных
+# и сообщают их один раз в конце.
+
+_local = threading.local()
+_disabled = nullcontext()
+
+
+class Profiler:
+    """Время и число вызовов по этапам и счётчики событий"""
+
+    def __init__(self):
+        self.timings = {}  # этап -> секунды
+        self.calls = {}    # этап -> число входов
+        self.counters = {}  # событие -> количество
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def merge(self, other):
+        """Сложение замеров (например, по всем графам пакета)"""
+        for name, seconds in other['timings'].items():
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+        for name, calls in other['calls'].items():
+            self.calls[name] = self.calls.get(name, 0) + calls
+        for name, amount in other['counters'].items():
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def to_dict(self):
+        return {
+            'timings': {name: round(seconds, 9) for name, seconds in self.timings.items()},
+            'calls': dict(self.calls),
+            'counters': dict(self.counters),
+        }
+
+    def prometheus(self, prefix='greenberg'):
+        """Текстовый формат Prometheus: время и вызовы по этапам, счётчики событий"""
+        lines = [
+            f"# HELP {prefix}_stage_seconds_total Время этапов проверки, с",
+            f"# TYPE {prefix}_stage_seconds_total counter",
+        ]
+        lines += [f'{prefix}_stage_seconds_total{{stage="{name}"}} {seconds:.9f}'
+                  for name, seconds in sorted(self.timings.items())]
+        lines += [
+            f"# HELP {prefix}_stage_calls_total Число выполнений этапов",
+            f"# TYPE {prefix}_stage_calls_total counter",
+        ]
+        lines += [f'{prefix}_stage_calls_total{{stage="{name}"}} {calls}'
+                  for name, calls in sorted(self.calls.items())]
+        lines += [
+            f"# HELP {prefix}_events_total Счётчики конвейера проверки",
+            f"# TYPE {prefix}_events_total counter",
+        ]
+        lines += [f'{prefix}_events_total{{event="{name}"}} {amount}'
+                  for name, amount in sorted(self.counters.items())]
+        return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def profiling(profiler=None):
+    """Включает замеры в текущем потоке: with profiling() as profiler: ..."""
+    previous = getattr(_local, 'profiler', None)
+    _local.profiler = profiler if profiler is not None else Profiler()
+    try:
+        yield _local.profiler
+    finally:
+        _local.profiler = previous
+
+
+def current():
+    """Профилировщик текущего потока или None, если замеры выключены"""
+    return getattr(_local, 'profiler', None)
+
+
+def stage(name):
+    """Контекст замера этапа (ничего не делает, если замеры выключены)"""
+    profiler = getattr(_local, 'profiler', None)
+    return _disabled if profiler is None else profiler.stage(name)
+
+
+def count(name, amount=1):
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is not None:
+        profiler.count(name, amount)
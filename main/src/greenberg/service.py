@@ -0,0 +1,449 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import signal
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from .generators import random_cubic_planar
+from .graph_io import decode_graph6
+
+# Локальный сервис проверки: JSON-RPC 2.0 построчно (один JSON на строку) по
+# TCP на localhost или Unix-сокету. Запросы собираются в небольшие пачки и
+# уходят в заранее прогретый пул процессов; повторы отвечаются из кэша без
+# пула, одинаковые запросы в работе ждут один результат. Очередь ограничена:
+# при переполнении запрос сразу отклоняется (ошибка OVERLOADED), а каждое
+# соединение держит не больше max_inflight запросов — дальше сервер не
+# читает сокет, и клиент упирается в TCP.
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+OVERLOADED = -32001
+DEADLINE_EXCEEDED = -32002
+
+# вердикты, которые можно отдавать повторно (незавершённые проверки — нет)
+FINAL_VERDICTS = ('may_be_hamiltonian', 'not_hamiltonian', 'hamiltonian', 'nonplanar',
+                  'nonbiconnected')
+
+
+class ServiceError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _warm():
+    # первая проверка в процессе пула: импорт networkx и модулей проверки
+    from .cli import check_record
+    check_record(('warm', [], [('0', '1'), ('1', '2'), ('2', '0')]))
+    return os.getpid()
+
+
+def _check_batch(batch, cache_path):
+    from .cli import check_chunk
+    # одинаковые параметры — одна пачка check_chunk с общим поиском разбиений
+    rows, groups = [None] * len(batch), {}
+    for i, (record, *options) in enumerate(batch):
+        groups.setdefault(tuple(options), []).append(i)
+    for (time_budget, mode, exact, certificate), indices in groups.items():
+        checked = check_chunk([batch[i][0] for i in indices], time_budget, cache_path=cache_path,
+                              exact=exact, mode=mode, certificate=certificate)
+        for i, row in zip(indices, checked):
+            rows[i] = row
+    return rows
+
+
+def _record(params):
+    # (имя, вершины, рёбра) из параметров запроса: vertices/edges или graph6
+    if not isinstance(params, dict):
+        raise ServiceError(INVALID_PARAMS, "params должен быть объектом")
+    name = str(params.get('name', ''))
+    if 'graph6' in params:
+        try:
+            vertices, edges = decode_graph6(str(params['graph6']))
+        except ValueError as e:
+            raise ServiceError(INVALID_PARAMS, f"graph6: {e}")
+        return name, vertices, edges
+    try:
+        vertices = [str(v) for v in params.get('vertices', [])]
+        edges = [(str(u), str(v)) for u, v, *_ in params['edges']]
+    except (KeyError, TypeError, ValueError):
+        raise ServiceError(INVALID_PARAMS, "нужны edges (список пар) или graph6")
+    return name, vertices, edges
+
+
+class _Pending:
+    __slots__ = ('key', 'record', 'mode', 'exact', 'certificate', 'deadline', 'future')
+
+    def __init__(self, key, record, mode, exact, certificate, deadline, future):
+        self.key = key
+        self.record = record
+        self.mode = mode
+        self.exact = exact
+        self.certificate = certificate
+        self.deadline = deadline
+        self.future = future
+
+
+class CheckService:
+    """Проверка графов в пуле процессов с пачками, кэшем и ограничениями.
+
+    jobs — процессов в пуле, в работе не больше одной пачки на процесс;
+    пачка набирается до batch_size запросов, первый ждёт остальных не
+    дольше batch_window секунд (под нагрузкой пачки набираются сразу из
+    очереди). queue_size — сколько запросов может ждать пула.
+    deadline — лимит по умолчанию на запрос в секундах (в запросе —
+    deadline_ms). cache_path — файл ResultCache в процессах пула: он же
+    находит изоморфные повторы и переживает перезапуск сервиса.
+    """
+
+    def __init__(self, jobs=None, batch_size=16, batch_window=0.001, queue_size=1024,
+                 max_inflight=64, deadline=None, cache_size=10000, cache_path=None):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_inflight = max_inflight
+        self.deadline = deadline
+        self.cache_size = cache_size
+        self.cache_path = cache_path
+        self.counters = dict.fromkeys(('requests', 'cache_hits', 'coalesced', 'batches',
+                                       'batched', 'overloaded', 'expired'), 0)
+        self._queue_size = queue_size
+        self._queue = None
+        self._slots = None
+        self._cache = OrderedDict()  # ключ запроса -> строка результата
+        self._inflight = {}  # ключ запроса -> ожидающий запрос (_Pending)
+        self._pool = None
+        self._batcher = None
+        self._tasks = set()
+
+    async def start(self):
+        """Запуск пула процессов (все процессы прогреваются сразу) и сборщика пачек"""
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(self._queue_size)
+        self._slots = asyncio.Semaphore(self.jobs)
+        self._pool = ProcessPoolExecutor(self.jobs)
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _warm)
+                               for _ in range(self.jobs)))
+        self._batcher = asyncio.create_task(self._collect())
+
+    async def close(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+            await asyncio.gather(self._batcher, *self._tasks, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _key(record, mode, exact, certificate):
+        _, vertices, edges = record
+        data = json.dumps([sorted(vertices), sorted(sorted(edge) for edge in edges),
+                           mode, exact, certificate], separators=(',', ':'))
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+    async def check(self, params):
+        """Строка результата проверки, как у cli check; ошибки — ServiceError"""
+        self.counters['requests'] += 1
+        record = _record(params)
+        mode = params.get('mode', 'counts')
+        if mode not in ('counts', 'dual'):
+            raise ServiceError(INVALID_PARAMS, "mode: counts или dual")
+        exact = bool(params.get('exact', False))
+        certificate = bool(params.get('certificate', False))
+        try:
+            deadline_ms = float(params.get('deadline_ms') or 0)
+        except (TypeError, ValueError):
+            raise ServiceError(INVALID_PARAMS, "deadline_ms — число миллисекунд")
+        timeout = deadline_ms / 1000 if deadline_ms > 0 else self.deadline
+        deadline = time.monotonic() + timeout if timeout else None
+
+        key = self._key(record, mode, exact, certificate)
+        row = self._cache.get(key)
+        if row is not None:
+            self._cache.move_to_end(key)
+            self.counters['cache_hits'] += 1
+            return dict(row, name=record[0])
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            # тот же граф уже ждёт пула: ждём его результат, срок — наибольший
+            self.counters['coalesced'] += 1
+            if pending.deadline is not None:
+                pending.deadline = None if deadline is None else max(pending.deadline, deadline)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            pending = _Pending(key, record, mode, exact, certificate, deadline, future)
+            try:
+                self._queue.put_nowait(pending)
+            except asyncio.QueueFull:
+                self.counters['overloaded'] += 1
+                raise ServiceError(OVERLOADED, "очередь проверок переполнена")
+            self._inflight[key] = pending
+        try:
+            row = await asyncio.wait_for(asyncio.shield(pending.future), timeout)
+        except asyncio.TimeoutError:
+            if not pending.future.done():
+                self.counters['expired'] += 1
+            raise ServiceError(DEADLINE_EXCEEDED, "лимит времени запроса исчерпан")
+        return dict(row, name=record[0])
+
+    async def _collect(self):
+        # пачка набирается, когда освободился процесс пула: пока все заняты,
+        # запросы копятся в очереди и следующая пачка берёт их сразу
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            stop = loop.time() + self.batch_window
+            while len(batch) < self.batch_size:
+                if self._queue.empty():
+                    remaining = stop - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+            task = asyncio.create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch):
+        try:
+            now = time.monotonic()
+            live = []
+            for item in batch:
+                if item.deadline is not None and item.deadline <= now:
+                    # срок всех ожидающих истёк, считать незачем
+                    self.counters['expired'] += 1
+                    self._inflight.pop(item.key, None)
+                    item.future.set_exception(
+                        ServiceError(DEADLINE_EXCEEDED, "лимит времени запроса исчерпан"))
+                else:
+                    live.append(item)
+            if not live:
+                return
+            self.counters['batches'] += 1
+            self.counters['batched'] += len(live)
+            work = [(item.record, None if item.deadline is None else item.deadline - now,
+                     item.mode, item.exact, item.certificate) for item in live]
+            try:
+                rows = await asyncio.get_running_loop().run_in_executor(
+                    self._pool, _check_batch, work, self.cache_path)
+            except Exception as e:
+                rows = [{'name': item.record[0], 'error': f"{type(e).__name__}: {e}"}
+                        for item in live]
+            for item, row in zip(live, rows):
+                self._inflight.pop(item.key, None)
+                if row.get('greenberg') in FINAL_VERDICTS \
+                        and row.get('hamiltonian', True) != 'inconclusive':
+                    self._remember(item.key, row)
+                if not item.future.done():
+                    item.future.set_result(row)
+        finally:
+            self._slots.release()
+
+    def _remember(self, key, row):
+        self._cache[key] = row
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def stats(self):
+        return dict(self.counters, queued=self._queue.qsize() if self._queue else 0,
+                    cached=len(self._cache), jobs=self.jobs)
+
+    async def handle(self, message):
+        """Ответ на одно сообщение JSON-RPC (None для уведомления без id)"""
+        if not isinstance(message, dict) or message.get('jsonrpc') != '2.0' \
+                or not isinstance(message.get('method'), str):
+            return _error(None, INVALID_REQUEST, "ожидается запрос JSON-RPC 2.0")
+        request_id = message.get('id')
+        method = message['method']
+        try:
+            if method == 'check':
+                result = await self.check(message.get('params', {}))
+            elif method == 'stats':
+                result = self.stats()
+            elif method == 'ping':
+                result = 'pong'
+            else:
+                raise ServiceError(METHOD_NOT_FOUND, f"нет метода {method}")
+        except ServiceError as e:
+            return _error(request_id, e.code, e.message) if 'id' in message else None
+        except Exception as e:
+            return _error(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}") \
+                if 'id' in message else None
+        if 'id' not in message:
+            return None
+        return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+
+    async def serve_connection(self, reader, writer):
+        inflight = asyncio.Semaphore(self.max_inflight)
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(message):
+            try:
+                if message == []:
+                    response = _error(None, INVALID_REQUEST, "пустой пакет запросов")
+                elif isinstance(message, list):
+                    responses = [r for r in await asyncio.gather(*map(self.handle, message))
+                                 if r is not None]
+                    response = responses or None
+                else:
+                    response = await self.handle(message)
+                if response is not None:
+                    async with lock:
+                        writer.write(json.dumps(response, ensure_ascii=False).encode() + b'\n')
+                        await writer.drain()
+            finally:
+                inflight.release()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                # соединение не читается дальше, пока в работе max_inflight запросов
+                await inflight.acquire()
+                # null и другие не-объекты — верный JSON: на них handle ответит -32600
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    inflight.release()
+                    async with lock:
+                        writer.write(json.dumps(_error(None, PARSE_ERROR, "неверный JSON"),
+                                                ensure_ascii=False).encode() + b'\n')
+                    continue
+                task = asyncio.create_task(respond(message))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def _error(request_id, code, message):
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+
+# строки до 64 МиБ: большой граф приходит одной строкой
+STREAM_LIMIT = 64 * 1024 * 1024
+
+
+async def serve(service, host='127.0.0.1', port=8765, unix_path=None, ready=None):
+    await service.start()
+    if unix_path:
+        server = await asyncio.start_unix_server(service.serve_connection, unix_path,
+                                                 limit=STREAM_LIMIT)
+        where = unix_path
+    else:
+        server = await asyncio.start_server(service.serve_connection, host, port,
+                                            limit=STREAM_LIMIT)
+        where = f"{host}:{server.sockets[0].getsockname()[1]}"
+    print(f"Сервис проверки слушает {where}, процессов: {service.jobs}", file=sys.stderr,
+          flush=True)
+    if ready is not None:
+        ready.set()
+    # остановка по Ctrl+C и SIGTERM: пул завершается, Unix-сокет удаляется
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        await service.close()
+        if unix_path and os.path.exists(unix_path):
+            os.remove(unix_path)
+
+
+def run_serve(args):
+    service = CheckService(args.jobs, args.batch_size, args.batch_window / 1000, args.queue_size,
+                           args.max_inflight, args.deadline_ms / 1000 if args.deadline_ms else None,
+                           args.cache_size, args.cache)
+    asyncio.run(serve(service, args.host, args.port, args.unix))
+    return 0
+
+
+async def _open(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix, limit=STREAM_LIMIT)
+    return await asyncio.open_connection(args.host, args.port, limit=STREAM_LIMIT)
+
+
+async def _load(args):
+    # нагрузка: requests запросов в concurrency соединениях; графы — случайные
+    # кубические планарные на 36–76 вершинах (20–40 граней), distinct различных
+    rng = random.Random(args.seed)
+    graphs = []
+    for _ in range(args.distinct):
+        n, edges = random_cubic_planar(2 * rng.randint(18, 38), rng)
+        graphs.append({'vertices': [str(v) for v in range(n)],
+                       'edges': [[str(u), str(v)] for u, v in edges]})
+    latencies, errors = [], {}
+    counter = iter(range(args.requests))
+
+    async def client():
+        reader, writer = await _open(args)
+        try:
+            for i in counter:
+                params = dict(graphs[i % len(graphs)], name=str(i))
+                if args.deadline_ms:
+                    params['deadline_ms'] = args.deadline_ms
+                request = {'jsonrpc': '2.0', 'id': i, 'method': 'check', 'params': params}
+                start = time.perf_counter()
+                writer.write(json.dumps(request).encode() + b'\n')
+                await writer.drain()
+                response = json.loads(await reader.readline())
+                latencies.append(time.perf_counter() - start)
+                if 'error' in response:
+                    code = response['error']['code']
+                    errors[code] = errors.get(code, 0) + 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(q):
+        return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 3)
+
+    reader, writer = await _open(args)
+    writer.write(b'{"jsonrpc": "2.0", "id": 0, "method": "stats"}\n')
+    stats = json.loads(await reader.readline())['result']
+    writer.close()
+    return {
+        'requests': len(latencies),
+        'seconds': round(elapsed, 3),
+        'throughput': round(len(latencies) / elapsed, 1),
+        'p50_ms': percentile(0.5),
+        'p99_ms': percentile(0.99),
+        'max_ms': round(latencies[-1] * 1000, 3),
+        'errors': errors,
+        'server': stats,
+    }
+
+
+def run_load(args):
+    report = asyncio.run(_load(args))
+    print(json.dumps(report, ensure_ascii=False))
+    return 0
@@ -0,0 +1,328 @@
+import time
+from collections import namedtuple
+from itertools import combinations
+
+from . import profiler
+
+# Разбиение граней: f'_k по порядкам и сами грани f' и f''
+GreenbergPartition = namedtuple('GreenbergPartition', 'prime_counts f_prime f_double_prime')
+
+
+class SolverInterrupted(Exception):
+    """Поиск прерван: отмена пользователем или исчерпан лимит времени"""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason  # 'cancelled' или 'timeout'
+
+
+class SolverControl:
+    """Прогресс, отмена и лимит времени для долгой проверки.
+
+    Поиск вызывает step() по мере работы; GUI читает stage, done и total
+    из другого потока и может вызвать cancel().
+    """
+
+    def __init__(self, time_budget=None):
+        self.deadline = None if not time_budget else time.monotonic() + time_budget
+        self.stage = ''
+        self.done = 0
+        self.total = 0
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def start_stage(self, stage, total=0):
+        self.stage = stage
+        self.done = 0
+        self.total = total
+        self.step(0)
+
+    def step(self, amount=1):
+        self.done += amount
+        if self.cancelled:
+            raise SolverInterrupted('cancelled')
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise SolverInterrupted('timeout')
+
+
+def face_size_counts(faces):
+    """Подсчёт f_k — количества граней порядка k (учитываются только k >= 3)"""
+    f_k = {}
+    for face in faces:
+        k = len(face)
+        if k >= 3:
+            f_k[k] = f_k.get(k, 0) + 1
+    return f_k
+
+
+def _reachable_layers(sizes, f_k, target, control=None):
+    # layers[i] — битовая маска сумм, достижимых гранями первых i порядков
+    mask = (1 << (target + 1)) - 1
+    layers = [1]
+    for k in sizes:
+        weight = k - 2
+        reach = layers[-1]
+        # f_k одинаковых граней раскладываем на группы 1, 2, 4, ... (0/1-предметы)
+        count, chunk = f_k[k], 1
+        while count > 0:
+            take = min(chunk, count)
+            reach = (reach | (reach << (take * weight))) & mask
+            count -= take
+            chunk *= 2
+        layers.append(reach)
+        if control is not None:
+            control.step(target + 1)
+    profiler.count('dp_cells', len(sizes) * (target + 1))
+    return layers
+
+
+def iter_partition_counts(f_k, control=None):
+    """Ленивый перебор всех различных разбиений по теореме Гринберга.
+
+    Выдаёт словари {k: f'_k} с sum f'_k * (k - 2) = S / 2. Разбиение и его
+    дополнение (f'' вместо f') считаются одним и выдаются один раз. Перебор
+    идёт только по достижимым суммам, поэтому тупиковых ветвей нет.
+    """
+    total_sum = sum(count * (k - 2) for k, count in f_k.items())
+    if total_sum == 0 or total_sum % 2 != 0:
+        return
+    target = total_sum // 2
+
+    sizes = sorted(f_k)
+    if control is not None:
+        control.start_stage('solver', len(sizes) * (target + 1))
+    layers = _reachable_layers(sizes, f_k, target, control)
+    if not (layers[-1] >> target) & 1:
+        return
+
+    chosen = {}
+
+    def search(i, remaining, tied):
+        # tied — пока выбранное совпадает со своим дополнением, берём f'_k <= f_k / 2
+        if i == 0:
+            yield {k: chosen[k] for k in sizes}
+            return
+        k = sizes[i - 1]
+        weight, count, reach = k - 2, f_k[k], layers[i - 1]
+        for c in range(min(count, remaining // weight) + 1):
+            if tied and 2 * c > count:
+                break
+            rest = remaining - c * weight
+            if (reach >> rest) & 1:
+                if control is not None:
+                    control.step()
+                chosen[k] = c
+                yield from search(i - 1, rest, tied and 2 * c == count)
+
+    yield from search(len(sizes), target, True)
+
+
+def greenberg_partition_counts(f_k, control=None):
+    """Первое разбиение по теореме Гринберга: словарь {k: f'_k} или None.
+
+    Динамика по f_k работает за O(F * S) вместо перебора 2^F подмножеств.
+    """
+    return next(iter_partition_counts(f_k, control), None)
+
+
+def _bytes(mask):
+    # проверка бита длинного числа сдвигом стоит O(S); по байтам — O(1)
+    return mask.to_bytes((mask.bit_length() + 8) // 8, 'little')
+
+
+def _reconstruct(sizes, f_k, layers, target):
+    # обратный ход по слоям: сколько граней каждого порядка дают сумму target
+    chosen, remaining = {}, target
+    for i in range(len(sizes), 0, -1):
+        k = sizes[i - 1]
+        weight, reach = k - 2, _bytes(layers[i - 1])
+        for c in range(min(f_k[k], remaining // weight) + 1):
+            rest = remaining - c * weight
+            if rest < 8 * len(reach) and (reach[rest >> 3] >> (rest & 7)) & 1:
+                chosen[k] = c
+                remaining = rest
+                break
+    return chosen
+
+
+# Пакетом решаются строки с целью меньше 2^BATCH_TARGET_BITS, не меньше
+# BATCH_MIN_ROWS строк одной длины: на длинных строках битовая маска одного
+# графа (64 суммы за операцию) быстрее, на малых пачках — накладные расходы NumPy
+BATCH_TARGET_BITS = 8
+BATCH_MIN_ROWS = 32
+# «нет достижимой суммы» для _last_reachable: разность с любой позицией больше любой f_k * w
+_NONE = -(1 << 14)
+
+
+def _last_reachable(np, reach, weight, positions):
+    # last[r, s] — наибольшая достижимая сумма p <= s с p = s (mod weight)
+    # (или большое отрицательное число): накопленный максимум по блокам ширины weight
+    n, width = reach.shape
+    blocks = -(-width // weight)
+    last = np.full((n, blocks * weight), _NONE, dtype=np.int16)
+    last[:, :width] = np.where(reach, positions, _NONE)
+    np.maximum.accumulate(last.reshape(n, blocks, weight), axis=1,
+                          out=last.reshape(n, blocks, weight))
+    return last[:, :width]
+
+
+def _batch_group(np, rows, witness):
+    # rows — [(f_k, target)]; reach[r, s] — сумма s достижима в строке r.
+    # До f_k граней веса w сумма s достижима, если ближайшая достижимая
+    # сумма того же остатка по модулю w не дальше f_k * w: одна и та же
+    # пара операций NumPy на порядок грани для всех строк и любых f_k
+    n = len(rows)
+    targets = np.array([target for _, target in rows])
+    sizes = sorted({k for f_k, _ in rows for k in f_k})
+    index = {k: j for j, k in enumerate(sizes)}
+    cells = [(index[k], r, count) for r, (f_k, _) in enumerate(rows) for k, count in f_k.items()]
+    where, columns, values = zip(*cells)
+    counts = np.zeros((len(sizes), n), dtype=np.int16)
+    counts[where, columns] = values
+    width = int(targets.max()) + 1
+    positions = np.arange(width, dtype=np.int16)
+    reach = np.zeros((n, width), dtype=bool)
+    reach[:, 0] = True
+    lasts = []
+    for j, k in enumerate(sizes):
+        weight = k - 2
+        last = _last_reachable(np, reach, weight, positions)
+        reach = positions - last <= (counts[j] * weight)[:, None]
+        if witness:
+            lasts.append(last)
+    profiler.count('dp_cells', len(sizes) * n * width)
+    rows_all = np.arange(n)
+    found = reach[rows_all, targets]
+    if not witness:
+        return [True if ok else None for ok in found.tolist()]
+
+    # обратный ход сразу по всем строкам: наименьшее f'_k, после которого
+    # остаток достижим, — то же разбиение, что первым выдаёт
+    # iter_partition_counts (оно же не больше f_k / 2, пока выбор совпадает
+    # с дополнением)
+    remaining = np.where(found, targets, 0)
+    chosen = np.zeros_like(counts)
+    for j in range(len(sizes) - 1, -1, -1):
+        weight = sizes[j] - 2
+        pick = (remaining - lasts[j][rows_all, remaining]) // weight
+        chosen[j] = pick
+        remaining -= pick * weight
+    return [{k: picks[index[k]] for k in sorted(f_k)} if ok else None
+            for (f_k, _), ok, picks in zip(rows, found.tolist(), chosen.T.tolist())]
+
+
+def batch_partition_counts(histograms, witness=True):
+    """Первое разбиение для каждого f_k из списка: то же, что greenberg_partition_counts.
+
+    Достижимость сумм для всей пачки считается в массивах NumPy, по
+    несколько операций на порядок грани вместо цикла Python на каждый граф;
+    строки группируются по длине цели, чтобы короткие не расширялись до
+    самой длинной. При witness=False вместо f'_k возвращается True (только
+    факт существования разбиения). Без NumPy — обычная динамика по каждому f_k.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    results = [None] * len(histograms)
+    groups = {}
+    for i, f_k in enumerate(histograms):
+        total_sum = sum(count * (k - 2) for k, count in f_k.items())
+        if total_sum == 0 or total_sum % 2 != 0:
+            continue
+        target = total_sum // 2
+        groups.setdefault(target.bit_length(), []).append((i, f_k, target))
+    for length, group in groups.items():
+        if np is None or length > BATCH_TARGET_BITS or len(group) < BATCH_MIN_ROWS:
+            for i, f_k, _ in group:
+                prime_counts = greenberg_partition_counts(f_k)
+                results[i] = prime_counts if witness or prime_counts is None else True
+            continue
+        found = _batch_group(np, [(f_k, target) for _, f_k, target in group], witness)
+        for (i, _, _), prime_counts in zip(group, found):
+            results[i] = prime_counts
+    return results
+
+
+class IncrementalSubsetSum:
+    """Число наборов граней с каждой суммой (k - 2) с добавлением и удалением граней.
+
+    ways[s] — сколько подмножеств граней дают сумму s (точные целые).
+    Добавление грани веса w умножает многочлен на (1 + x^w), удаление — делит
+    на него; обе операции за O(S), без пересчёта с нуля. Заодно хранится f_k.
+    """
+
+    def __init__(self, sizes=()):
+        self.ways = [1]
+        self.f_k = {}
+        for k in sizes:
+            self.add(k)
+
+    def add(self, k):
+        if k < 3:
+            return
+        w = k - 2
+        ways = self.ways
+        ways.extend([0] * w)
+        for s in range(len(ways) - 1, w - 1, -1):
+            ways[s] += ways[s - w]
+        self.f_k[k] = self.f_k.get(k, 0) + 1
+
+    def remove(self, k):
+        if k < 3:
+            return
+        w = k - 2
+        ways = self.ways
+        for s in range(w, len(ways)):
+            ways[s] -= ways[s - w]
+        del ways[-w:]
+        self.f_k[k] -= 1
+        if not self.f_k[k]:
+            del self.f_k[k]
+
+    def partitions(self):
+        """Число упорядоченных разбиений (f', f'') с равными суммами; 0 — разбиения нет"""
+        total = len(self.ways) - 1
+        if total == 0 or total % 2:
+            return 0
+        return self.ways[total // 2]
+
+
+def split_faces(faces, prime_counts):
+    """Раскладывает конкретные грани по f'_k: возвращает (f', f'')"""
+    remaining = dict(prime_counts)
+    f_prime, f_double_prime = [], []
+    for face in faces:
+        k = len(face)
+        if remaining.get(k, 0) > 0:
+            remaining[k] -= 1
+            f_prime.append(face)
+        else:
+            f_double_prime.append(face)
+    return f_prime, f_double_prime
+
+
+def greenberg_partition_bruteforce(faces):
+    """Эталонный перебор всех подмножеств граней (только для проверки динамики).
+
+    Возвращает первое найденное разбиение (f', f'') или None.
+    """
+    n = len(faces)
+    weights = [len(face) - 2 for face in faces]
+    total_sum = sum(w for w in weights if w > 0)
+    if total_sum == 0 or total_sum % 2 != 0:
+        return None
+    target = total_sum // 2
+
+    # перебираем все возможные размеры подмножеств (от 1 до n-1)
+    for r in range(1, n):
+        for subset_indices in combinations(range(n), r):
+            if sum(weights[i] for i in subset_indices if weights[i] > 0) == target:
+                chosen = set(subset_indices)
+                f_prime = [faces[i] for i in subset_indices]
+                f_double_prime = [faces[i] for i in range(n) if i not in chosen]
+                return f_prime, f_double_prime
+    return None
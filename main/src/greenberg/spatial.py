@@ -0,0 +1,187 @@
+from math import floor
+
+
+def _segment_hits_rect(x1, y1, x2, y2, left, top, right, bottom):
+    # отсечение Лианга-Барски: есть ли у отрезка общая точка с прямоугольником
+    t0, t1 = 0.0, 1.0
+    dx, dy = x2 - x1, y2 - y1
+    for p, q in ((-dx, x1 - left), (dx, right - x1), (-dy, y1 - top), (dy, bottom - y1)):
+        if p == 0:
+            if q < 0:
+                return False
+            continue
+        t = q / p
+        if p < 0:
+            t0 = max(t0, t)
+        else:
+            t1 = min(t1, t)
+        if t0 > t1:
+            return False
+    return True
+
+
+def _distance2_to_segment(x, y, x1, y1, x2, y2):
+    dx, dy = x2 - x1, y2 - y1
+    length2 = dx * dx + dy * dy
+    t = 0.0 if length2 == 0 else max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / length2))
+    px, py = x1 + t * dx - x, y1 + t * dy - y
+    return px * px + py * py
+
+
+class SpatialIndex:
+    """Равномерная сетка над вершинами и рёбрами рисунка графа.
+
+    Вершина лежит в одной клетке, ребро — во всех клетках, которые пересекает
+    его отрезок. Ребро задаётся двумя вершинами индекса и двигается вместе
+    с ними, так что перетаскивание вершины обновляет только её клетку и
+    клетки инцидентных рёбер. Поиск под курсором смотрит несколько соседних
+    клеток, запрос прямоугольника — только клетки внутри него.
+    """
+
+    def __init__(self, cell=60):
+        self.cell = cell
+        self.points = {}        # вершина -> (x, y)
+        self.point_cell = {}    # вершина -> клетка
+        self.point_cells = {}   # клетка -> множество вершин
+        self.segments = {}      # ребро -> (вершина, вершина)
+        self.segment_cell = {}  # ребро -> список клеток
+        self.segment_cells = {}  # клетка -> множество рёбер
+        self.incident = {}      # вершина -> множество рёбер
+
+    def _cell(self, x, y):
+        return floor(x / self.cell), floor(y / self.cell)
+
+    def _cells_along(self, x1, y1, x2, y2):
+        # по столбцам сетки: в каждом столбце отрезок занимает отрезок клеток по y
+        c = self.cell
+        if x1 > x2:
+            x1, y1, x2, y2 = x2, y2, x1, y1
+        cells = []
+        for cx in range(floor(x1 / c), floor(x2 / c) + 1):
+            if x1 == x2:
+                ya, yb = y1, y2
+            else:
+                slope = (y2 - y1) / (x2 - x1)
+                ya = y1 + slope * (max(x1, cx * c) - x1)
+                yb = y1 + slope * (min(x2, (cx + 1) * c) - x1)
+            for cy in range(floor(min(ya, yb) / c), floor(max(ya, yb) / c) + 1):
+                cells.append((cx, cy))
+        return cells
+
+    def add_point(self, key, x, y):
+        if key in self.points:
+            self.move_point(key, x, y)
+            return
+        self.points[key] = (x, y)
+        cell = self._cell(x, y)
+        self.point_cell[key] = cell
+        self.point_cells.setdefault(cell, set()).add(key)
+        self.incident.setdefault(key, set())
+
+    def move_point(self, key, x, y):
+        self.points[key] = (x, y)
+        cell = self._cell(x, y)
+        old = self.point_cell[key]
+        if cell != old:
+            self._discard(self.point_cells, old, key)
+            self.point_cell[key] = cell
+            self.point_cells.setdefault(cell, set()).add(key)
+        for segment in self.incident[key]:
+            self._place_segment(segment)
+
+    def remove_point(self, key):
+        """Удаление вершины вместе с инцидентными рёбрами"""
+        for segment in list(self.incident.get(key, ())):
+            self.remove_segment(segment)
+        if key in self.points:
+            self._discard(self.point_cells, self.point_cell.pop(key), key)
+            del self.points[key]
+            del self.incident[key]
+
+    def add_segment(self, key, a, b):
+        """Ребро key между уже добавленными вершинами a и b"""
+        if key in self.segments:
+            self.remove_segment(key)
+        self.segments[key] = (a, b)
+        self.incident[a].add(key)
+        self.incident[b].add(key)
+        self.segment_cell[key] = []
+        self._place_segment(key)
+
+    def remove_segment(self, key):
+        if key not in self.segments:
+            return
+        for cell in self.segment_cell.pop(key):
+            self._discard(self.segment_cells, cell, key)
+        a, b = self.segments.pop(key)
+        self.incident[a].discard(key)
+        self.incident[b].discard(key)
+
+    def _place_segment(self, key):
+        for cell in self.segment_cell[key]:
+            self._discard(self.segment_cells, cell, key)
+        a, b = self.segments[key]
+        cells = self._cells_along(*self.points[a], *self.points[b])
+        self.segment_cell[key] = cells
+        for cell in cells:
+            self.segment_cells.setdefault(cell, set()).add(key)
+
+    @staticmethod
+    def _discard(cells, cell, key):
+        bucket = cells[cell]
+        bucket.discard(key)
+        if not bucket:
+            del cells[cell]
+
+    def _gather(self, cells, left, top, right, bottom):
+        # клетки прямоугольника; если их больше, чем занятых, — обходим занятые
+        cx1, cy1 = self._cell(left, top)
+        cx2, cy2 = self._cell(right, bottom)
+        found = set()
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > len(cells):
+            for (cx, cy), bucket in cells.items():
+                if cx1 <= cx <= cx2 and cy1 <= cy <= cy2:
+                    found |= bucket
+            return found
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found |= bucket
+        return found
+
+    def point_at(self, x, y, radius):
+        """Ближайшая вершина не дальше radius или None"""
+        best, best_d2 = None, radius * radius
+        for key in self._gather(self.point_cells, x - radius, y - radius, x + radius, y + radius):
+            px, py = self.points[key]
+            d2 = (px - x) ** 2 + (py - y) ** 2
+            if d2 <= best_d2:
+                best, best_d2 = key, d2
+        return best
+
+    def segment_at(self, x, y, tolerance):
+        """Ближайшее ребро не дальше tolerance или None"""
+        best, best_d2 = None, tolerance * tolerance
+        for key in self._gather(self.segment_cells, x - tolerance, y - tolerance,
+                                x + tolerance, y + tolerance):
+            a, b = self.segments[key]
+            d2 = _distance2_to_segment(x, y, *self.points[a], *self.points[b])
+            if d2 <= best_d2:
+                best, best_d2 = key, d2
+        return best
+
+    def points_in_rect(self, left, top, right, bottom):
+        points = self.points
+        return [key for key in self._gather(self.point_cells, left, top, right, bottom)
+                if left <= points[key][0] <= right and top <= points[key][1] <= bottom]
+
+    def segments_in_rect(self, left, top, right, bottom):
+        """Рёбра, отрезки которых задевают прямоугольник"""
+        points = self.points
+        found = []
+        for key in self._gather(self.segment_cells, left, top, right, bottom):
+            a, b = self.segments[key]
+            if _segment_hits_rect(*points[a], *points[b], left, top, right, bottom):
+                found.append(key)
+        return found
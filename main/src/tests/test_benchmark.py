@@ -0,0 +1,7 @@
+from greenberg.benchmark import STAGES, bench_case
+
+
+def test_stages_are_timed_separately():
+    row = bench_case('cubic', 16, 3, 0)
+    assert row['prefilter_s'] > 0 and all(row[name] >= 0 for name in STAGES)
+    assert abs(row['total_s'] - sum(row[name] for name in STAGES)) < 1e-5
@@ -0,0 +1,84 @@
+import sqlite3
+import warnings
+
+from greenberg.benchmark import build, prism
+from greenberg.cache import RESULT_CACHE_VERSION, ResultCache, SignatureCache, edge_digest
+
+
+def test_signature_cache_lru():
+    cache = SignatureCache(maxsize=2)
+    assert cache.get({5: 2}) == (False, None)
+    cache.put({5: 2}, {5: 1})
+    cache.put({3: 1, 5: 1}, None)  # «разбиения нет» — тоже ответ
+    assert cache.get({5: 2}) == (True, {5: 1})
+    assert cache.get({5: 1, 3: 1}) == (True, None)
+    cache.put({4: 2}, {4: 1})  # вытесняет {5: 2}: к нему обращались раньше
+    assert {5: 2} not in cache and {3: 1, 5: 1} in cache and {4: 2} in cache
+    assert cache.stats() == {'size': 2, 'hits': 2, 'misses': 1}
+
+
+def checked(n, edges, cache):
+    graph = build(n, edges)
+    mutable_params = []
+    result = graph.greenberg_condition(mutable_params, cache=cache)
+    return graph, result, mutable_params
+
+
+def test_result_cache_exact_and_isomorphic(tmp_path):
+    cache = ResultCache(str(tmp_path / 'results.sqlite'))
+    n, edges = prism(12, None)
+    graph, result, partition = checked(n, edges, cache)
+    assert cache.get(graph) == (result, partition)
+
+    # та же призма с другими метками: ответ по изоморфизму, грани в новых метках
+    shift = {v: (v + 5) % n for v in range(n)}
+    relabeled = build(n, [(shift[u], shift[v]) for u, v in edges])
+    cached_result, cached_partition = cache.get(relabeled)
+    assert cached_result == result
+    vertices = set(relabeled.get_vertices())
+    assert all(set(face) <= vertices for part in cached_partition for face in part)
+    assert cache.stats()['exact_hits'] == 1 and cache.stats()['isomorphic_hits'] == 1
+
+    # незавершённые проверки не сохраняются
+    other = build(4, [(0, 1), (1, 2), (2, 3), (3, 0), (0, 2)])
+    cache.put(other, 'inconclusive', [])
+    assert cache.get(other) is None
+    cache.close()
+
+
+def test_result_cache_ignores_other_versions(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+    cache = ResultCache(path)
+    graph, _, _ = checked(*prism(8, None), cache)
+    cache._conn.execute('UPDATE results SET version = ?', (RESULT_CACHE_VERSION - 1,))
+    cache._conn.commit()
+    assert cache.get(graph) is None
+    cache.close()
+
+
+def test_result_cache_migrates_old_schema(tmp_path):
+    # файл без столбца version: его записи не выдаются, новые пишутся с версией
+    path = str(tmp_path / 'old.sqlite')
+    graph = build(*prism(8, None))
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE results (key TEXT PRIMARY KEY, wl TEXT, vertices INTEGER,'
+                 ' edges INTEGER, edge_list TEXT, verdict TEXT, partition TEXT, used INTEGER)')
+    conn.execute('INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                 (edge_digest(graph), '', 8, 12, '[[], []]', 'false', '[]', 1))
+    conn.commit()
+    conn.close()
+
+    cache = ResultCache(path)
+    assert cache.get(graph) is None
+    _, result, partition = checked(*prism(8, None), cache)
+    assert cache.get(graph) == (result, partition)
+    cache.close()
+
+
+def test_wl_warning_filter_is_local():
+    # предупреждение networkx глушится только вокруг вызова хеша, а не для всего процесса
+    before = list(warnings.filters)
+    ResultCache._wl_hash(build(*prism(8, None)))
+    assert warnings.filters == before
+    assert not any(f[1] is not None and f[1].pattern.startswith('The hashes produced')
+                   for f in warnings.filters)
@@ -0,0 +1,100 @@
+import json
+import random
+
+import pytest
+
+from greenberg.benchmark import GRINBERG46_EDGES, build, prism, tutte, wheel
+from greenberg.certificate import certificate_status, make_certificate
+from greenberg.cli import main
+from greenberg.generators import random_cubic_planar, random_triangulation
+
+
+def certify(n, edges, mode='counts'):
+    graph = build(n, edges)
+    mutable_params = []
+    result = graph.greenberg_condition(mutable_params, mode=mode)
+    certificate = make_certificate(graph, result, mutable_params, mode)
+    # сертификат уходит в JSON и читается обратно, как у check --certificate
+    return result, json.loads(json.dumps(certificate))
+
+
+def complete(n):
+    return n, [(u, v) for u in range(n) for v in range(u + 1, n)]
+
+
+CASES = {
+    'K1': (1, []),
+    'K2': (2, [(0, 1)]),
+    'path': (3, [(0, 1), (1, 2)]),
+    'K4': complete(4),
+    'K5': complete(5),
+    'K33': (6, [(u, v) for u in range(3) for v in range(3, 6)]),
+    'prism': prism(12, None),
+    'wheel': wheel(9, None),
+    'grinberg46': (46, GRINBERG46_EDGES),
+}
+
+
+@pytest.mark.parametrize('name', sorted(CASES))
+def test_certificate_round_trip(name):
+    _, certificate = certify(*CASES[name])
+    assert certificate_status(certificate) == ('valid', [])
+
+
+def test_certificate_dual_mode():
+    result, certificate = certify(*prism(12, None), mode='dual')
+    assert result is True and certificate['verdict'] == 'hamiltonian'
+    assert certificate_status(certificate) == ('valid', [])
+
+
+def test_dual_search_refutation_is_unverifiable():
+    # f_k графа Татта делится пополам, разложение его не опровергает:
+    # остаётся перебор деревьев граней без короткого свидетеля
+    result, certificate = certify(*tutte(None, None), mode='dual')
+    assert result is False and certificate['proof'] == {'rule': 'dual_search'}
+    assert certificate_status(certificate)[0] == 'unverifiable'
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_graph_certificates(seed):
+    rng = random.Random(seed)
+    for n, edges in (random_triangulation(20, rng), random_cubic_planar(20, rng)):
+        _, certificate = certify(n, edges)
+        assert certificate_status(certificate) == ('valid', [])
+
+
+def test_tampered_certificates_are_invalid():
+    _, certificate = certify(*prism(12, None))
+    broken = json.loads(json.dumps(certificate))
+    broken['partition'] = broken['partition'][1:]
+    assert certificate_status(broken)[0] == 'invalid'
+
+    broken = json.loads(json.dumps(certificate))
+    broken['f_k'] = {k: c + 1 for k, c in broken['f_k'].items()}
+    assert certificate_status(broken)[0] == 'invalid'
+
+    _, certificate = certify(*CASES['grinberg46'])
+    broken = json.loads(json.dumps(certificate))
+    broken['verdict'] = 'may_be_hamiltonian'
+    assert certificate_status(broken)[0] == 'invalid'
+
+
+def test_verify_command_rows(tmp_path):
+    _, certificate = certify(*prism(12, None))
+    rows = [
+        {'name': 'bare', **certificate},
+        {'name': 'checked', 'certificate': certificate},
+        {'name': 'no-certificate', 'greenberg': 'may_be_hamiltonian'},
+        {'name': 'error', 'error': "ожидалось два конца ребра"},
+    ]
+    source = tmp_path / 'rows.jsonl'
+    source.write_text(''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows),
+                      encoding='utf-8')
+    output = tmp_path / 'verified.jsonl'
+    assert main(['verify', str(source), '-o', str(output)]) == 1
+    verified = {row['name']: row
+                for row in map(json.loads, output.read_text('utf-8').splitlines())}
+    assert verified['bare']['valid'] is True and verified['checked']['valid'] is True
+    assert verified['no-certificate']['valid'] is False
+    assert 'версия' not in verified['no-certificate']['errors'][0]
+    assert verified['error']['errors'] == ["ожидалось два конца ребра"]
@@ -0,0 +1,138 @@
+import random
+from itertools import combinations
+
+import networkx as nx
+import pytest
+
+from greenberg.benchmark import build
+from greenberg.decomposition import Decomposition
+from greenberg.enumeration import enumeration_options, graph_edges, iter_planar_graphs
+from greenberg.generators import random_edges, random_planar_biconnected
+from greenberg.hamiltonian import held_karp
+
+
+def adjacency(n, edges):
+    adj = [0] * n
+    for u, v in edges:
+        adj[u] |= 1 << v
+        adj[v] |= 1 << u
+    return adj
+
+
+def biconnected_graphs(seed):
+    # планарные (с разной долей удалённых рёбер — больше пар разделяющих
+    # вершин) и непланарные двусвязные графы
+    rng = random.Random(seed)
+    graphs = []
+    for deletion in (0.2, 0.5, 0.9):
+        graphs += [random_planar_biconnected(rng.randint(5, 30), deletion, rng)
+                   for _ in range(10)]
+    while len(graphs) < 45:
+        n, edges = random_edges(rng.randint(5, 16), rng.randint(8, 30), rng)
+        if nx.is_biconnected(nx.Graph(edges)) and len({v for e in edges for v in e}) == n:
+            graphs.append((n, edges))
+    return graphs
+
+
+def pieces_without(n, edges, removed):
+    rest = nx.Graph()
+    rest.add_nodes_from(v for v in range(n) if v not in removed)
+    rest.add_edges_from((u, v) for u, v in edges if u not in removed and v not in removed)
+    return list(nx.connected_components(rest))
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_spqr_tree_structure(seed):
+    for n, edges in biconnected_graphs(seed):
+        decomposition = Decomposition(range(n), edges)
+        assert decomposition.is_biconnected()
+        tree = decomposition.tree()
+        # рёбра дерева — рёбра блока в его порядке, а блок один на весь граф
+        assert sorted(decomposition.blocks[0]) == list(range(len(edges)))
+        assert [sorted(end) for end in tree.ends[:tree.real]] == \
+            [sorted(edges[e]) for e in decomposition.blocks[0]]
+
+        # каждое ребро графа — ровно в одном узле, виртуальное — ровно в двух
+        seen = {}
+        for node, component in enumerate(tree.nodes):
+            for e in component.edges:
+                seen.setdefault(e, []).append(node)
+        assert sorted(e for e in seen if e < tree.real) == list(range(tree.real))
+        assert all(len(nodes) == 1 for e, nodes in seen.items() if e < tree.real)
+        virtual = {e: nodes for e, nodes in seen.items() if e >= tree.real}
+        assert all(len(nodes) == 2 for nodes in virtual.values())
+
+        # виртуальные рёбра соединяют узлы в дерево; соседние узлы S и P не одного типа
+        links = nx.Graph()
+        links.add_nodes_from(range(len(tree.nodes)))
+        links.add_edges_from(virtual.values())
+        assert nx.is_tree(links)
+        for a, b in virtual.values():
+            assert tree.nodes[a].kind != tree.nodes[b].kind or tree.nodes[a].kind == 'R'
+
+        # склейка скелетов по виртуальным рёбрам возвращает исходный граф
+        rebuilt = sorted(tuple(sorted(tree.ends[e])) for e in seen if e < tree.real)
+        assert rebuilt == sorted(tuple(sorted(edge)) for edge in edges)
+
+        for node, component in enumerate(tree.nodes):
+            ends = [tree.ends[e] for e in component.edges]
+            if component.kind == 'P':
+                assert len(ends) >= 3 and len({frozenset(end) for end in ends}) == 1
+            elif component.kind == 'S':
+                cycle = nx.MultiGraph(ends)
+                assert len(ends) >= 3 and nx.is_connected(cycle)
+                assert all(d == 2 for _, d in cycle.degree())
+            else:
+                skeleton = nx.Graph(ends)
+                assert skeleton.number_of_edges() == len(ends)  # без кратных рёбер
+                assert len(skeleton) >= 4 and nx.node_connectivity(skeleton) >= 3
+
+        assert decomposition.is_triconnected() == (nx.node_connectivity(nx.Graph(edges)) >= 3)
+
+
+def small_planar_biconnected():
+    # все двусвязные планарные графы на 5-7 вершинах (с точностью до изоморфизма)
+    for n in range(5, 8):
+        for adj in iter_planar_graphs(n, enumeration_options(connectivity=2)):
+            yield n, graph_edges(adj)
+
+
+def test_separation_pairs_and_obstructions_are_sound():
+    rules = set()
+    for n, edges in small_planar_biconnected():
+        graph = build(n, edges)
+        if not graph.is_biconnected():
+            continue
+        ids = {v: int(graph.core.labels[v]) for v in graph.core.vertices()}
+        hamiltonian = held_karp(n, adjacency(n, edges)) is not None
+
+        # пара из разложения разделяет граф на три части и больше, и других таких нет
+        wide = [pair for pair in combinations(range(n), 2)
+                if len(pieces_without(n, edges, set(pair))) >= 3]
+        pair = graph.decomposition().separation_pair()
+        if pair is None:
+            assert not wide
+        else:
+            assert len(pieces_without(n, edges, {ids[v] for v in pair})) >= 3
+
+        obstruction = graph.obstruction()
+        if obstruction is not None:
+            rules.add(obstruction.rule)
+            assert not hamiltonian, edges
+            separator = {ids[v] for v in obstruction.separator}
+            pieces = pieces_without(n, edges, separator)
+            if obstruction.rule == 'separation_pair':
+                assert len(separator) == 2 and len(pieces) >= 3
+            else:
+                # каждая часть примыкает ровно к паре вершин из attachments,
+                # а скелет с частями-вершинами не проходит теорему Гринберга
+                attached = sorted(sorted(ids[v] for v in pair)
+                                  for pair in obstruction.attachments)
+                neighbors = nx.Graph(edges)
+                touched = sorted(sorted({w for v in piece for w in neighbors[v]} & separator)
+                                 for piece in pieces)
+                assert touched == attached
+                assert obstruction.skeleton.greenberg_condition([]) is False
+        if graph.greenberg_condition([]) is False:
+            assert not hamiltonian, edges
+    assert rules == {'separation_pair', 'component'}
@@ -0,0 +1,80 @@
+import random
+from itertools import combinations
+
+import pytest
+
+from greenberg.benchmark import build, prism
+from greenberg.dual import _DualSearch, boundary_cycle, dual_prefixes, iter_dual_partitions
+from greenberg.generators import random_cubic_planar
+
+
+def faces_of(n, edges):
+    return build(n, edges).analysis().face_ids
+
+
+def exhaustive(faces):
+    # все наборы граней с гранью 0, граница которых — гамильтонов цикл
+    vertices = {v for face in faces for v in face}
+    found = set()
+    for r in range(len(faces)):
+        for rest in combinations(range(1, len(faces)), r):
+            inside = (0, *rest)
+            count = {}
+            for i in inside:
+                face = faces[i]
+                for a, b in zip(face, face[1:] + face[:1]):
+                    key = (a, b) if a <= b else (b, a)
+                    count[key] = count.get(key, 0) + 1
+            border = [key for key, c in count.items() if c == 1]
+            degree = {}
+            for a, b in border:
+                degree[a] = degree.get(a, 0) + 1
+                degree[b] = degree.get(b, 0) + 1
+            if set(degree) != vertices or any(d != 2 for d in degree.values()):
+                continue
+            if len(boundary_cycle([faces[i] for i in inside])) == len(vertices):
+                found.add(inside)
+    return found
+
+
+def small_graphs():
+    rng = random.Random(1)
+    # K2,3 двусвязен, но негамильтонов: решений нет
+    graphs = [(5, [(u, v) for u in (0, 1) for v in (2, 3, 4)]), prism(6, None), prism(10, None)]
+    graphs += [random_cubic_planar(n, rng) for n in (8, 10, 12, 14) for _ in range(3)]
+    return [faces_of(n, edges) for n, edges in graphs]
+
+
+@pytest.mark.parametrize('faces', small_graphs())
+def test_dual_search_matches_exhaustive(faces):
+    listed = [tuple(inside) for inside in iter_dual_partitions(faces)]
+    assert len(listed) == len(set(listed))
+    assert set(listed) == exhaustive(faces)
+
+
+@pytest.mark.parametrize('faces', small_graphs())
+def test_prefixes_cover_every_partition_once(faces):
+    expected = exhaustive(faces)
+    for depth in range(1, 5):
+        found, prefixes = dual_prefixes(faces, depth)
+        if found is not None:
+            # решение выше глубины depth: параллельный поиск берёт его сразу
+            assert tuple(found) in expected
+            continue
+        listed = [tuple(inside) for prefix in prefixes
+                  for inside in iter_dual_partitions(faces, prefix=prefix)]
+        assert len(listed) == len(set(listed))
+        assert set(listed) == expected
+
+
+@pytest.mark.parametrize('faces', small_graphs()[:6])
+def test_undo_restores_initial_state(faces):
+    # после полного перебора откат журнала возвращает нетронутое состояние
+    search = _DualSearch(faces)
+    list(search)
+    search.undo(0)
+    assert not any(search.in_s) and not any(search.excluded) and not any(search.shared)
+    assert set(search.boundary.values()) == {0}
+    assert search.weight == 0 and search.excluded_count == 0
+    assert search.free_weight == sum(search.weights)
+    assert search.undecided == {v: len(fs) for v, fs in search.vertex_faces.items()}
@@ -0,0 +1,16 @@
+import pytest
+
+from greenberg.enumeration import enumeration_options, iter_planar_graphs
+
+# OEIS A003094 (связные планарные) и A021103 (двусвязные планарные), n = 3..7
+COUNTS = {
+    1: [2, 6, 20, 99, 646],
+    2: [1, 3, 9, 44, 294],
+}
+
+
+@pytest.mark.parametrize('connectivity', sorted(COUNTS))
+def test_counts_match_oeis(connectivity):
+    options = enumeration_options(connectivity=connectivity)
+    assert [sum(1 for _ in iter_planar_graphs(n, options)) for n in range(3, 8)] \
+        == COUNTS[connectivity]
@@ -0,0 +1,67 @@
+import json
+import random
+
+import pytest
+
+from greenberg.cli import main
+from greenberg.generators import random_edges
+from greenberg.graph_io import (decode_graph6, encode_graph6, read_edgelist, read_graph6,
+                                read_json)
+
+
+@pytest.mark.parametrize('n', [0, 1, 2, 5, 62, 63, 64, 100])
+def test_graph6_round_trip(n):
+    # 62/63 — граница однобайтового и четырёхбайтового заголовка
+    rng = random.Random(n)
+    for _ in range(5):
+        edges = random_edges(n, rng.randint(0, n * (n - 1) // 2), rng)[1] if n > 1 else []
+        line = encode_graph6(n, edges)
+        vertices, decoded = decode_graph6(line)
+        assert vertices == [str(v) for v in range(n)]
+        assert sorted((int(u), int(v)) for u, v in decoded) == \
+            sorted((min(e), max(e)) for e in edges)
+        assert encode_graph6(n, [(int(u), int(v)) for u, v in decoded]) == line
+
+
+@pytest.mark.parametrize('line', ['', '   ', 'C\x7f', '~', '~?', 'D?', 'Bw?'])
+def test_decode_graph6_rejects(line):
+    with pytest.raises(ValueError):
+        decode_graph6(line)
+
+
+def bad_names(records):
+    return [name for name, vertices, _ in records if vertices is None]
+
+
+def test_bad_records_keep_the_rest():
+    # испорченная запись не обрывает чтение: соседние графы читаются как обычно
+    edgelist = ['0 1', '1 2', '', '0 1 2', '3 4', '', '# комментарий', '5', '5 6']
+    records = list(read_edgelist(edgelist))
+    assert [name for name, *_ in records] == ['stdin:0', 'stdin:1', 'stdin:2']
+    assert bad_names(records) == ['stdin:1']
+    assert records[2][1:] == (['5'], [('5', '6')])
+
+    lines = ['{"edges": [[0, 1], [1, 2]]}', '{"edges": [[0]]}', '{oops', '{"name": "g"}']
+    records = list(read_json(lines))
+    assert bad_names(records) == ['stdin:1', 'stdin:2']
+    assert records[3] == ('g', [], [])
+    assert bad_names(read_json(['[{"edges": [[0, 1]]}, 5, {"edges": 1}]'])) == \
+        ['stdin:1', 'stdin:2']
+    assert bad_names(read_json(['[1, 2'])) == ['stdin:0']
+    assert bad_names(read_json(['"граф"'])) == ['stdin:0']
+
+    records = list(read_graph6(['>>graph6<<Bw', '', 'B??', 'Bw']))
+    assert bad_names(records) == ['stdin:1']
+    assert records[2][2] == [('0', '1'), ('0', '2'), ('1', '2')]
+
+
+def test_check_reports_bad_rows(tmp_path):
+    source = tmp_path / 'graphs.g6'
+    source.write_text('\n'.join([encode_graph6(4, [(0, 1), (1, 2), (2, 3), (3, 0), (0, 2)]),
+                                 'C~~', encode_graph6(3, [(0, 1), (1, 2), (2, 0)])]) + '\n')
+    output = tmp_path / 'rows.jsonl'
+    assert main(['check', str(source), '-j', '1', '-o', str(output)]) == 0
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [row['name'] for row in rows] == [f"{source}:{i}" for i in range(3)]
+    assert rows[1]['error'].startswith('ValueError: ') and 'greenberg' not in rows[1]
+    assert 'error' not in rows[0] and 'error' not in rows[2]
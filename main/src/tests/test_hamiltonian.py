@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from greenberg.benchmark import build, prism
+from greenberg.generators import random_edges, random_planar_biconnected
+from greenberg.hamiltonian import backtracking, find_hamiltonian_cycle, held_karp
+from greenberg.profiler import profiling
+
+from .test_decomposition import adjacency, small_planar_biconnected
+
+
+def is_hamiltonian_cycle(n, adj, cycle):
+    return (sorted(cycle) == list(range(n))
+            and all(adj[a] >> b & 1 for a, b in zip(cycle, cycle[1:] + cycle[:1])))
+
+
+def random_graphs(seed, count=150):
+    rng = random.Random(seed)
+    for _ in range(count):
+        n = rng.randint(3, 12)
+        yield n, adjacency(*random_edges(n, rng.randint(n, n * (n - 1) // 2), rng))
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_engines_agree(seed):
+    for n, adj in random_graphs(seed):
+        exact = held_karp(n, adj)
+        searched = backtracking(n, adj)
+        assert (exact is None) == (searched is None), adj
+        for cycle in (exact, searched):
+            if cycle is not None:
+                assert is_hamiltonian_cycle(n, adj, cycle)
+
+
+def test_memory_budget_switches_engine():
+    n, adj = 12, adjacency(*prism(12, None))
+    with profiling() as profiler:
+        cycle = find_hamiltonian_cycle(n, adj)
+    assert 'held_karp_states' in profiler.to_dict()['counters']
+    assert is_hamiltonian_cycle(n, adj, cycle)
+    # таблица на 2^11 записей не помещается в 1 КиБ: остаётся перебор с возвратом
+    with profiling() as profiler:
+        cycle = find_hamiltonian_cycle(n, adj, memory_budget=1024)
+    counters = profiler.to_dict()['counters']
+    assert 'backtracking_states' in counters and 'held_karp_states' not in counters
+    assert is_hamiltonian_cycle(n, adj, cycle)
+
+
+def check_assembled(graph, n, adj):
+    cycle = graph.find_hamiltonian_cycle()
+    exact = held_karp(n, adj)
+    assert (cycle is False) == (exact is None)
+    if cycle is not False:
+        assert is_hamiltonian_cycle(n, adj, [int(v) for v in cycle])
+
+
+def test_cycles_assembled_from_skeletons():
+    # циклы скелетов узлов R склеиваются через cycle_edges в цикл всего графа
+    for n, edges in small_planar_biconnected():
+        graph = build(n, edges)
+        if graph.is_biconnected():
+            check_assembled(graph, n, adjacency(n, edges))
+    rng = random.Random(5)
+    for _ in range(60):
+        n, edges = random_planar_biconnected(rng.randint(8, 16), rng.choice([0.3, 0.6]), rng)
+        check_assembled(build(n, edges), n, adjacency(n, edges))
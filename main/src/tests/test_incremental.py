@@ -0,0 +1,74 @@
+import random
+from itertools import combinations
+
+import pytest
+
+from greenberg.generators import random_planar_biconnected
+from greenberg.graph import GraphNX
+from greenberg.solver import (IncrementalSubsetSum, face_size_counts,
+                              greenberg_partition_bruteforce)
+
+
+def edited_graph(rng, n):
+    graph = GraphNX()
+    vertices, edges = random_planar_biconnected(n, rng=rng)
+    for v in range(vertices):
+        graph.add_vertex(str(v))
+    graph.add_edges_from((str(u), str(v)) for u, v in edges)
+    return graph
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_incremental_edits_match_fresh_analysis(seed):
+    # после каждой правки f_k и живой вердикт совпадают с анализом с нуля
+    rng = random.Random(seed)
+    graph = edited_graph(rng, 10)
+    graph.live_verdict()
+    for _ in range(30):
+        vertices = graph.get_vertices()
+        edges = [(u, v) for u, v, _ in graph.get_edges()]
+        action = rng.random()
+        if action < 0.45 and edges:
+            graph.remove_edge(*rng.choice(edges))
+        elif action < 0.9:
+            graph.add_edge(*rng.sample(vertices, 2))
+        elif len(vertices) > 4:
+            graph.remove_vertex(rng.choice(vertices))
+        fresh = graph.copy()
+        assert graph.live_verdict() == fresh.live_verdict()
+        if graph.analysis().is_planar and graph.analysis().is_biconnected:
+            assert face_size_counts(graph.analysis().face_ids) == \
+                face_size_counts(fresh.analysis().face_ids)
+
+
+def subset_count(sizes):
+    # число подмножеств граней с суммой S / 2 (перебор)
+    weights = [k - 2 for k in sizes]
+    total = sum(weights)
+    if total == 0 or total % 2:
+        return 0
+    return sum(1 for r in range(len(weights) + 1) for subset in combinations(weights, r)
+               if 2 * sum(subset) == total)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_incremental_subset_sum_insert_delete(seed):
+    rng = random.Random(seed)
+    sizes = []
+    incremental = IncrementalSubsetSum()
+    for _ in range(200):
+        if sizes and (len(sizes) >= 12 or rng.random() < 0.4):
+            k = sizes.pop(rng.randrange(len(sizes)))
+            incremental.remove(k)
+        else:
+            k = rng.randint(3, 12)
+            sizes.append(k)
+            incremental.add(k)
+        assert incremental.f_k == face_size_counts([list(range(k)) for k in sizes])
+        assert incremental.ways == IncrementalSubsetSum(sizes).ways
+        assert incremental.partitions() == subset_count(sizes)
+        exists = greenberg_partition_bruteforce([list(range(k)) for k in sizes]) is not None
+        assert (incremental.partitions() > 0) == exists
+    for k in list(sizes):
+        incremental.remove(k)
+    assert incremental.ways == [1] and incremental.f_k == {}
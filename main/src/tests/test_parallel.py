@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+from greenberg import parallel
+from greenberg.benchmark import grinberg46, prism
+from greenberg.hamiltonian import held_karp
+from greenberg.parallel import parallel_dual_partition, parallel_hamiltonian_cycles
+from greenberg.profiler import profiling
+from greenberg.solver import SolverControl, SolverInterrupted
+
+from .test_decomposition import adjacency
+from .test_dual import exhaustive, faces_of
+from .test_hamiltonian import is_hamiltonian_cycle
+
+
+def test_worker_profiles_reach_parent():
+    # состояния Хелда — Карпа считаются только в процессах пула
+    skeletons = [(n, adjacency(*prism(n, None))) for n in (6, 8, 10)]
+    with profiling() as profiler:
+        cycles = parallel_hamiltonian_cycles(skeletons, 2)
+    assert all(is_hamiltonian_cycle(n, adj, cycle) for (n, adj), cycle in zip(skeletons, cycles))
+    expected = 0
+    for n, adj in skeletons:
+        with profiling() as single:
+            held_karp(n, adj)
+        expected += single.counters['held_karp_states']
+    assert profiler.counters['held_karp_states'] == expected
+
+
+def test_parallel_dual_partition():
+    faces = faces_of(*prism(12, None))
+    found = parallel_dual_partition(faces, 2)
+    assert tuple(found) in exhaustive(faces)
+
+
+def test_pool_is_shared_and_stops_on_timeout():
+    # перебор с возвратом на негамильтоновом графе Гринберга долог: шарды
+    # останавливает лимит времени родителя, а пул остаётся для следующего поиска
+    n, edges = grinberg46(0, None)
+    skeletons = [(n, adjacency(n, edges))] * 2
+    control = SolverControl(time_budget=0.3)
+    start = time.monotonic()
+    with pytest.raises(SolverInterrupted):
+        parallel_hamiltonian_cycles(skeletons, 2, control, held_karp_limit=0)
+    assert time.monotonic() - start < 5
+    pool = parallel._pool
+    assert parallel_hamiltonian_cycles([(6, adjacency(*prism(6, None)))] * 3, 2) is not None
+    assert parallel._pool is pool
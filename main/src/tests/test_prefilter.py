@@ -0,0 +1,38 @@
+import pytest
+
+from greenberg.prefilter import RULES, _weights, prefilter
+from greenberg.solver import greenberg_partition_bruteforce
+
+from .test_solver import faces_of, histograms, is_partition
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_prefilter_agrees_with_bruteforce(seed):
+    for f_k in histograms(seed):
+        exists = greenberg_partition_bruteforce(faces_of(f_k)) is not None
+        decided = prefilter(f_k)
+        if decided is not None:
+            assert decided.verdict == exists, (f_k, decided.rule)
+            if decided.verdict:
+                assert is_partition(f_k, decided.prime_counts)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_each_rule_is_sound(seed):
+    # каждое правило по отдельности, а не только первое сработавшее
+    for f_k in histograms(seed):
+        weights = _weights(f_k)
+        total = sum(f_k[k] * w for k, w in weights.items())
+        if total % 2:
+            continue
+        exists = greenberg_partition_bruteforce(faces_of(f_k)) is not None
+        for rule in RULES:
+            decided = rule(f_k, weights, total // 2)
+            if decided is not None:
+                assert decided.verdict == exists, (f_k, decided.rule)
+
+
+def test_rule_names():
+    assert prefilter({5: 1, 4: 2}).rule == 'parity'
+    assert prefilter({3: 2, 20: 1}).rule == 'dominant_face'
+    assert prefilter({5: 21, 8: 3, 9: 1}).verdict is False  # набор граней графа Гринберга
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import random
+
+from greenberg.generators import random_cubic_planar
+from greenberg.service import (DEADLINE_EXCEEDED, INVALID_PARAMS, INVALID_REQUEST, OVERLOADED,
+                               PARSE_ERROR, CheckService, ServiceError)
+
+
+def cubic(n, seed):
+    n, edges = random_cubic_planar(n, random.Random(seed))
+    return {'edges': [[str(u), str(v)] for u, v in edges]}
+
+
+async def code_of(call):
+    try:
+        await call
+    except ServiceError as e:
+        return e.code
+    return None
+
+
+def test_invalid_params():
+    # параметры проверяются до очереди: пул не нужен
+    async def main():
+        service = CheckService(jobs=1)
+        bad = [[], {'graph6': '~~~'}, {'graph6': 'C'}, {'edges': 5}, {'vertices': ['0']},
+               {'edges': [[0, 1]], 'mode': 'all'}, {'edges': [[0, 1]], 'deadline_ms': 'x'}]
+        return [await code_of(service.check(params)) for params in bad]
+    assert asyncio.run(main()) == [INVALID_PARAMS] * 7
+
+
+def test_invalid_requests_over_socket():
+    async def main():
+        service = CheckService(jobs=1)
+        server = await asyncio.start_server(service.serve_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        lines = [b'[]', b'null', b'{"jsonrpc": "1.0", "id": 1, "method": "ping"}',
+                 b'{"jsonrpc": "2.0", "id": 2, "method": 3}', b'{oops',
+                 b'{"jsonrpc": "2.0", "id": 3, "method": "check", "params": {"graph6": "~"}}',
+                 b'{"jsonrpc": "2.0", "id": 4, "method": "ping"}']
+        responses = []
+        for line in lines:
+            # по одному запросу за раз: ответы в порядке запросов
+            writer.write(line + b'\n')
+            await writer.drain()
+            responses.append(json.loads(await reader.readline()))
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return responses
+    responses = asyncio.run(main())
+    assert [r.get('error', {}).get('code') for r in responses] == \
+        [INVALID_REQUEST] * 4 + [PARSE_ERROR, INVALID_PARAMS, None]
+    assert [r['id'] for r in responses] == [None] * 5 + [3, 4]
+    assert responses[-1]['result'] == 'pong'
+
+
+def test_overloaded_and_deadline():
+    async def main():
+        service = CheckService(jobs=1, queue_size=1)
+        await service.start()
+        try:
+            # check не уступает цикл до постановки в очередь: второй запрос
+            # застаёт очередь полной, пока сборщик пачек не забрал первый
+            first = asyncio.create_task(code_of(service.check(cubic(40, 1))))
+            second = asyncio.create_task(code_of(service.check(cubic(40, 2))))
+            codes = await asyncio.gather(first, second)
+            # проверка графа на 400 вершинах дольше миллисекунды
+            expired = await code_of(service.check(dict(cubic(400, 3), deadline_ms=1)))
+            return codes, expired, service.stats()
+        finally:
+            await service.close()
+    codes, expired, stats = asyncio.run(main())
+    assert codes == [None, OVERLOADED]
+    assert expired == DEADLINE_EXCEEDED
+    assert stats['overloaded'] == 1 and stats['expired'] == 1
@@ -0,0 +1,96 @@
+import random
+from itertools import product
+
+import pytest
+
+from greenberg.solver import (batch_partition_counts, face_size_counts,
+                              greenberg_partition_bruteforce,
+                              greenberg_partition_counts, iter_partition_counts, split_faces)
+
+
+def random_histogram(rng, max_faces=12):
+    # f_k с порядками 3..12; граней не больше max_faces, чтобы перебор 2^F был быстрым
+    f_k = {}
+    for _ in range(rng.randint(1, max_faces)):
+        k = rng.randint(3, 12)
+        f_k[k] = f_k.get(k, 0) + 1
+    return f_k
+
+
+def faces_of(f_k):
+    # грани-заглушки нужной длины: перебору важны только порядки
+    return [list(range(k)) for k in sorted(f_k) for _ in range(f_k[k])]
+
+
+def histograms(seed, count=300):
+    rng = random.Random(seed)
+    return [random_histogram(rng) for _ in range(count)]
+
+
+def is_partition(f_k, prime_counts):
+    total = sum(c * (k - 2) for k, c in f_k.items())
+    half = sum(c * (k - 2) for k, c in prime_counts.items())
+    return (set(prime_counts) <= set(f_k)
+            and all(0 <= c <= f_k[k] for k, c in prime_counts.items()) and 2 * half == total)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_dp_matches_bruteforce(seed):
+    for f_k in histograms(seed):
+        expected = greenberg_partition_bruteforce(faces_of(f_k))
+        prime_counts = greenberg_partition_counts(f_k)
+        assert (prime_counts is None) == (expected is None), f_k
+        if prime_counts is not None:
+            assert is_partition(f_k, prime_counts)
+            assert is_partition(f_k, face_size_counts(expected[0]))
+
+
+def test_split_faces_follows_counts():
+    rng = random.Random(3)
+    for f_k in histograms(3, count=100):
+        faces = faces_of(f_k)
+        rng.shuffle(faces)
+        prime_counts = greenberg_partition_counts(f_k)
+        if prime_counts is None:
+            continue
+        f_prime, f_double_prime = split_faces(faces, prime_counts)
+        assert len(f_prime) + len(f_double_prime) == len(faces)
+        assert face_size_counts(f_prime) == {k: c for k, c in prime_counts.items() if c}
+        assert sum(len(f) - 2 for f in f_prime) == sum(len(f) - 2 for f in f_double_prime)
+
+
+def all_partitions(f_k):
+    # все f' по произведению 0..f_k, пара (f', f'') — одна запись
+    sizes = sorted(f_k)
+    total = sum(f_k[k] * (k - 2) for k in sizes)
+    found = set()
+    for counts in product(*(range(f_k[k] + 1) for k in sizes)):
+        if 2 * sum(c * (k - 2) for k, c in zip(sizes, counts)) == total:
+            complement = tuple(f_k[k] - c for k, c in zip(sizes, counts))
+            found.add(min(counts, complement))
+    return found
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_enumeration_lists_every_partition_once(seed):
+    for f_k in histograms(seed, count=150):
+        sizes = sorted(f_k)
+        listed = [tuple(p[k] for k in sizes) for p in iter_partition_counts(f_k)]
+        assert len(listed) == len(set(listed))
+        assert {min(p, tuple(f_k[k] - c for k, c in zip(sizes, p))) for p in listed} \
+            == all_partitions(f_k)
+        assert bool(listed) == (greenberg_partition_bruteforce(faces_of(f_k)) is not None)
+
+
+@pytest.mark.parametrize('witness', [True, False])
+def test_batch_matches_bruteforce(witness):
+    # 400 строк с малыми целями: группы по длине цели идут через NumPy, если он есть
+    rng = random.Random(7)
+    rows = [random_histogram(rng, max_faces=8) for _ in range(400)]
+    results = batch_partition_counts(rows, witness=witness)
+    assert len(results) == len(rows)
+    for f_k, found in zip(rows, results):
+        exists = greenberg_partition_bruteforce(faces_of(f_k)) is not None
+        assert (found is not None) == exists, f_k
+        if found is not None:
+            assert is_partition(f_k, found) if witness else found is True
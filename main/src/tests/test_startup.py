@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+
+from greenberg.benchmark import LAZY_MODULES, _cold_run
+from greenberg.cli import STARTUP_BUDGET_MS
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# import greenberg без тяжёлых модулей — доли бюджета на всю проверку
+IMPORT_BUDGET_MS = 300
+
+
+def test_import_keeps_heavy_modules_lazy():
+    # чистый интерпретатор: в текущем тяжёлые модули уже мог загрузить pytest
+    env = dict(os.environ, PYTHONPATH=SRC)
+    probe = ("import json, sys, greenberg; print(json.dumps(sorted(m for m in %r"
+             " if m in sys.modules)))" % (LAZY_MODULES,))
+    done = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True,
+                          env=env, check=True)
+    assert json.loads(done.stdout) == []
+
+
+def test_cold_start_within_budget():
+    # лучшее из трёх замеров, как в команде startup: разовые задержки системы не в счёт
+    imports, checks = [], []
+    for _ in range(3):
+        imports.append(_cold_run(['-c', 'import greenberg'])[0])
+        elapsed, out = _cold_run(['-m', 'greenberg', 'check', '-j', '1', '-f', 'graph6', '-'],
+                                 stdin='C~\n')
+        checks.append(elapsed)
+        assert json.loads(out)['greenberg'] == 'may_be_hamiltonian'  # K4
+    assert min(imports) * 1000 < IMPORT_BUDGET_MS
+    assert min(checks) * 1000 < STARTUP_BUDGET_MS